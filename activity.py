@@ -0,0 +1,181 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from flask_login import current_user
+from sqlalchemy import select, func
+from extensions import db
+from models import ActivityEvent
+
+# Actions counted as new users and new transactions by growth_metrics()
+REGISTRATION_ACTIONS = ('user.register', 'user.create')
+TRANSACTION_ACTIONS = ('transaction.create', 'transaction.import')
+
+# How the admin dashboard names each action
+ACTION_LABELS = {
+    'user.register': 'Created account',
+    'user.login': 'Logged in',
+    'user.create': 'Created user',
+    'user.update': 'Updated user',
+    'user.delete': 'Deleted user',
+    'user.activate': 'Activated user',
+    'user.deactivate': 'Deactivated user',
+    'user.role': 'Changed user role',
+    'transaction.create': 'Added transaction',
+    'transaction.update': 'Updated transaction',
+    'transaction.delete': 'Deleted transaction',
+    'transaction.import': 'Imported transactions',
+    'transaction.delete_all': 'Deleted all transactions',
+    'feedback.submit': 'Sent feedback',
+    'feedback.delete': 'Deleted feedback'
+}
+
+class ActivityWriter:
+    """Queues activity events in memory and inserts them in batches.
+
+    A background thread writes the queue as one executemany INSERT in a
+    single transaction once it holds max_events events or its oldest event
+    is max_delay_ms old, so recording an event costs a request no write of
+    its own. Events still queued when the process is killed are lost; a
+    normal exit flushes them.
+    """
+
+    def __init__(self, engine, max_events=100, max_delay_ms=1000, logger=None):
+        self.engine = engine
+        # Batches are written outside any app context, so the app's logger is handed in
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_events = max_events
+        self.max_delay = max_delay_ms / 1000
+        self._events = []
+        self._oldest = 0.0
+        self._condition = threading.Condition()
+        # Keeps batches in order when a flush() call races the background thread
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, **values):
+        """Queue one activity_event row; every call must pass the same columns."""
+        with self._condition:
+            if not self._events:
+                self._oldest = time.monotonic()
+            self._events.append(values)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='activity-writer', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._events:
+                    self._condition.wait()
+                # Wait for a full batch, but no longer than max_delay after the first event
+                while self._events and len(self._events) < self.max_events:
+                    remaining = self._oldest + self.max_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            self.flush()
+
+    def flush(self):
+        """Write every queued event now; returns how many were written."""
+        with self._flush_lock:
+            with self._condition:
+                events, self._events = self._events, []
+            if not events:
+                return 0
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(ActivityEvent.__table__.insert(), events)
+            except Exception as e:
+                # Best effort: a failed batch never fails the requests that queued it
+                self.dropped += len(events)
+                self.logger.error(f"Error writing {len(events)} activity events: {str(e)}")
+                return 0
+            self.batches += 1
+            self.written += len(events)
+            return len(events)
+
+    def stats(self):
+        with self._condition:
+            queued = len(self._events)
+        return {'queued': queued, 'batches': self.batches, 'written': self.written, 'dropped': self.dropped}
+
+def get_writer():
+    return current_app.extensions['activity_writer']
+
+def record_event(action, details=None, target_id=None, quantity=1, user=None):
+    """Queue an activity event of user (by default the signed-in user, if any)."""
+    if user is None and current_user.is_authenticated:
+        user = current_user
+    get_writer().record(
+        created_at=datetime.utcnow(),
+        user_id=user.id if user is not None else None,
+        username=user.username if user is not None else None,
+        action=action,
+        target_id=target_id,
+        details=details[:255] if details else None,
+        quantity=quantity
+    )
+
+def time_ago(when, now=None):
+    """'2 hours ago' style age of a UTC datetime."""
+    seconds = int(((now or datetime.utcnow()) - when).total_seconds())
+    for unit, length in (('day', 86400), ('hour', 3600), ('minute', 60)):
+        if seconds >= length:
+            count = seconds // length
+            return f'{count} {unit}{"s" if count > 1 else ""} ago'
+    return 'just now'
+
+def recent_activity(limit=10):
+    """The latest events, shaped for the admin dashboard's activity table."""
+    now = datetime.utcnow()
+    events = ActivityEvent.query.order_by(ActivityEvent.created_at.desc(), ActivityEvent.id.desc()).limit(limit).all()
+    return [{
+        'user': event.username or 'anonymous',
+        'action': ACTION_LABELS.get(event.action, event.action),
+        'details': event.details or '',
+        'time': time_ago(event.created_at, now)
+    } for event in events]
+
+def growth_metrics(total_users, total_transactions, now=None):
+    """New users and transactions this month (UTC) from the activity log, and the growth they make.
+
+    Growth is the share the month's additions add to what existed before
+    the month began.
+    """
+    now = now or datetime.utcnow()
+    month_start = datetime(now.year, now.month, 1)
+    added = dict(db.session.execute(
+        select(ActivityEvent.action, func.sum(ActivityEvent.quantity))
+        .where(
+            ActivityEvent.action.in_(REGISTRATION_ACTIONS + TRANSACTION_ACTIONS),
+            ActivityEvent.created_at >= month_start
+        )
+        .group_by(ActivityEvent.action)
+    ).all())
+    new_users = sum(added.get(action, 0) for action in REGISTRATION_ACTIONS)
+    new_transactions = sum(added.get(action, 0) for action in TRANSACTION_ACTIONS)
+
+    def growth(new, total):
+        before = total - new
+        return round(new / before * 100) if before > 0 else 0
+
+    return {
+        'new_users_this_month': new_users,
+        'new_transactions_this_month': new_transactions,
+        'user_growth': growth(new_users, total_users),
+        'transaction_growth': growth(new_transactions, total_transactions)
+    }
+
+def init_activity(app):
+    """Create the app's batched activity writer, flushed when the process exits."""
+    with app.app_context():
+        writer = ActivityWriter(db.engine, app.config['ACTIVITY_FLUSH_EVENTS'], app.config['ACTIVITY_FLUSH_MS'], app.logger)
+    app.extensions['activity_writer'] = writer
+    atexit.register(writer.flush)
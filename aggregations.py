@@ -0,0 +1,158 @@
+from datetime import date, timedelta
+from sqlalchemy import func
+from extensions import db
+from models import DailyRollup
+from database import date_bucket
+
+def _in_range(query, user_id, start, end):
+    """Restrict a rollup query to one user and the days in [start, end); None leaves a side open."""
+    query = query.filter(DailyRollup.user_id == user_id)
+    if start is not None:
+        query = query.filter(DailyRollup.day >= start)
+    if end is not None:
+        query = query.filter(DailyRollup.day < end)
+    return query
+
+def period_totals(user_id, start, end, granularity='day'):
+    """Return (bucket_start, income, expenses) tuples for every day/month/year in [start, end) with transactions.
+
+    All buckets are computed by a single grouped query over the daily rollup;
+    buckets without transactions are simply absent from the result.
+    """
+    bucket = date_bucket(DailyRollup.day, granularity, db.engine.dialect.name)
+    rows = _in_range(db.session.query(
+        bucket,
+        func.sum(DailyRollup.income_sum),
+        func.sum(DailyRollup.expense_sum)
+    ), user_id, start, end).group_by(bucket).order_by(bucket).all()
+
+    return [(key, float(income or 0), float(expenses or 0)) for key, income, expenses in rows]
+
+def daily_totals(user_id, start, end):
+    """Return (day, income, expenses) tuples for every day in [start, end) that has transactions."""
+    return period_totals(user_id, start, end, 'day')
+
+def totals(user_id, start, end):
+    """Return (income, expenses) summed over [start, end)."""
+    income, expenses = _in_range(db.session.query(
+        func.sum(DailyRollup.income_sum),
+        func.sum(DailyRollup.expense_sum)
+    ), user_id, start, end).one()
+    return float(income or 0), float(expenses or 0)
+
+def fold_totals(day_rows, start, end):
+    """Sum (income, expenses) of the day rows falling in [start, end]."""
+    income = 0.0
+    expenses = 0.0
+    for day, day_income, day_expenses in day_rows:
+        if start <= day <= end:
+            income += day_income
+            expenses += day_expenses
+    return income, expenses
+
+def fold_buckets(day_rows, key):
+    """Group day rows into {key(day): (income, expenses)}."""
+    buckets = {}
+    for day, income, expenses in day_rows:
+        bucket = key(day)
+        bucket_income, bucket_expenses = buckets.get(bucket, (0.0, 0.0))
+        buckets[bucket] = (bucket_income + income, bucket_expenses + expenses)
+    return buckets
+
+def category_totals(user_id, start, end):
+    """Return (category, net_total) tuples for [start, end), largest absolute total first."""
+    total = func.sum(DailyRollup.income_sum - DailyRollup.expense_sum)
+    rows = _in_range(db.session.query(
+        DailyRollup.category,
+        total
+    ), user_id, start, end).group_by(
+        DailyRollup.category
+    ).order_by(
+        func.abs(total).desc()
+    ).all()
+
+    return [(category, float(amount or 0)) for category, amount in rows]
+
+def category_breakdown(user_id, start, end):
+    """Return (category, income, expenses, income_count, expense_count) tuples for [start, end)."""
+    rows = _in_range(db.session.query(
+        DailyRollup.category,
+        func.sum(DailyRollup.income_sum),
+        func.sum(DailyRollup.expense_sum),
+        func.sum(DailyRollup.income_count),
+        func.sum(DailyRollup.expense_count)
+    ), user_id, start, end).group_by(
+        DailyRollup.category
+    ).order_by(
+        DailyRollup.category
+    ).all()
+
+    return [
+        (category, float(income or 0), float(expenses or 0), int(income_count or 0), int(expense_count or 0))
+        for category, income, expenses, income_count, expense_count in rows
+    ]
+
+def dashboard_buckets(user_id, today):
+    """Compute every income/expense series shown on the dashboard.
+
+    Fetches one day-level aggregate covering the widest range the dashboard
+    needs (five years back to the end of the current year) and folds it into
+    daily, weekly, monthly and yearly buckets in Python, so the number of
+    queries stays constant no matter how many buckets are displayed.
+
+    Returns a dict of lists of plain tuples:
+        daily:   (date, income, expenses) for each day of the current month
+        weekly:  (week_start, week_end, income, expenses) for the last 4 weeks
+        monthly: (month_start, income, expenses) for each month of the current year
+        yearly:  (year, income, expenses) for the last 5 years, current year up to today
+    """
+    start_of_month = today.replace(day=1)
+    if today.month == 12:
+        next_month = date(today.year + 1, 1, 1)
+    else:
+        next_month = date(today.year, today.month + 1, 1)
+
+    # The oldest bucket is either the first yearly bucket or the first weekly one
+    first_week_start = start_of_month - timedelta(days=27)
+    range_start = min(date(today.year - 4, 1, 1), first_week_start)
+    range_end = date(today.year + 1, 1, 1)
+
+    day_rows = daily_totals(user_id, range_start, range_end)
+
+    # Daily buckets (all days in current month)
+    by_day = {day: (income, expenses) for day, income, expenses in day_rows}
+    daily = []
+    for offset in range((next_month - start_of_month).days):
+        day = start_of_month + timedelta(days=offset)
+        income, expenses = by_day.get(day, (0.0, 0.0))
+        daily.append((day, income, expenses))
+
+    # Weekly buckets (last 4 weeks ending on the first of the month)
+    weekly = []
+    for i in range(3, -1, -1):
+        week_end = start_of_month - timedelta(days=i * 7)
+        week_start = week_end - timedelta(days=6)
+        income, expenses = fold_totals(day_rows, week_start, week_end)
+        weekly.append((week_start, week_end, income, expenses))
+
+    # Monthly buckets (current year)
+    by_month = fold_buckets(day_rows, lambda day: (day.year, day.month))
+    monthly = []
+    for month in range(1, 13):
+        income, expenses = by_month.get((today.year, month), (0.0, 0.0))
+        monthly.append((date(today.year, month, 1), income, expenses))
+
+    # Yearly buckets (last 5 years, current year up to today)
+    yearly = []
+    for i in range(4, -1, -1):
+        year = today.year - i
+        year_end = date(year, 12, 31) if i > 0 else today
+        income, expenses = fold_totals(day_rows, date(year, 1, 1), year_end)
+        yearly.append((year, income, expenses))
+
+    return {
+        'daily': daily,
+        'weekly': weekly,
+        'monthly': monthly,
+        'yearly': yearly
+    }
@@ -0,0 +1,147 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from sqlalchemy import select, type_coerce, String
+from extensions import db
+from models import DailyRollup
+from data_version import get_data_version
+
+# Users whose columns are kept loaded per process (least recently used are dropped)
+COLUMN_CACHE_USERS = 256
+
+_column_cache = OrderedDict()
+_column_cache_lock = threading.Lock()
+
+# NumPy datetime64 unit per bucket granularity
+BUCKET_UNITS = {
+    'day': 'D',
+    'month': 'M',
+    'year': 'Y'
+}
+
+def _day_number(day):
+    """Days since 1970-01-01, the integer behind datetime64[D]."""
+    return int(np.datetime64(day, 'D').astype(np.int64))
+
+class UserColumns:
+    """One user's daily rollup held as NumPy column arrays, sorted by day.
+
+    Every query below is a binary search for the day range followed by
+    bincount/reduceat over the slice, so no per-row Python runs per request.
+    """
+
+    def __init__(self, days, category_codes, categories, income, expenses, income_count, expense_count):
+        self.days = days  # int64 days since the epoch
+        self.category_codes = category_codes  # index into categories
+        self.categories = categories
+        self.income = income
+        self.expenses = expenses
+        self.income_count = income_count
+        self.expense_count = expense_count
+
+    def __len__(self):
+        return len(self.days)
+
+    def _range(self, start, end):
+        """Slice bounds of the rows with start <= day < end; None leaves a side open."""
+        lo = 0 if start is None else int(np.searchsorted(self.days, _day_number(start), side='left'))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, _day_number(end), side='left'))
+        return lo, hi
+
+    def totals(self, start, end):
+        """Return (income, expenses) summed over [start, end)."""
+        lo, hi = self._range(start, end)
+        return float(self.income[lo:hi].sum()), float(self.expenses[lo:hi].sum())
+
+    def daily_series(self, start, end):
+        """Return dense (income, expenses) arrays with one entry per day of [start, end)."""
+        lo, hi = self._range(start, end)
+        offsets = self.days[lo:hi] - _day_number(start)
+        length = max((end - start).days, 0)
+        income = np.bincount(offsets, weights=self.income[lo:hi], minlength=length)
+        expenses = np.bincount(offsets, weights=self.expenses[lo:hi], minlength=length)
+        return income, expenses
+
+    def period_totals(self, start, end, granularity='day'):
+        """Return (bucket_start, income, expenses) tuples for every day/month/year in [start, end) with transactions."""
+        lo, hi = self._range(start, end)
+        if lo == hi:
+            return []
+
+        unit = BUCKET_UNITS[granularity]
+        keys = self.days[lo:hi].astype('datetime64[D]').astype(f'datetime64[{unit}]')
+        # Days are sorted, so each bucket is a contiguous run starting where the key changes
+        starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+        income = np.add.reduceat(self.income[lo:hi], starts)
+        expenses = np.add.reduceat(self.expenses[lo:hi], starts)
+        bucket_days = keys[starts].astype('datetime64[D]').tolist()
+
+        return [(day, float(i), float(e)) for day, i, e in zip(bucket_days, income, expenses)]
+
+    def category_breakdown(self, start, end):
+        """Return (category, income, expenses, income_count, expense_count) tuples for [start, end), by category name."""
+        lo, hi = self._range(start, end)
+        codes = self.category_codes[lo:hi]
+        size = len(self.categories)
+        income = np.bincount(codes, weights=self.income[lo:hi], minlength=size)
+        expenses = np.bincount(codes, weights=self.expenses[lo:hi], minlength=size)
+        income_count = np.bincount(codes, weights=self.income_count[lo:hi], minlength=size)
+        expense_count = np.bincount(codes, weights=self.expense_count[lo:hi], minlength=size)
+
+        present = np.flatnonzero(income_count + expense_count)
+        rows = [
+            (self.categories[code], float(income[code]), float(expenses[code]), int(income_count[code]), int(expense_count[code]))
+            for code in present
+        ]
+        return sorted(rows)
+
+def load_user_columns(user_id):
+    """Load a user's whole daily rollup into a UserColumns with one query."""
+    query = select(
+        # Raw ISO day strings: NumPy parses them far faster than building date objects
+        type_coerce(DailyRollup.day, String),
+        DailyRollup.category,
+        DailyRollup.income_sum,
+        DailyRollup.expense_sum,
+        DailyRollup.income_count,
+        DailyRollup.expense_count
+    ).where(
+        DailyRollup.user_id == user_id
+    ).order_by(
+        DailyRollup.day
+    )
+    rows = db.session.execute(query).all()
+
+    days, categories, income, expenses, income_count, expense_count = zip(*rows) if rows else ([],) * 6
+
+    # Dictionary-encode the categories
+    positions = {}
+    codes = [positions.setdefault(category, len(positions)) for category in categories]
+
+    return UserColumns(
+        days=np.array(days, dtype='datetime64[D]').astype(np.int64),
+        category_codes=np.array(codes, dtype=np.int64),
+        categories=list(positions),
+        income=np.array(income, dtype=np.float64),
+        expenses=np.array(expenses, dtype=np.float64),
+        income_count=np.array(income_count, dtype=np.int64),
+        expense_count=np.array(expense_count, dtype=np.int64)
+    )
+
+def user_columns(user_id):
+    """Return the user's UserColumns, reloading them only after their data version changed."""
+    # Read the version before the data, so cached columns are never older than their version
+    version = get_data_version(db.session.connection(), user_id)
+    with _column_cache_lock:
+        cached = _column_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            _column_cache.move_to_end(user_id)
+            return cached[1]
+
+    columns = load_user_columns(user_id)
+    with _column_cache_lock:
+        _column_cache[user_id] = (version, columns)
+        _column_cache.move_to_end(user_id)
+        while len(_column_cache) > COLUMN_CACHE_USERS:
+            _column_cache.popitem(last=False)
+    return columns
@@ -1,9 +1,39 @@
 from flask import Flask
 from extensions import db, login_manager, mail
+from database import database_url, engine_options, configure_engine
 from flask_migrate import Migrate
+from sqlalchemy import inspect, text
 import os
+import sys
 import logging
 
+def migrate_command_running():
+    """Whether the app is being loaded for a `flask db ...` (Flask-Migrate) command.
+
+    The migrations own the schema then: creating tables and columns from
+    the models first would make them fail on tables that already exist.
+    """
+    program = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    launched_by_flask = program == 'flask' or sys.argv[0].endswith(os.path.join('flask', '__main__.py'))
+    return launched_by_flask and 'db' in sys.argv[1:]
+
+def add_missing_columns(*tables):
+    """Add model columns missing from existing tables (ALTER TABLE ADD COLUMN)."""
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    for table in tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.quote(column.name)} {column.type.compile(db.engine.dialect)}'
+            if column.default is not None and column.default.is_scalar:
+                ddl += f' DEFAULT {column.default.arg!r}'
+                if not column.nullable:
+                    ddl += ' NOT NULL'
+            with db.engine.begin() as connection:
+                connection.execute(text(ddl))
+
 def create_app():
     app = Flask(__name__, instance_relative_config=True)
     
@@ -14,8 +44,23 @@ def create_app():
         pass
         
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'default-secret-key')
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(app.instance_path, 'budget_tracker.db')
+    # DATABASE_URL selects another database (e.g. postgresql://...); SQLite in the instance folder otherwise
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url('sqlite:///' + os.path.join(app.instance_path, 'budget_tracker.db'))
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Connection pool size/recycling, tunable through DATABASE_POOL_* environment variables
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    
+    # Parser processes per PDF import, and imports run at once by the import job runner
+    # (`flask run-import-jobs`, one per server); together they default to one process per CPU
+    app.config['PDF_PARSE_WORKERS'] = int(os.environ.get('PDF_PARSE_WORKERS', min(4, os.cpu_count() or 1)))
+    app.config['IMPORT_JOB_WORKERS'] = int(os.environ.get('IMPORT_JOB_WORKERS', max(1, (os.cpu_count() or 1) // app.config['PDF_PARSE_WORKERS'])))
+    # How often the runner looks for newly queued jobs
+    app.config['IMPORT_JOB_POLL_MS'] = int(os.environ.get('IMPORT_JOB_POLL_MS', 1000))
+    # Disk budget of the extracted-transactions cache for re-uploaded PDFs
+    app.config['PDF_CACHE_MAX_BYTES'] = int(os.environ.get('PDF_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+    # Activity log writes are batched: one INSERT per this many events, or after this many ms
+    app.config['ACTIVITY_FLUSH_EVENTS'] = int(os.environ.get('ACTIVITY_FLUSH_EVENTS', 100))
+    app.config['ACTIVITY_FLUSH_MS'] = int(os.environ.get('ACTIVITY_FLUSH_MS', 1000))
 
     # Email configuration
     app.config['MAIL_SERVER'] = 'smtp.gmail.com'  # or another email server
@@ -27,6 +72,9 @@ def create_app():
     
     # Initialize extensions
     db.init_app(app)
+    # WAL journaling and cache/mmap/busy-timeout PRAGMAs on every SQLite connection
+    with app.app_context():
+        configure_engine(db.engine)
     login_manager.init_app(app)
     mail.init_app(app)
     login_manager.login_view = 'login'
@@ -42,6 +90,22 @@ def create_app():
     from user_routes import init_user_routes
     init_user_routes(app)
     
+    # Register the daily rollup session hooks and CLI command
+    from rollups import init_rollups
+    init_rollups(app)
+
+    # Register the search index CLI command
+    from search import init_search
+    init_search(app)
+
+    # Register the import job runner CLI command
+    from import_jobs import init_import_jobs
+    init_import_jobs(app)
+
+    # Start the batched writer of the admin activity log
+    from activity import init_activity
+    init_activity(app)
+    
     # Import models and initialize database
     from models import User
     
@@ -50,9 +114,55 @@ def create_app():
         from models import User
         return db.session.get(User, int(user_id))
     
+    if migrate_command_running():
+        # Neither create tables nor backfill them: the schema may still be an old revision
+        app.config['FULL_TEXT_SEARCH'] = False
+        return app
+
     with app.app_context():
         db.create_all()
         app.logger.info('Database tables created')
+        
+        # create_all() skips existing tables, so add columns and indexes introduced since
+        from models import BudgetTransaction, ImportJob, Feedback
+        add_missing_columns(BudgetTransaction.__table__, ImportJob.__table__, User.__table__)
+
+        # Case-folded login keys of users stored before they existed; False if some are shared
+        from auth import ensure_login_keys
+        login_keys_unique = ensure_login_keys()
+
+        inspector = inspect(db.engine)
+        for table in (BudgetTransaction.__table__, Feedback.__table__, User.__table__, ImportJob.__table__):
+            existing = {index['name']: index for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.unique and not login_keys_unique:
+                    # The shared keys were reported above; the index waits until those users are renamed
+                    continue
+                if index.unique and not existing.get(index.name, {}).get('unique', True):
+                    # Built before the index was made unique
+                    index.drop(db.engine)
+                index.create(db.engine, checkfirst=True)
+
+        # Feedback pages are keyed on created_at, so date feedback stored without one
+        from models import UNDATED_FEEDBACK_CREATED_AT
+        Feedback.query.filter(Feedback.created_at.is_(None)).update({Feedback.created_at: UNDATED_FEEDBACK_CREATED_AT})
+        db.session.commit()
+        
+        # Fingerprint transactions stored before duplicate detection existed
+        from dedup import ensure_fingerprints
+        ensure_fingerprints()
+        
+        # Populate the daily rollups of databases created before they existed
+        from rollups import ensure_rollups
+        ensure_rollups()
+
+        # ...and the month-end ledger snapshots built on them
+        from ledger import ensure_ledger
+        ensure_ledger()
+
+        # Full-text index of transaction descriptions (SQLite FTS5)
+        from search import ensure_search_index
+        app.config['FULL_TEXT_SEARCH'] = ensure_search_index()
     
     return app
 
@@ -0,0 +1,107 @@
+import base64
+import hashlib
+import os
+from functools import lru_cache
+import bcrypt
+from sqlalchemy import func, select
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Scheme of newly stored passwords: 'bcrypt' (over a SHA-256 digest of the
+# password, see _bcrypt_input), or a werkzeug method such as
+# 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'. Hashes made with another
+# scheme or cost still verify and are replaced at the user's next login.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'bcrypt')
+# bcrypt cost (2**rounds iterations); 10 is the lowest OWASP recommends,
+# raise it when logins have CPU to spare
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 10))
+
+# Marks bcrypt hashes of the SHA-256 pre-hashed password; bare '$2b$...'
+# hashes were made from the password itself
+BCRYPT_SHA256_PREFIX = 'bcrypt-sha256$'
+
+def login_key(value):
+    """Case-folded form of a username or email, as stored in User.username_key/email_key."""
+    return (value or '').strip().casefold()
+
+def _bcrypt_input(password):
+    # bcrypt ignores (4.x) or rejects (5.x) passwords over 72 bytes; the
+    # base64 SHA-256 digest is 44 bytes and keeps every byte of the password
+    return base64.b64encode(hashlib.sha256(password.encode('utf-8')).digest())
+
+def hash_password(password, method=None, rounds=None):
+    """Hash a password with the configured scheme, or the given one."""
+    method = method or PASSWORD_HASH_METHOD
+    if method == 'bcrypt':
+        hashed = bcrypt.hashpw(_bcrypt_input(password), bcrypt.gensalt(rounds or BCRYPT_ROUNDS))
+        return BCRYPT_SHA256_PREFIX + hashed.decode('ascii')
+    return generate_password_hash(password, method)
+
+def verify_password(password_hash, password):
+    """Check a password against a hash of any supported scheme."""
+    if not password_hash or password is None:
+        return False
+    if password_hash.startswith(BCRYPT_SHA256_PREFIX):
+        return bcrypt.checkpw(_bcrypt_input(password), password_hash[len(BCRYPT_SHA256_PREFIX):].encode('ascii'))
+    if password_hash.startswith('$2'):
+        # Hashed before the pre-hash, from the first 72 bytes; replaced at the next login
+        return bcrypt.checkpw(password.encode('utf-8')[:72], password_hash.encode('ascii'))
+    return check_password_hash(password_hash, password)
+
+@lru_cache(maxsize=None)
+def _werkzeug_prefix(method):
+    # werkzeug fills in default parameters ('scrypt' -> 'scrypt:32768:8:1'), so ask it
+    return generate_password_hash('', method).split('$', 1)[0]
+
+def needs_rehash(password_hash, method=None, rounds=None):
+    """Whether a stored hash was made with another scheme or cost than the configured one."""
+    method = method or PASSWORD_HASH_METHOD
+    if not password_hash:
+        return True
+    if method == 'bcrypt':
+        # bcrypt-sha256$$2b$10$<salt and hash>
+        if not password_hash.startswith(BCRYPT_SHA256_PREFIX + '$2b$'):
+            return True
+        cost = password_hash[len(BCRYPT_SHA256_PREFIX) + 4:len(BCRYPT_SHA256_PREFIX) + 6]
+        return int(cost) != (rounds or BCRYPT_ROUNDS)
+    return password_hash.split('$', 1)[0] != _werkzeug_prefix(method)
+
+def login_key_collisions(connection, users):
+    """Login keys shared by several users: (column, key, [(id, username or email), ...]) for each.
+
+    `users` is the user table; keys are unique, but databases from before
+    they were can hold case variants such as 'Bob' and 'bob'.
+    """
+    collisions = []
+    for column, source in (('username_key', 'username'), ('email_key', 'email')):
+        key_column = users.c[column]
+        shared = select(key_column).where(key_column.isnot(None)).group_by(key_column).having(func.count() > 1)
+        for key in connection.execute(shared).scalars():
+            rows = connection.execute(
+                select(users.c.id, users.c[source]).where(key_column == key).order_by(users.c.id)
+            ).all()
+            collisions.append((column, key, [tuple(row) for row in rows]))
+    return collisions
+
+def report_login_key_collisions(collisions):
+    for column, key, users in collisions:
+        names = ', '.join(f'{value!r} (id {user_id})' for user_id, value in users)
+        print(f"Users share the {column} {key!r}: {names}; change all but one so that each login names one user")
+
+def ensure_login_keys():
+    """Fill in the login keys of users stored before they existed, and report keys shared by several users.
+
+    Returns whether every key is unique; the unique indexes on the keys
+    can only be built then.
+    """
+    from extensions import db
+    from models import User
+    users = User.query.filter((User.username_key.is_(None)) | (User.email_key.is_(None))).all()
+    for user in users:
+        user.username_key = login_key(user.username)
+        user.email_key = login_key(user.email)
+    if users:
+        db.session.commit()
+    with db.engine.connect() as connection:
+        collisions = login_key_collisions(connection, User.__table__)
+    report_login_key_collisions(collisions)
+    return not collisions
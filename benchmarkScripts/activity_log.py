@@ -0,0 +1,108 @@
+"""Compare writing activity events one INSERT per request with the batched ActivityWriter.
+
+Request threads each record events against a throwaway SQLite database
+(with the PRAGMAs of database.py): once committing one INSERT per event,
+as a naive audit log would, and once queueing them on activity.py's
+ActivityWriter, which writes them in batches from its own thread. Reports
+event throughput, the time a request spends recording an event, and how
+many write transactions each approach took.
+
+Usage: python benchmarkScripts/activity_log.py [--threads 8] [--events 2000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, func
+from extensions import db
+from models import ActivityEvent
+from database import make_engine
+from activity import ActivityWriter
+
+def event_row(thread, number):
+    return {
+        'created_at': datetime.utcnow(),
+        'user_id': thread,
+        'username': f'bench{thread}',
+        'action': 'transaction.create',
+        'target_id': number,
+        'details': f'Expense: Food {number}.00',
+        'quantity': 1
+    }
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def run(name, args, record_factory):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine('sqlite:///' + os.path.join(tmp, 'bench.db'))
+        db.metadata.create_all(engine, tables=[ActivityEvent.__table__])
+        record, finish, transactions = record_factory(engine)
+
+        latencies = [[] for _ in range(args.threads)]
+
+        def request_thread(thread):
+            for number in range(args.events):
+                start = time.perf_counter()
+                record(event_row(thread, number))
+                latencies[thread].append((time.perf_counter() - start) * 1000)
+
+        threads = [threading.Thread(target=request_thread, args=(thread,)) for thread in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        finish()
+        elapsed = time.perf_counter() - start
+
+        with engine.connect() as connection:
+            stored = connection.execute(select(func.count(ActivityEvent.id))).scalar()
+        engine.dispose()
+
+    timings = [value for thread_latencies in latencies for value in thread_latencies]
+    print(f'{name:8} {stored} events in {elapsed:6.2f}s ({stored / elapsed:8.0f} events/s)  '
+          f'record p50 {percentile(timings, 0.5):7.3f}ms  p99 {percentile(timings, 0.99):7.3f}ms  '
+          f'write transactions {transactions()}')
+    return stored
+
+def direct(engine):
+    """One INSERT and commit per event."""
+    count = [0]
+    lock = threading.Lock()
+
+    def record(row):
+        with engine.begin() as connection:
+            connection.execute(ActivityEvent.__table__.insert(), row)
+        with lock:
+            count[0] += 1
+
+    return record, lambda: None, lambda: count[0]
+
+def batched(args):
+    def factory(engine):
+        writer = ActivityWriter(engine, args.batch_events, args.batch_ms)
+        return lambda row: writer.record(**row), writer.flush, lambda: writer.batches
+    return factory
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--events', type=int, default=2000, help='events recorded by each thread')
+    parser.add_argument('--batch-events', type=int, default=100)
+    parser.add_argument('--batch-ms', type=int, default=1000)
+    args = parser.parse_args()
+
+    expected = args.threads * args.events
+    stored = [run('direct', args, direct), run('batched', args, batched(args))]
+    sys.exit(0 if stored == [expected, expected] else 1)
+
+if __name__ == '__main__':
+    main()
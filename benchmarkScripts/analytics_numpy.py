@@ -0,0 +1,113 @@
+"""Time the NumPy analytics core against the grouped SQL rollup queries.
+
+Seeds a throwaway SQLite database with one user, times the one-off load
+of the user's rollup columns, then the daily, yearly and category
+breakdowns answered by the grouped SQL queries of aggregations.py and by
+array ops on the loaded columns. Checks both give the same numbers.
+
+Usage: python benchmarkScripts/analytics_numpy.py [--rows 50000] [--repeat 50]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from extensions import db
+from models import User, BudgetTransaction
+from rollups import rebuild_rollups
+from aggregations import period_totals, category_breakdown
+from analytics import load_user_columns
+
+CATEGORIES = ['Food', 'Transportation', 'Entertainment', 'Shopping', 'Bills', 'Salary', 'Other Income']
+
+def create_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + db_path
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def seed(rows):
+    rnd = random.Random(42)
+    user = User(username='bench', email='bench@example.com')
+    user.password_hash = 'x'
+    db.session.add(user)
+    db.session.commit()
+
+    today = datetime.now()
+    batch = []
+    for _ in range(rows):
+        amount = round(rnd.uniform(-500, 500), 2)
+        batch.append({
+            'user_id': user.id,
+            'amount': amount,
+            'description': f'Transaction {rnd.randint(1, 500)}',
+            'type': 'income' if amount > 0 else 'expense',
+            'date': today - timedelta(days=rnd.randint(0, 5 * 365)),
+            'category': rnd.choice(CATEGORIES),
+            'created_at': today
+        })
+    db.session.execute(BudgetTransaction.__table__.insert(), batch)
+    rebuild_rollups(db.session.connection())
+    db.session.commit()
+    return user.id
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+def same(left, right):
+    return len(left) == len(right) and all(
+        all(abs(a - b) < 1e-6 if isinstance(a, float) else a == b for a, b in zip(x, y))
+        for x, y in zip(left, right)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            user_id = seed(args.rows)
+            today = date.today()
+            month_start = today.replace(day=1)
+            month_end = (month_start + timedelta(days=32)).replace(day=1)
+
+            columns, load_ms = timed(lambda: load_user_columns(user_id), args.repeat)
+            print(f'{args.rows} transactions, {len(columns)} rollup rows, columns loaded in {load_ms:.3f} ms\n')
+
+            year_range = (date(today.year - 5, 1, 1), date(today.year + 1, 1, 1))
+            cases = [
+                ('daily (month)',
+                 lambda: period_totals(user_id, month_start, month_end, 'day'),
+                 lambda c: c.period_totals(month_start, month_end, 'day')),
+                ('yearly (5 years)',
+                 lambda: period_totals(user_id, *year_range, 'year'),
+                 lambda c: c.period_totals(*year_range, 'year')),
+                ('categories (all time)',
+                 lambda: category_breakdown(user_id, None, None),
+                 lambda c: c.category_breakdown(None, None)),
+            ]
+            print(f'{"query":24} {"sql":>10} {"numpy":>10}')
+            for name, sql, vectorized in cases:
+                expected, sql_ms = timed(sql, args.repeat)
+                result, numpy_ms = timed(lambda: vectorized(columns), args.repeat)
+                assert same(expected, result), f'{name}: results differ'
+                print(f'{name:24} {sql_ms:8.3f}ms {numpy_ms:8.3f}ms')
+
+            db.session.remove()
+
+if __name__ == '__main__':
+    main()
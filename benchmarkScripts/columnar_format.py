@@ -0,0 +1,119 @@
+"""Compare the CSV and columnar (.btcol) transaction formats.
+
+Generates synthetic transactions, writes them in both formats and reports
+file size, encode time and decode time (CSV decoded the way the importer
+parses it). Checks that the columnar round trip is lossless, and that a
+row group whose blocks decompress to more than its header declares (a zip
+bomb) is rejected without being inflated.
+
+Usage: python benchmarkScripts/columnar_format.py [--rows 200000]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columnar import MAGIC, _LENGTH, encode_row_group, iter_columnar_chunks, iter_columnar_rows
+from importer import iter_csv_rows, parse_transaction_row, parse_columnar_row
+
+CATEGORIES = ['Food', 'Transportation', 'Entertainment', 'Shopping', 'Bills', 'Salary', 'Other Income']
+MERCHANTS = ['REWE', 'Aldi', 'Lidl', 'DB Bahn', 'Netflix', 'Amazon', 'Stadtwerke', 'Employer GmbH', 'Spotify', 'Shell']
+
+def generate(rows):
+    rnd = random.Random(7)
+    start = datetime(2020, 1, 1)
+    for _ in range(rows):
+        amount = round(rnd.uniform(-300, 300), 2)
+        yield (
+            start + timedelta(days=rnd.randint(0, 5 * 365)),
+            f'{rnd.choice(MERCHANTS)} {rnd.choice(["Munich", "Berlin", "Hamburg", "Online"])}',
+            amount,
+            'income' if amount > 0 else 'expense',
+            rnd.choice(CATEGORIES)
+        )
+
+def write_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['Date', 'Description', 'Amount', 'Type', 'Category'])
+    writer.writerows((date.strftime('%Y-%m-%d'), description, amount, type_, category)
+                     for date, description, amount, type_, category in rows)
+    return buffer.getvalue().encode('utf-8')
+
+def zip_bomb(column, inflated_mb=1024):
+    """A one-row file whose column block inflates to inflated_mb megabytes."""
+    group = encode_row_group(list(generate(1)))
+    (header_size,) = _LENGTH.unpack_from(group)
+    header = json.loads(group[_LENGTH.size:_LENGTH.size + header_size])
+    blocks = group[_LENGTH.size + header_size:]
+
+    compressor = zlib.compressobj()
+    chunk = b'\0' * (1 << 20)
+    bomb = b''.join(compressor.compress(chunk) for _ in range(inflated_mb)) + compressor.flush()
+
+    rebuilt = []
+    offset = 0
+    for entry in header['columns']:
+        for key in ('dictionary_size', 'size'):
+            if key not in entry:
+                continue
+            block = blocks[offset:offset + entry[key]]
+            offset += entry[key]
+            if entry['name'] == column and key == ('size' if entry['encoding'] == 'plain' else 'dictionary_size'):
+                block = bomb
+                entry[key] = len(bomb)
+            rebuilt.append(block)
+    header_bytes = json.dumps(header).encode('utf-8')
+    return MAGIC + _LENGTH.pack(len(header_bytes)) + header_bytes + b''.join(rebuilt) + _LENGTH.pack(0)
+
+def check_zip_bombs():
+    for column in ('amount', 'description'):
+        data = zip_bomb(column)
+        start = time.perf_counter()
+        try:
+            list(iter_columnar_rows(io.BytesIO(data)))
+        except ValueError:
+            print(f'{len(data):,d} byte zip bomb in {column} rejected in {time.perf_counter() - start:.3f}s')
+            continue
+        raise AssertionError(f'zip bomb in {column} was decoded')
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+
+    rows = list(generate(args.rows))
+
+    csv_bytes, csv_write = timed(lambda: write_csv(rows))
+    columnar_bytes, columnar_write = timed(lambda: b''.join(iter_columnar_chunks(rows)))
+
+    csv_rows, csv_read = timed(lambda: [parse_transaction_row(row, 1) for _, row in iter_csv_rows(io.BytesIO(csv_bytes))])
+    columnar_rows, columnar_read = timed(lambda: [parse_columnar_row(row, 1) for _, row in iter_columnar_rows(io.BytesIO(columnar_bytes))])
+
+    assert len(csv_rows) == len(columnar_rows) == args.rows
+    assert [(r['date'], r['description'], r['amount'], r['category']) for r in columnar_rows] == \
+        [(date, description, amount, category) for date, description, amount, _, category in rows], 'lossy round trip'
+
+    print(f'{args.rows} transactions')
+    print(f'{"format":10} {"size":>12} {"encode":>10} {"decode":>10}')
+    print(f'{"csv":10} {len(csv_bytes):12,d} {csv_write:9.3f}s {csv_read:9.3f}s')
+    print(f'{"columnar":10} {len(columnar_bytes):12,d} {columnar_write:9.3f}s {columnar_read:9.3f}s')
+    print(f'columnar is {len(csv_bytes) / len(columnar_bytes):.1f}x smaller, decodes {csv_read / columnar_read:.1f}x faster')
+
+    check_zip_bombs()
+
+if __name__ == '__main__':
+    main()
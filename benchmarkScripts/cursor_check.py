@@ -0,0 +1,113 @@
+"""Check that malformed pagination cursors are rejected with a 400, not a 500.
+
+Cursors come back from the client, so anyone can hand-craft one. Builds
+cursors that are well-formed base64 JSON but hold values of the wrong type
+(a number where a timestamp belongs, a null, a nested list, ...) as well
+as undecodable ones, checks that pagination.decode_cursor raises
+ValueError for each, and sends them to every endpoint that takes a cursor
+on a throwaway database, expecting 400 responses.
+
+Usage: python benchmarkScripts/cursor_check.py
+"""
+import argparse
+import base64
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pagination import encode_cursor, decode_cursor
+
+# (label, cursor) for endpoints paging on (timestamp, id)
+BAD_CURSORS = [
+    ('numbers', encode_cursor(1, 2)),
+    ('null timestamp', encode_cursor(None, 'x')),
+    ('null id', encode_cursor('2024-01-01T00:00:00', None)),
+    ('text id', encode_cursor('2024-01-01T00:00:00', 'x')),
+    ('boolean id', encode_cursor('2024-01-01T00:00:00', True)),
+    ('nested list', encode_cursor([1], {'id': 2})),
+    ('bad timestamp', encode_cursor('yesterday', 2)),
+    ('too short', encode_cursor('2024-01-01T00:00:00')),
+    ('not a list', base64.urlsafe_b64encode(b'{"id": 2}').decode('ascii')),
+    ('not base64', '%%%')
+]
+
+# (endpoint, whether it pages the user list, whose cursor also carries the sort)
+ENDPOINTS = [
+    ('/api/transactions', False),
+    ('/admin/feedback/filter', False),
+    ('/api/admin/activity', False),
+    ('/api/admin/users', True)
+]
+
+def check(name, ok, detail=''):
+    print(f'{name:56} {"ok" if ok else "FAILED"}{"  " + detail if detail and not ok else ""}')
+    return ok
+
+def decode_results():
+    results = []
+    for label, cursor in BAD_CURSORS:
+        try:
+            values = decode_cursor(cursor, (datetime, int))
+            results.append(check(f'decode_cursor: {label}', False, f'decoded to {values!r}'))
+        except ValueError:
+            results.append(check(f'decode_cursor: {label}', True))
+        except Exception as e:
+            results.append(check(f'decode_cursor: {label}', False, f'{type(e).__name__}: {e}'))
+    good = encode_cursor(datetime(2024, 1, 1), 2)
+    results.append(check('decode_cursor: valid cursor', decode_cursor(good, (datetime, int)) == [datetime(2024, 1, 1), 2]))
+    return results
+
+def endpoint_results(db_path):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+    from app import app
+    from extensions import db
+    from models import User, UserRole
+    from activity import get_writer
+
+    with app.app_context():
+        admin = User(username='cursoradmin', email='cursoradmin@example.com', role=UserRole.ADMIN)
+        admin.set_password('password123')
+        db.session.add(admin)
+        db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'login_id': 'cursoradmin', 'password': 'password123'})
+
+    results = []
+    for endpoint, user_list in ENDPOINTS:
+        cursors = BAD_CURSORS
+        if user_list:
+            # The user list cursor is (sort, order, sort value, id)
+            cursors = cursors + [
+                ('null sort value', encode_cursor('created_at', 'desc', None, 1)),
+                ('numeric sort value', encode_cursor('created_at', 'desc', 5, 1)),
+                ('text user id', encode_cursor('username', 'asc', 'a', 'x'))
+            ]
+        for label, cursor in cursors:
+            response = client.get(endpoint, query_string={'cursor': cursor})
+            results.append(check(f'{endpoint}: {label}', response.status_code == 400, f'status {response.status_code}'))
+
+    with app.app_context():
+        # Write the logged events (the login) while the database still exists
+        get_writer().flush()
+        db.session.remove()
+        db.engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    results = decode_results()
+    with tempfile.TemporaryDirectory() as tmp:
+        results += endpoint_results(os.path.join(tmp, 'cursor.db'))
+
+    print(f'{sum(results)}/{len(results)} checks passed')
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Time description searches with the FTS5 index against the LIKE fallback.
+
+Seeds a throwaway SQLite database with several users' years of history,
+creates the full-text index of search.py and runs the query behind
+/api/transactions?q= for a few searches, once through the index and once
+with FULL_TEXT_SEARCH off (LIKE over every description of the user).
+Every full-text match must also be a LIKE match; LIKE finds words inside
+other words too ('rent' in 'current'), so it may return more.
+
+Usage: python benchmarkScripts/description_search.py [--users 10] [--rows 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import text
+from extensions import db
+from models import User, BudgetTransaction
+from search import SEARCH_INDEX_DDL, filter_search
+
+MERCHANTS = ['Amazon Marketplace', 'AMAZON PRIME', 'Tesco Stores', 'Shell Fuel', 'Netflix', 'Uber Trip',
+             'Starbucks Coffee', 'Spotify', 'Rent Payment', 'Salary ACME Corp', 'Aldi', 'Deliveroo']
+SEARCHES = ['amazon', 'amaz prime', 'coffee', 'uber trip', 'rent', '12345']
+
+def merchant_names(rnd, count):
+    """Made-up merchant names, so each real one is a small share of the history."""
+    return [
+        ''.join(rnd.choice('bcdfghklmnprstvz') + rnd.choice('aeiou') for _ in range(3)).title() + f' Store {number}'
+        for number in range(count)
+    ]
+
+def create_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + db_path
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def seed(users, rows):
+    rnd = random.Random(21)
+    today = datetime.now()
+    for i in range(users):
+        user = User(username=f'bench{i}', email=f'bench{i}@example.com')
+        user.password_hash = 'x'
+        db.session.add(user)
+    db.session.commit()
+
+    connection = db.session.connection()
+    for statement in SEARCH_INDEX_DDL:
+        connection.execute(text(statement))
+
+    # Each known merchant is about 1% of the history
+    merchants = MERCHANTS + merchant_names(rnd, 1000)
+    for user_id in range(1, users + 1):
+        batch = []
+        for number in range(rows):
+            amount = round(rnd.uniform(-500, 500), 2)
+            merchant = rnd.choice(MERCHANTS) if rnd.random() < 0.12 else rnd.choice(merchants)
+            batch.append({
+                'user_id': user_id,
+                'amount': amount,
+                'description': f'{merchant} #{rnd.randint(1000, 99999)}',
+                'type': 'income' if amount > 0 else 'expense',
+                'date': today - timedelta(days=rnd.randint(0, 10 * 365)),
+                'category': 'Other',
+                'created_at': today
+            })
+        db.session.execute(BudgetTransaction.__table__.insert(), batch)
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+
+def search(app, q, full_text, since=None):
+    app.config['FULL_TEXT_SEARCH'] = full_text
+    query = BudgetTransaction.query.filter_by(user_id=1)
+    if since is not None:
+        query = query.filter(BudgetTransaction.date >= since)
+    query, relevance = filter_search(query, 1, q)
+    order = [BudgetTransaction.date.desc()] if relevance is None else [relevance, BudgetTransaction.date.desc()]
+    return query.with_entities(BudgetTransaction.id).order_by(*order).all()
+
+def timed(app, q, full_text, since=None, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = search(app, q, full_text, since)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return rows, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            seed(args.users, args.rows)
+            print(f'{args.users * args.rows} transactions seeded in {time.perf_counter() - start:.1f}s')
+
+            failed = False
+            # All time, and the last year as with /api/transactions?period=year
+            for period, since in (('all', None), ('year', datetime.now() - timedelta(days=365))):
+                for q in SEARCHES:
+                    fts_rows, fts_ms = timed(app, q, True, since)
+                    like_rows, like_ms = timed(app, q, False, since)
+                    covered = set(fts_rows) <= set(like_rows)
+                    failed = failed or not covered
+                    print(f'{period:4} {q!r:14} fts {len(fts_rows):5} matches {fts_ms:7.2f}ms  '
+                          f'like {len(like_rows):5} matches {like_ms:7.2f}ms{"" if covered else "  MISSING FROM LIKE"}')
+            db.session.remove()
+            db.engine.dispose()
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
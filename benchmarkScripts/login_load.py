@@ -0,0 +1,145 @@
+"""Measure login latency under concurrent load for each password hashing scheme.
+
+Seeds a throwaway SQLite database with users and runs the work of a
+login (look the user up, check the password) from several threads at
+once, as in a burst of logins at the start of the month. Each hashing
+scheme runs with the new case-folded key lookup; the first also runs with
+the old username-or-email OR lookup. Reports throughput and p50/p99
+latency per scheme, plus the cost of the lookups alone.
+
+Usage: python benchmarkScripts/login_load.py [--users 5000] [--threads 8] [--logins 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from extensions import db
+from models import User
+from auth import hash_password, verify_password
+from database import engine_options, configure_engine
+
+PASSWORD = 'correct horse battery'
+# (label, hash_password arguments)
+SCHEMES = [
+    ('scrypt (werkzeug default)', {'method': 'scrypt'}),
+    ('pbkdf2:sha256:600000', {'method': 'pbkdf2:sha256:600000'}),
+    ('bcrypt 10', {'method': 'bcrypt', 'rounds': 10}),
+    ('bcrypt 12', {'method': 'bcrypt', 'rounds': 12})
+]
+
+def create_app(db_path):
+    app = Flask(__name__)
+    uri = 'sqlite:///' + db_path
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri)
+    db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine)
+    return app
+
+def seed(users):
+    for i in range(users):
+        user = User(username=f'Member{i}', email=f'Member{i}@Example.com')
+        user.password_hash = 'x'
+        db.session.add(user)
+    db.session.commit()
+
+def set_all_hashes(password_hash):
+    # One hash for everyone: hashing each user separately would only slow the setup
+    User.query.update({User.password_hash: password_hash})
+    db.session.commit()
+
+def or_lookup(login_id):
+    """The lookup login() did before: exact username or email."""
+    return User.query.filter((User.username == login_id) | (User.email == login_id)).first()
+
+def login_ids(users, count, seed):
+    rnd = random.Random(seed)
+    ids = []
+    for _ in range(count):
+        number = rnd.randrange(users)
+        ids.append(f'member{number}@example.com' if rnd.random() < 0.5 else f'Member{number}')
+    return ids
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def run_logins(app, lookup, ids, threads):
+    """Log in with every id from `threads` threads; returns per-login latencies (ms), elapsed seconds and failures."""
+    latencies, failures = [], []
+    lock = threading.Lock()
+    chunks = [ids[index::threads] for index in range(threads)]
+
+    def worker(chunk):
+        with app.app_context():
+            for login_id in chunk:
+                start = time.perf_counter()
+                user = lookup(login_id)
+                ok = user is not None and verify_password(user.password_hash, PASSWORD)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    if not ok:
+                        failures.append(login_id)
+            db.session.remove()
+
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies, time.perf_counter() - start, failures
+
+def report(label, latencies, elapsed, failures):
+    print(f'{label:38} {len(latencies) / elapsed:7.1f} logins/s  p50 {percentile(latencies, 0.5):8.1f}ms  '
+          f'p99 {percentile(latencies, 0.99):8.1f}ms{"  FAILED " + str(len(failures)) if failures else ""}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=200)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            seed(args.users)
+
+            # Lookups alone: the OR of two exact matches cannot find 'member1@example.com'
+            exact_ids = [f'Member{number}@Example.com' for number in range(0, args.users, max(1, args.users // 2000))]
+            for label, lookup, ids in (('or lookup (exact case)', or_lookup, exact_ids),
+                                       ('key lookup (any case)', User.find_by_login, login_ids(args.users, len(exact_ids), 1))):
+                start = time.perf_counter()
+                found = sum(lookup(login_id) is not None for login_id in ids)
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f'{label:38} {elapsed / len(ids) * 1000:7.1f}us per lookup, found {found}/{len(ids)}')
+                failed = failed or found != len(ids)
+
+            for index, (label, options) in enumerate(SCHEMES):
+                set_all_hashes(hash_password(PASSWORD, **options))
+                if index == 0:
+                    latencies, elapsed, failures = run_logins(app, or_lookup, [f'Member{number}' for number in range(args.logins)], args.threads)
+                    report(f'{label}, or lookup', latencies, elapsed, failures)
+                latencies, elapsed, failures = run_logins(app, User.find_by_login, login_ids(args.users, args.logins, 2), args.threads)
+                report(label, latencies, elapsed, failures)
+                failed = failed or bool(failures)
+            db.session.remove()
+            db.engine.dispose()
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Check that `flask db upgrade` brings an existing database to the current schema.
+
+Copies a database (by default the tracked instance/budget_tracker.db,
+which has the schema the app shipped with before the migrations of the
+performance work) and runs the migration chain on the copy through the
+Flask CLI, as in the README install steps. Then checks that:
+
+- the upgrade exits cleanly and ends at the head revision;
+- the migrated schema matches the models (FTS5 tables aside, which only
+  the migrations and search.py know about);
+- downgrading back to the starting revision and upgrading again works;
+- the app starts on the migrated database.
+
+Usage: python benchmarkScripts/migration_check.py [--database instance/budget_tracker.db]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import sqlalchemy as sa
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from extensions import db
+from search import SEARCH_INDEXES
+import models  # registers the tables on db.metadata
+
+def flask(db_path, *args):
+    """Run a flask CLI command against db_path; returns the completed process."""
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + db_path)
+    return subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'app', *args],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+
+def current_revision(engine):
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def schema_differences(engine):
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={'compare_type': True})
+        differences = compare_metadata(context, db.metadata)
+    # FTS5 virtual tables and their shadow tables are not models
+    return [
+        difference for difference in differences
+        if not (difference[0] == 'remove_table' and difference[1].name.startswith(tuple(SEARCH_INDEXES)))
+    ]
+
+def check(name, ok, detail=''):
+    print(f'{name:40} {"ok" if ok else "FAILED"}{"  " + detail if detail and not ok else ""}')
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', default=os.path.join(ROOT, 'instance', 'budget_tracker.db'))
+    args = parser.parse_args()
+
+    head = ScriptDirectory(os.path.join(ROOT, 'migrations')).get_current_head()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'migrate.db')
+        shutil.copyfile(args.database, db_path)
+        engine = sa.create_engine('sqlite:///' + db_path)
+        start = current_revision(engine)
+        print(f'{args.database}: revision {start}, head {head}')
+
+        upgrade = flask(db_path, 'db', 'upgrade')
+        results.append(check('upgrade', upgrade.returncode == 0, upgrade.stderr.strip()[-500:]))
+        results.append(check('at head', current_revision(engine) == head, str(current_revision(engine))))
+        differences = schema_differences(engine)
+        results.append(check('schema matches the models', not differences, '; '.join(map(str, differences))[:500]))
+
+        if start is not None:
+            downgrade = flask(db_path, 'db', 'downgrade', start)
+            results.append(check(f'downgrade to {start}', downgrade.returncode == 0, downgrade.stderr.strip()[-500:]))
+            upgrade = flask(db_path, 'db', 'upgrade')
+            results.append(check('upgrade again', upgrade.returncode == 0 and current_revision(engine) == head,
+                                 upgrade.stderr.strip()[-500:]))
+
+        started = subprocess.run(
+            [sys.executable, '-c', 'import app'],
+            cwd=ROOT, env=dict(os.environ, DATABASE_URL='sqlite:///' + db_path), capture_output=True, text=True
+        )
+        results.append(check('app starts on the migrated database', started.returncode == 0, started.stderr.strip()[-500:]))
+        engine.dispose()
+
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Check that passwords longer than bcrypt's 72-byte limit are hashed whole.
+
+bcrypt reads at most 72 bytes of its input (bcrypt 5 raises ValueError
+beyond that), so auth.py hashes the base64 SHA-256 digest of the password
+instead. Checks that long passwords differing only after byte 72 no longer
+verify each other, that no length raises, that hashes stored before the
+pre-hash (bare '$2b$...') still verify and are marked for rehashing, and
+that a long-password user can log in on a throwaway database, with a
+legacy hash being replaced at login.
+
+Usage: python benchmarkScripts/password_check.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import bcrypt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from auth import BCRYPT_SHA256_PREFIX, hash_password, verify_password, needs_rehash
+
+# Cheapest cost bcrypt allows; the scheme, not the cost, is under test
+ROUNDS = 4
+
+def check(name, ok, detail=''):
+    print(f'{name:64} {"ok" if ok else "FAILED"}{"  " + detail if detail and not ok else ""}')
+    return ok
+
+def verifies(password_hash, password):
+    try:
+        return verify_password(password_hash, password)
+    except ValueError as e:
+        return f'ValueError: {e}'
+
+def hash_results():
+    results = []
+    long_password = 'x' * 80
+    long_hash = hash_password(long_password, 'bcrypt', ROUNDS)
+    results.append(check('long password verifies', verifies(long_hash, long_password) is True))
+    results.append(check('differing after byte 72 does not verify', verifies(long_hash, 'x' * 72 + 'y' * 8) is False))
+    results.append(check('its first 72 bytes do not verify', verifies(long_hash, 'x' * 72) is False))
+
+    # 100 bytes of UTF-8 in 50 characters
+    umlauts = 'ü' * 50
+    umlaut_hash = hash_password(umlauts, 'bcrypt', ROUNDS)
+    results.append(check('long UTF-8 password verifies', verifies(umlaut_hash, umlauts) is True))
+    results.append(check('1000-byte password verifies', verifies(hash_password('p' * 1000, 'bcrypt', ROUNDS), 'p' * 1000) is True))
+
+    results.append(check('new hash is marked pre-hashed', long_hash.startswith(BCRYPT_SHA256_PREFIX + '$2b$')))
+    results.append(check('new hash at the configured cost needs no rehash', not needs_rehash(long_hash, 'bcrypt', ROUNDS)))
+    results.append(check('new hash at another cost needs a rehash', needs_rehash(long_hash, 'bcrypt', ROUNDS + 1)))
+
+    # Hashes stored before the pre-hash: bcrypt over the first 72 bytes of the password
+    legacy = bcrypt.hashpw(b'password123', bcrypt.gensalt(ROUNDS)).decode('ascii')
+    results.append(check('legacy bcrypt hash verifies', verifies(legacy, 'password123') is True))
+    results.append(check('legacy bcrypt hash rejects a wrong password', verifies(legacy, 'password124') is False))
+    results.append(check('legacy bcrypt hash needs a rehash', needs_rehash(legacy, 'bcrypt', ROUNDS)))
+    legacy_long = bcrypt.hashpw(('x' * 72).encode('utf-8'), bcrypt.gensalt(ROUNDS)).decode('ascii')
+    results.append(check('legacy hash of a long password verifies without raising', verifies(legacy_long, long_password) is True))
+
+    werkzeug = hash_password('password123', 'pbkdf2:sha256:1000')
+    results.append(check('werkzeug hash verifies', verifies(werkzeug, 'password123') is True))
+    results.append(check('werkzeug hash needs a rehash to bcrypt', needs_rehash(werkzeug, 'bcrypt', ROUNDS)))
+    return results
+
+def login_results(db_path):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+    from app import app
+    from extensions import db
+    from models import User
+    from activity import get_writer
+
+    long_password = 'correct horse battery staple ' * 4
+    with app.app_context():
+        user = User(username='longpass', email='longpass@example.com')
+        user.set_password(long_password)
+        legacy = User(username='legacypass', email='legacypass@example.com')
+        legacy.password_hash = bcrypt.hashpw(long_password.encode('utf-8')[:72], bcrypt.gensalt(ROUNDS)).decode('ascii')
+        db.session.add_all([user, legacy])
+        db.session.commit()
+
+    results = []
+    for username, password, expected in (
+        ('longpass', long_password, True),
+        ('longpass', long_password[:72] + 'tail that differs after byte 72!', False),
+        ('legacypass', long_password, True)
+    ):
+        client = app.test_client()
+        client.post('/login', data={'login_id': username, 'password': password})
+        response = client.get('/dashboard')
+        logged_in = response.status_code == 200
+        results.append(check(f'login {username} ({len(password.encode())} bytes, expect {"ok" if expected else "refused"})',
+                             logged_in == expected, f'status {response.status_code}'))
+
+    with app.app_context():
+        stored = User.query.filter_by(username='legacypass').first().password_hash
+        results.append(check('legacy hash replaced at login', stored.startswith(BCRYPT_SHA256_PREFIX)))
+        # Write the logged events (the logins) while the database still exists
+        get_writer().flush()
+        db.session.remove()
+        db.engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    results = hash_results()
+    with tempfile.TemporaryDirectory() as tmp:
+        results += login_results(os.path.join(tmp, 'password.db'))
+
+    print(f'{sum(results)}/{len(results)} checks passed')
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == '__main__':
+    main()
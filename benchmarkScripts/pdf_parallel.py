@@ -0,0 +1,92 @@
+"""Measure parallel PDF extraction speedup against the number of workers.
+
+Generates a synthetic multi-page credit card statement, parses it with
+extract_transactions_from_pdf() sequentially and with 2..N worker
+processes, checks every run returns the same transactions in the same
+order and prints the speedup per worker count.
+
+Usage: python benchmarkScripts/pdf_parallel.py [--pages 200] [--lines 40] [--max-workers 8]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdfProcessor import extract_transactions_from_pdf
+
+def statement_line(page, line):
+    """One transaction line in the DD.MM.YYYY description place amount layout."""
+    return f'{line % 28 + 1:02d}.{page % 12 + 1:02d}.2025 SHOP {page}-{line} Munich -{line + 1},{page % 100:02d}'
+
+def write_statement_pdf(path, pages, lines_per_page):
+    """Write a minimal uncompressed PDF with one text line per transaction."""
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+    # Page objects point at their parent, which is written after all pages
+    pages_id = len(objects) + 2 * pages + 1
+    page_ids = []
+    for page in range(pages):
+        lines = [statement_line(page, line).encode() for line in range(lines_per_page)]
+        stream = b'BT /F1 9 Tf 40 800 Td 12 TL ' + b' '.join(b'(' + line + b") '" for line in lines) + b' ET'
+        content = add(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        page_ids.append(add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>' % (pages_id, font, content)
+        ))
+    kids = b' '.join(b'%d 0 R' % page_id for page_id in page_ids)
+    add(b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % pages)
+    catalog = add(b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id)
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, catalog, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+def timed_extract(pdf_path, workers):
+    # extract_transactions_from_pdf prints every transaction, keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        transactions = extract_transactions_from_pdf(pdf_path, workers=workers)
+        elapsed = time.perf_counter() - start
+    return transactions, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--lines', type=int, default=40)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'statement.pdf')
+        write_statement_pdf(pdf_path, args.pages, args.lines)
+        print(f'{args.pages} pages x {args.lines} lines, {os.cpu_count()} CPUs')
+
+        baseline, sequential = timed_extract(pdf_path, None)
+        assert len(baseline) == args.pages * args.lines, f'parsed {len(baseline)} transactions'
+        print(f'workers  1: {sequential:7.2f} s  speedup 1.00x')
+
+        for workers in range(2, args.max_workers + 1):
+            transactions, elapsed = timed_extract(pdf_path, workers)
+            assert transactions == baseline, f'{workers} workers returned different transactions'
+            print(f'workers {workers:2d}: {elapsed:7.2f} s  speedup {sequential / elapsed:.2f}x')
+
+if __name__ == '__main__':
+    main()
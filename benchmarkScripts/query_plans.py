@@ -0,0 +1,189 @@
+"""Check that the per-endpoint queries use an index and time them.
+
+Seeds a throwaway SQLite database, runs EXPLAIN QUERY PLAN for the query
+behind each endpoint and fails if one of them falls back to a full table
+scan of budget_transaction or daily_rollup.
+
+Usage: python benchmarkScripts/query_plans.py [--users 20] [--rows 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import select, func, case, text, and_, or_
+from extensions import db
+from models import User, BudgetTransaction, DailyRollup
+from rollups import rebuild_rollups
+
+CATEGORIES = ['Food', 'Transportation', 'Entertainment', 'Shopping', 'Bills', 'Salary', 'Other Income']
+INDEXED_TABLES = ('budget_transaction', 'daily_rollup')
+
+def create_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + db_path
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def seed(users, rows):
+    rnd = random.Random(42)
+    today = datetime.now()
+    for i in range(users):
+        user = User(username=f'bench{i}', email=f'bench{i}@example.com')
+        user.password_hash = 'x'
+        db.session.add(user)
+    db.session.commit()
+
+    for user_id in range(1, users + 1):
+        batch = []
+        for _ in range(rows):
+            amount = round(rnd.uniform(-500, 500), 2)
+            batch.append({
+                'user_id': user_id,
+                'amount': amount,
+                'description': f'Transaction {rnd.randint(1, 500)}',
+                'type': 'income' if amount > 0 else 'expense',
+                'date': today - timedelta(days=rnd.randint(0, 5 * 365)),
+                'category': rnd.choice(CATEGORIES),
+                'created_at': today
+            })
+        db.session.execute(BudgetTransaction.__table__.insert(), batch)
+    rebuild_rollups(db.session.connection())
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+
+def endpoint_queries(user_id):
+    """The query behind each endpoint, keyed by a readable name."""
+    now = datetime.now()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    year_start = datetime(now.year, 1, 1)
+    amount = BudgetTransaction.amount
+    day = func.strftime('%Y-%m', DailyRollup.day)
+    net = DailyRollup.income_sum - DailyRollup.expense_sum
+
+    return {
+        'home: balances of today/month/all time': select(
+            func.sum(case((DailyRollup.day == now.date(), net), else_=0)),
+            func.sum(case((DailyRollup.day.between(month_start.date(), now.date()), net), else_=0)),
+            func.sum(net)).where(
+            DailyRollup.user_id == user_id),
+        'home/dashboard: recent transactions': select(BudgetTransaction).where(
+            BudgetTransaction.user_id == user_id).order_by(BudgetTransaction.date.desc()).limit(5),
+        'dashboard: yearly transactions': select(BudgetTransaction).where(
+            BudgetTransaction.user_id == user_id,
+            BudgetTransaction.date >= datetime(now.year - 4, 1, 1),
+            BudgetTransaction.date <= now).order_by(BudgetTransaction.date.desc()),
+        'GET /api/transactions?period=month': select(BudgetTransaction).where(
+            BudgetTransaction.user_id == user_id,
+            BudgetTransaction.date >= now - timedelta(days=30)).order_by(BudgetTransaction.date.desc()),
+        'GET /api/transactions?limit=&cursor=': select(BudgetTransaction.date, BudgetTransaction.id, amount).where(
+            BudgetTransaction.user_id == user_id,
+            BudgetTransaction.date <= month_start,
+            or_(BudgetTransaction.date < month_start,
+                and_(BudgetTransaction.date == month_start, BudgetTransaction.id < 1000))
+        ).order_by(BudgetTransaction.date.desc(), BudgetTransaction.id.desc()).limit(101),
+        'GET /api/transactions/<id>': select(BudgetTransaction).where(
+            BudgetTransaction.id == 1,
+            BudgetTransaction.user_id == user_id),
+        '/transactions?type=income': select(BudgetTransaction).where(
+            BudgetTransaction.user_id == user_id,
+            amount > 0).order_by(BudgetTransaction.date.desc()),
+        '/transactions?category=Food': select(BudgetTransaction).where(
+            BudgetTransaction.user_id == user_id,
+            BudgetTransaction.category == 'Food').order_by(BudgetTransaction.date.desc()),
+        '/api/daily-transactions/<year>/<month>': select(BudgetTransaction).where(
+            BudgetTransaction.user_id == user_id,
+            BudgetTransaction.date >= month_start,
+            BudgetTransaction.date < month_start + timedelta(days=31)).order_by(BudgetTransaction.date.desc()),
+        '/api/financial-health: spending': select(func.sum(amount)).where(
+            BudgetTransaction.user_id == user_id,
+            BudgetTransaction.date >= month_start,
+            BudgetTransaction.date <= now,
+            amount < 0),
+        '/api/financial-health: categories': select(BudgetTransaction.category, func.sum(amount)).where(
+            BudgetTransaction.user_id == user_id,
+            BudgetTransaction.date >= month_start,
+            BudgetTransaction.date <= now,
+            amount < 0).group_by(BudgetTransaction.category),
+        '/api/transactions/export': select(BudgetTransaction).where(
+            BudgetTransaction.user_id == user_id).order_by(BudgetTransaction.date.desc()),
+        'import: duplicate check per batch': select(BudgetTransaction.fingerprint, func.count()).where(
+            BudgetTransaction.user_id == user_id,
+            BudgetTransaction.fingerprint.in_([f'{i:040x}' for i in range(1000)])).group_by(BudgetTransaction.fingerprint),
+        'rollup: monthly overview': select(day, func.sum(DailyRollup.income_sum), func.sum(DailyRollup.expense_sum)).where(
+            DailyRollup.user_id == user_id,
+            DailyRollup.day >= year_start.date(),
+            DailyRollup.day < date(now.year + 1, 1, 1)).group_by(day),
+        'rollup: category stats': select(DailyRollup.category, func.sum(DailyRollup.income_sum), func.sum(DailyRollup.expense_count)).where(
+            DailyRollup.user_id == user_id,
+            DailyRollup.day >= year_start.date()).group_by(DailyRollup.category),
+    }
+
+def literal(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def explain(connection, statement):
+    """Return (sql, params, plan details) for a statement."""
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    args = tuple(literal(params[name]) for name in compiled.positiontup)
+    plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), args).fetchall()
+    return str(compiled), args, [row[-1] for row in plan]
+
+def uses_index(details):
+    """True when every step touching an indexed table is an index search."""
+    for detail in details:
+        words = detail.split()
+        if len(words) > 1 and words[1] in INDEXED_TABLES:
+            if words[0] != 'SEARCH':
+                return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=2000, help='transactions per user')
+    parser.add_argument('--repeat', type=int, default=20, help='timed executions per query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            seed(args.users, args.rows)
+            connection = db.session.connection()
+
+            failures = []
+            for name, statement in endpoint_queries(user_id=args.users // 2).items():
+                sql, params, details = explain(connection, statement)
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    connection.exec_driver_sql(sql, params).fetchall()
+                elapsed = (time.perf_counter() - start) / args.repeat * 1000
+
+                ok = uses_index(details)
+                if not ok:
+                    failures.append(name)
+                print(f"{'OK  ' if ok else 'SCAN'} {elapsed:8.3f} ms  {name}")
+                for detail in details:
+                    print(f'                     {detail}')
+
+            db.session.remove()
+
+    total = args.users * args.rows
+    print(f'\n{total} transactions, {len(failures)} queries without index')
+    assert not failures, f'Full table scans in: {", ".join(failures)}'
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Measure reader latency while a bulk import writes, with and without WAL.
+
+Seeds a throwaway SQLite database, then runs a CSV-style bulk import
+through importer.import_rows while reader threads keep issuing the
+queries behind the transaction list and the monthly overview. Runs once
+with SQLite's default rollback journal and once with the PRAGMAs of
+database.py (WAL, synchronous=NORMAL, busy_timeout, cache/mmap sizes),
+and reports import throughput and reader latency percentiles.
+
+Usage: python benchmarkScripts/sqlite_concurrency.py [--rows 50000] [--readers 4]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.exc import OperationalError
+from extensions import db
+from models import User, BudgetTransaction, DailyRollup
+from importer import import_rows
+from database import engine_options, configure_engine, sqlite_pragmas
+
+CATEGORIES = ['Food', 'Transportation', 'Entertainment', 'Shopping', 'Bills', 'Salary', 'Other Income']
+
+def make_rows(count, seed):
+    rnd = random.Random(seed)
+    today = date.today()
+    for number in range(count):
+        yield number, {
+            'date': (today - timedelta(days=rnd.randint(0, 3 * 365))).isoformat(),
+            'description': f'Import {seed} row {number}',
+            'amount': f'{rnd.uniform(-500, 500):.2f}',
+            'category': rnd.choice(CATEGORIES)
+        }
+
+def create_database(db_path, pragmas, seed_rows):
+    uri = 'sqlite:///' + db_path
+    engine = configure_engine(create_engine(uri, **engine_options(uri)), pragmas)
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), {
+            'username': 'bench', 'email': 'bench@example.com', 'password_hash': 'x'
+        })
+    import_rows(make_rows(seed_rows, 0), 1, engine=engine)
+    return engine
+
+def reader_queries(user_id):
+    today = date.today()
+    month = func.strftime('%Y-%m', DailyRollup.day)
+    return [
+        select(BudgetTransaction).where(
+            BudgetTransaction.user_id == user_id
+        ).order_by(BudgetTransaction.date.desc()).limit(100),
+        select(month, func.sum(DailyRollup.income_sum), func.sum(DailyRollup.expense_sum)).where(
+            DailyRollup.user_id == user_id,
+            DailyRollup.day >= date(today.year, 1, 1)
+        ).group_by(month)
+    ]
+
+def reader(engine, queries, stop, latencies, errors):
+    while not stop.is_set():
+        for query in queries:
+            start = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    connection.execute(query).all()
+            except OperationalError:
+                errors.append(1)
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def run(name, pragmas, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_database(os.path.join(tmp, 'bench.db'), pragmas, args.seed_rows)
+        queries = reader_queries(1)
+
+        stop = threading.Event()
+        latencies, errors = [], []
+        threads = [
+            threading.Thread(target=reader, args=(engine, queries, stop, latencies, errors))
+            for _ in range(args.readers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        start = time.perf_counter()
+        report = import_rows(make_rows(args.rows, 1), 1, engine=engine)
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    print(f'{name:9} import {report.imported} rows in {elapsed:6.2f}s ({report.imported / elapsed:8.0f} rows/s)  '
+          f'reads {len(latencies):6}  p50 {percentile(latencies, 0.5):7.2f}ms  '
+          f'p95 {percentile(latencies, 0.95):7.2f}ms  max {max(latencies, default=0):8.2f}ms  errors {len(errors)}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--seed-rows', type=int, default=20000)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+
+    run('default', {}, args)
+    run('tuned', sqlite_pragmas(), args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Check the default statement profile against known statement lines.
+
+Runs a table of lines through pdfProcessor's default StatementProfile and
+compares the parsed place and amount (or the rejection of the line) with
+the expected ones, covering comma decimals with dot thousands (1.234,56)
+as well as dot decimals (12.50), which the parser before statement
+profiles also read.
+
+Usage: python benchmarkScripts/statement_lines.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdfProcessor import get_statement_profile
+
+# (line, expected (place, amount), or None when the line must be skipped)
+CASES = [
+    ('01.02.2024 Shop Berlin 12.50', ('Berlin', 12.5)),
+    ('01.02.2024 Shop Berlin -12.5', ('Berlin', -12.5)),
+    ('01.02.2024 Shop Berlin 1.234,56', ('Berlin', 1234.56)),
+    ('01.02.2024 Shop Berlin -1.234.567,89', ('Berlin', -1234567.89)),
+    ('03.10.2024 REWE Markt Munich -12,50', ('Munich', -12.5)),
+    ('03.10.2024 REWE Markt Munich 1234', ('Munich', 1234.0)),
+    ('03.10.2024 REWE Markt Munich 1234.56', ('Munich', 1234.56)),
+    # Three digits after the dot are a thousands group
+    ('03.10.2024 REWE Markt Munich 1.234', ('Munich', 1234.0)),
+    ('03.10.2024 Munich 3', ('Munich', 3.0)),
+    ('Abrechnung vom 01.09.2024 bis 30.09.2024 12,00', None),
+    ('01.02.2024 Mindestbetrag Berlin 25,00', None),
+    ('Shop Berlin 12.50', None)
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    profile = get_statement_profile()
+    failed = 0
+    for line, expected in CASES:
+        transaction = profile.parse_line(line)
+        got = (transaction['Category'], transaction['Amount']) if transaction else None
+        ok = got == expected
+        failed += not ok
+        print(f'{"ok  " if ok else "FAIL"} {line!r:52} {got}' + ('' if ok else f' (expected {expected})'))
+
+    print(f'{len(CASES) - failed}/{len(CASES)} lines parsed as expected')
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+# Compact column-block file format for bulk transaction export/import.
+#
+#   MAGIC
+#   row group*    uint32 header length, JSON header, column blocks
+#   uint32 0      end of file
+#
+# The row group header lists the row count and, per column, its encoding
+# and block sizes (and the decompressed dictionary size). Numeric columns are packed arrays; text columns are
+# dictionary encoded (distinct strings + array of codes). Every block is
+# zlib compressed. Integers are little-endian.
+import json
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta
+
+MAGIC = b'BTCOL1\n'
+
+# Rows per row group
+ROW_GROUP_SIZE = 65536
+
+EPOCH = datetime(1970, 1, 1)
+
+# Column name and encoding, in file order
+COLUMNS = [
+    ('date', 'plain'),  # int64 microseconds since the epoch
+    ('amount', 'plain'),  # float64
+    ('type', 'dict'),
+    ('category', 'dict'),
+    ('description', 'dict'),
+]
+
+_LENGTH = struct.Struct('<I')
+
+# Average UTF-8 bytes per distinct string a dictionary may declare when
+# read, bounding its decompressed size
+MAX_TEXT_BYTES = 1024
+
+def _to_bytes(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _from_bytes(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def _code_typecode(size):
+    """Smallest unsigned array typecode able to index a dictionary of size entries."""
+    if size <= 0xFF:
+        return 'B'
+    if size <= 0xFFFF:
+        return 'H'
+    return 'I'
+
+def _encode_dictionary(values):
+    """Return (distinct strings, codes) for a text column."""
+    positions = {}
+    codes = []
+    for value in values:
+        code = positions.get(value)
+        if code is None:
+            code = positions[value] = len(positions)
+        codes.append(code)
+    return list(positions), array(_code_typecode(len(positions)), codes)
+
+def _pack_strings(strings):
+    """Length-prefixed UTF-8 strings."""
+    parts = []
+    for value in strings:
+        encoded = value.encode('utf-8')
+        parts.append(_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    return b''.join(parts)
+
+def _unpack_strings(data, count):
+    strings = []
+    offset = 0
+    for _ in range(count):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        strings.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+    return strings
+
+def encode_row_group(rows):
+    """Encode (date, description, amount, type, category) tuples as one row group."""
+    columns = {
+        'date': array('q', ((date - EPOCH) // timedelta(microseconds=1) for date, _, _, _, _ in rows)),
+        'amount': array('d', (amount for _, _, amount, _, _ in rows)),
+        'type': [type_ for _, _, _, type_, _ in rows],
+        'category': [category for _, _, _, _, category in rows],
+        'description': [description for _, description, _, _, _ in rows],
+    }
+
+    header = {'rows': len(rows), 'columns': []}
+    blocks = []
+    for name, encoding in COLUMNS:
+        if encoding == 'plain':
+            values = zlib.compress(_to_bytes(columns[name]))
+            header['columns'].append({'name': name, 'encoding': encoding, 'typecode': columns[name].typecode, 'size': len(values)})
+            blocks.append(values)
+        else:
+            strings, codes = _encode_dictionary(columns[name])
+            packed = _pack_strings(strings)
+            dictionary = zlib.compress(packed)
+            codes_block = zlib.compress(_to_bytes(codes))
+            header['columns'].append({
+                'name': name,
+                'encoding': encoding,
+                'typecode': codes.typecode,
+                'entries': len(strings),
+                'dictionary_bytes': len(packed),
+                'dictionary_size': len(dictionary),
+                'size': len(codes_block)
+            })
+            blocks.append(dictionary)
+            blocks.append(codes_block)
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    return _LENGTH.pack(len(header_bytes)) + header_bytes + b''.join(blocks)
+
+def iter_columnar_chunks(rows, row_group_size=ROW_GROUP_SIZE):
+    """Yield the file as byte chunks, one per row group, from an iterable of row tuples."""
+    yield MAGIC
+    group = []
+    for row in rows:
+        group.append(row)
+        if len(group) >= row_group_size:
+            yield encode_row_group(group)
+            group = []
+    if group:
+        yield encode_row_group(group)
+    yield _LENGTH.pack(0)
+
+def _inflate(data, max_size):
+    """Decompress a block, refusing to produce more than max_size bytes (zip bombs)."""
+    inflater = zlib.decompressobj()
+    try:
+        values = inflater.decompress(data, max_size)
+        # Input may be left over at the limit; it must not hold more output
+        while inflater.unconsumed_tail and not inflater.eof:
+            if inflater.decompress(inflater.unconsumed_tail, 1):
+                raise ValueError('Columnar block larger than its row group declares')
+    except zlib.error:
+        raise ValueError('Corrupt columnar block')
+    return values
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError('Truncated columnar file')
+    return data
+
+def iter_columnar_groups(stream):
+    """Yield each row group of a binary stream as a dict of decoded columns."""
+    if _read_exact(stream, len(MAGIC)) != MAGIC:
+        raise ValueError('Not a columnar transactions file')
+
+    while True:
+        (header_size,) = _LENGTH.unpack(_read_exact(stream, _LENGTH.size))
+        if header_size == 0:
+            return
+        header = json.loads(_read_exact(stream, header_size))
+        rows = header['rows']
+        # Writers never exceed ROW_GROUP_SIZE; the row count bounds every block below
+        if not 0 < rows <= ROW_GROUP_SIZE:
+            raise ValueError('Corrupt columnar row group')
+
+        columns = {}
+        for column in header['columns']:
+            values_size = rows * array(column['typecode']).itemsize
+            if column['encoding'] == 'plain':
+                columns[column['name']] = _from_bytes(column['typecode'], _inflate(_read_exact(stream, column['size']), values_size))
+            else:
+                limit = column['entries'] * (_LENGTH.size + MAX_TEXT_BYTES)
+                # Files written before dictionary_bytes was recorded only get the limit
+                dictionary_bytes = column.get('dictionary_bytes', limit)
+                if not 0 <= column['entries'] <= rows or not 0 <= dictionary_bytes <= limit:
+                    raise ValueError('Corrupt columnar row group')
+                dictionary = _inflate(_read_exact(stream, column['dictionary_size']), dictionary_bytes)
+                strings = _unpack_strings(dictionary, column['entries'])
+                codes = _from_bytes(column['typecode'], _inflate(_read_exact(stream, column['size']), values_size))
+                columns[column['name']] = [strings[code] for code in codes]
+
+        if any(len(values) != rows for values in columns.values()):
+            raise ValueError('Corrupt columnar row group')
+        yield rows, columns
+
+def iter_columnar_rows(stream):
+    """Yield (row_number, row) pairs, where row maps column names to decoded values."""
+    row_number = 0
+    for rows, columns in iter_columnar_groups(stream):
+        dates = [EPOCH + timedelta(microseconds=value) for value in columns['date']]
+        for i in range(rows):
+            row_number += 1
+            yield row_number, {
+                'date': dates[i],
+                'amount': columns['amount'][i],
+                'type': columns['type'][i],
+                'category': columns['category'][i],
+                'description': columns['description'][i]
+            }
@@ -0,0 +1,161 @@
+from datetime import datetime, date, timedelta
+
+# Budgets assumed when the user has not set their own
+DEFAULT_BUDGETS = {
+    'monthly': 5000,
+    'quarterly': 15000,
+    'yearly': 60000
+}
+
+def month_bounds(year, month):
+    """Return [start, end) of a month as datetimes."""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+def week_bounds(year, month, week):
+    """Return the first and last day (inclusive) of week number `week` of a month, clipped to the month."""
+    first_day, month_end = month_bounds(year, month)
+    last_day = month_end - timedelta(days=1)
+
+    # Weeks start on Monday; week 1 is the one containing the first of the month
+    week_start = first_day + timedelta(days=(week - 1) * 7 - first_day.weekday())
+    week_end = week_start + timedelta(days=6)
+    return max(week_start, first_day), min(week_end, last_day)
+
+def daily_totals(columns, year, month):
+    """Income and expenses for every day of a month."""
+    start, end = month_bounds(year, month)
+    income, expenses = columns.daily_series(start.date(), end.date())
+    return [
+        {
+            'date': (start + timedelta(days=day)).strftime('%Y-%m-%d'),
+            'income': float(income[day]),
+            'expenses': float(expenses[day])
+        }
+        for day in range((end - start).days)
+    ]
+
+def weekly_totals(columns, year, month, week):
+    """Income and expenses for every day of one week of a month."""
+    week_start, week_end = week_bounds(year, month, week)
+    income, expenses = columns.daily_series(week_start.date(), week_end.date() + timedelta(days=1))
+
+    rows = []
+    for offset in range(len(income)):
+        current_date = week_start + timedelta(days=offset)
+        rows.append({
+            'date': current_date.strftime('%Y-%m-%d'),
+            'day': current_date.strftime('%A'),  # Day name (Monday, Tuesday, etc.)
+            'income': float(income[offset]),
+            'expenses': float(expenses[offset])
+        })
+    return rows
+
+def monthly_totals(columns, year):
+    """Income and expenses for each of the 12 months of a year."""
+    monthly_data = [{'month': month, 'income': 0, 'expenses': 0} for month in range(1, 13)]
+    for month_start, income, expenses in columns.period_totals(date(year, 1, 1), date(year + 1, 1, 1), 'month'):
+        monthly_data[month_start.month - 1]['income'] = income
+        monthly_data[month_start.month - 1]['expenses'] = expenses
+    return monthly_data
+
+def _budget(user_budget, period):
+    value = getattr(user_budget, f'{period}_budget') if user_budget else None
+    return float(value) if value else DEFAULT_BUDGETS[period]
+
+def utilization_metrics(columns, user_budget, year, month):
+    """Spending against budget for the month, its quarter and its year."""
+    month_start, month_end = month_bounds(year, month)
+    quarter = (month - 1) // 3 + 1
+    quarter_start = date(year, 3 * quarter - 2, 1)
+    quarter_end = date(year + 1, 1, 1) if quarter == 4 else date(year, 3 * quarter + 1, 1)
+
+    _, monthly_spending = columns.totals(month_start.date(), month_end.date())
+    _, quarterly_spending = columns.totals(quarter_start, quarter_end)
+    _, yearly_spending = columns.totals(date(year, 1, 1), date(year + 1, 1, 1))
+
+    return {
+        'monthly': {
+            'spent': monthly_spending,
+            'budget': _budget(user_budget, 'monthly')
+        },
+        'quarterly': {
+            'spent': quarterly_spending,
+            'budget': _budget(user_budget, 'quarterly')
+        },
+        'yearly': {
+            'spent': yearly_spending,
+            'budget': _budget(user_budget, 'yearly')
+        }
+    }
+
+def financial_health(columns, user_budget, today):
+    """Score the current month's budget adherence, savings rate and expense spread out of 100."""
+    if not user_budget:
+        return {
+            'score': 70,  # Default baseline score
+            'factors': {
+                'budget_adherence': 'No budget set',
+                'spending_trend': 'Insufficient data',
+                'savings_rate': 'No savings data',
+                'expense_diversity': 'Insufficient data'
+            }
+        }
+
+    scores = {}
+    start_date, end_date = month_bounds(today.year, today.month)
+    total_income, monthly_spending = columns.totals(start_date.date(), end_date.date())
+
+    # 1. Budget Adherence (40 points)
+    monthly_budget = float(user_budget.monthly_budget) if user_budget.monthly_budget else 5000
+    budget_ratio = monthly_spending / monthly_budget if monthly_budget > 0 else 1
+    scores['budget'] = max(0, 40 - (max(0, budget_ratio - 0.75) * 100))
+
+    # 2. Savings Rate (30 points)
+    savings_rate = 0 if total_income == 0 else max(0, (total_income - monthly_spending) / total_income)
+    scores['savings'] = min(30, savings_rate * 100)
+
+    # 3. Category Diversity (30 points)
+    category_expenses = [
+        expenses
+        for _, _, expenses, _, expense_count in columns.category_breakdown(start_date.date(), end_date.date())
+        if expense_count
+    ]
+
+    scores['diversity'] = 30  # Default full score
+    total_expense = sum(category_expenses)
+    if total_expense > 0:
+        for amount in category_expenses:
+            # Reduce score if any category exceeds 40% of total expenses
+            category_percentage = amount / total_expense * 100
+            if category_percentage > 40:
+                scores['diversity'] = max(10, 30 - (category_percentage - 40))
+                break
+
+    # Calculate total score
+    total_score = round(sum(scores.values()))
+
+    # Generate factor descriptions
+    factors = {
+        'budget_adherence': ('Budget Management: ' +
+            ('Excellent' if scores['budget'] >= 35 else
+             'Good' if scores['budget'] >= 25 else
+             'Fair' if scores['budget'] >= 15 else 'Needs attention')),
+
+        'savings': ('Savings Rate: ' +
+            ('Excellent' if scores['savings'] >= 25 else
+             'Good' if scores['savings'] >= 15 else
+             'Fair' if scores['savings'] >= 10 else 'Needs improvement')),
+
+        'diversity': ('Expense Distribution: ' +
+            ('Well balanced' if scores['diversity'] >= 25 else
+             'Moderately balanced' if scores['diversity'] >= 15 else
+             'Could be more diverse'))
+    }
+
+    return {
+        'score': total_score,
+        'factors': factors,
+        'details': scores
+    }
@@ -0,0 +1,40 @@
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from models import BudgetTransaction, UserBudget, UserDataVersion
+from database import dialect_insert
+
+def bump_data_versions(connection, user_ids):
+    """Increment the data version of each user, in the caller's transaction."""
+    rows = [{'user_id': user_id, 'version': 1} for user_id in set(user_ids) if user_id is not None]
+    if not rows:
+        return
+
+    table = UserDataVersion.__table__
+    stmt = dialect_insert(connection.dialect.name, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={'version': table.c.version + 1}
+    )
+    connection.execute(stmt, rows)
+
+def get_data_version(connection, user_id):
+    """Current data version of a user; 0 until their data is first written."""
+    table = UserDataVersion.__table__
+    version = connection.execute(select(table.c.version).where(table.c.user_id == user_id)).scalar()
+    return version or 0
+
+def _owners(obj):
+    """The user ids a pending change of obj affects, i.e. its current and previous owner."""
+    history = inspect(obj).attrs.user_id.history
+    return set(history.added) | set(history.deleted) | set(history.unchanged)
+
+@event.listens_for(Session, 'after_flush')
+def bump_flushed_data_versions(session, flush_context):
+    """Bump the data version of every user whose transactions or budget were written in this flush."""
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (BudgetTransaction, UserBudget)) and (obj in session.new or obj in session.deleted or session.is_modified(obj)):
+            user_ids |= _owners(obj)
+
+    if user_ids:
+        bump_data_versions(session.connection(), user_ids)
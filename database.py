@@ -0,0 +1,91 @@
+import os
+from sqlalchemy import create_engine, event, func, cast, type_coerce, literal_column, Date
+from sqlalchemy.dialects import postgresql, sqlite
+
+# strftime() formats truncating a SQLite date to the first day of its bucket
+SQLITE_BUCKET_FORMATS = {
+    'day': '%Y-%m-%d',
+    'month': '%Y-%m-01',
+    'year': '%Y-01-01'
+}
+
+def database_url(default):
+    """DATABASE_URL from the environment, else default.
+
+    Accepts the postgres:// scheme some hosts hand out, which SQLAlchemy
+    only knows as postgresql://.
+    """
+    url = os.environ.get('DATABASE_URL') or default
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def dialect_insert(dialect_name, table):
+    """INSERT for table supporting on_conflict_do_update/do_nothing on both SQLite and PostgreSQL."""
+    if dialect_name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+def date_bucket(column, granularity, dialect_name):
+    """First day of the day/month/year a date or datetime column falls in, as a Date expression."""
+    if granularity not in SQLITE_BUCKET_FORMATS:
+        raise ValueError(f'Unknown date bucket: {granularity}')
+    if dialect_name == 'postgresql':
+        # Inlined rather than bound, so the expression in SELECT and GROUP BY is the same
+        return cast(func.date_trunc(literal_column(f"'{granularity}'"), column), Date)
+    # strftime yields ISO text, which the Date type reads back as a date
+    return type_coerce(func.strftime(SQLITE_BUCKET_FORMATS[granularity], column), Date)
+
+def sqlite_pragmas():
+    """PRAGMAs run on every new SQLite connection, overridable through SQLITE_* environment variables.
+
+    WAL lets readers keep going while an import holds the write lock, and
+    busy_timeout makes a second writer wait for the lock instead of failing
+    with 'database is locked'. synchronous=NORMAL is durable across
+    application crashes in WAL mode; only a power loss can drop the last
+    commits.
+    """
+    return {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        # Negative sizes are in KiB: 64 MB of page cache per connection
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY')
+    }
+
+def engine_options(database_uri):
+    """Pool settings for create_engine / SQLALCHEMY_ENGINE_OPTIONS, from DATABASE_POOL_* environment variables."""
+    options = {
+        # Drop connections older than this many seconds, and test them before reuse
+        'pool_recycle': int(os.environ.get('DATABASE_POOL_RECYCLE', 3600)),
+        'pool_pre_ping': os.environ.get('DATABASE_POOL_PRE_PING', '1') == '1'
+    }
+    # In-memory SQLite uses a single static connection, which takes no size limits
+    in_memory = database_uri.startswith('sqlite') and (':memory:' in database_uri or database_uri.rstrip('/') == 'sqlite:')
+    if not in_memory:
+        options['pool_size'] = int(os.environ.get('DATABASE_POOL_SIZE', 5))
+        options['max_overflow'] = int(os.environ.get('DATABASE_MAX_OVERFLOW', 10))
+        options['pool_timeout'] = int(os.environ.get('DATABASE_POOL_TIMEOUT', 30))
+    return options
+
+def configure_engine(engine, pragmas=None):
+    """Run the SQLite PRAGMAs on each connection the engine opens; other databases are left alone."""
+    if engine.dialect.name != 'sqlite':
+        return engine
+
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    return engine
+
+def make_engine(database_uri, pragmas=None):
+    """A standalone engine configured like the app's (for import job workers and scripts)."""
+    return configure_engine(create_engine(database_uri, **engine_options(database_uri)), pragmas)
@@ -0,0 +1,91 @@
+import hashlib
+from sqlalchemy import event, func, select
+from extensions import db
+from models import BudgetTransaction
+
+def normalize_description(description):
+    """Case-fold and collapse whitespace so cosmetic differences don't defeat dedup."""
+    return ' '.join((description or '').split()).casefold()
+
+def transaction_fingerprint(user_id, date, amount, description):
+    """Stable hash of the fields that identify the same statement line."""
+    key = f'{user_id}|{date.strftime("%Y-%m-%d")}|{amount:.2f}|{normalize_description(description)}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+@event.listens_for(BudgetTransaction, 'before_insert')
+@event.listens_for(BudgetTransaction, 'before_update')
+def set_fingerprint(mapper, connection, target):
+    """Keep the fingerprint of ORM-written transactions in step with their fields."""
+    target.fingerprint = transaction_fingerprint(target.user_id, target.date, target.amount, target.description)
+
+def existing_fingerprint_counts(connection, user_id, fingerprints):
+    """Count the stored transactions of a user per fingerprint, in one query."""
+    table = BudgetTransaction.__table__
+    if not fingerprints:
+        return {}
+    rows = connection.execute(
+        select(table.c.fingerprint, func.count())
+        .where(table.c.user_id == user_id, table.c.fingerprint.in_(fingerprints))
+        .group_by(table.c.fingerprint)
+    )
+    return dict(rows.all())
+
+class Deduplicator:
+    """Drops imported rows that are already stored, one query per batch.
+
+    Counts are compared per fingerprint rather than as a set, so a
+    statement that legitimately lists the same purchase twice keeps both
+    lines, while importing that statement again adds nothing.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        # Stored rows per fingerprint as of the first batch that mentioned it
+        self.stored = {}
+        # Rows per fingerprint seen so far in this import
+        self.seen = {}
+
+    def filter_batch(self, connection, batch):
+        """Set the fingerprint of each row and return the rows not stored yet."""
+        unknown = set()
+        for values in batch:
+            values['fingerprint'] = transaction_fingerprint(
+                values['user_id'], values['date'], values['amount'], values['description']
+            )
+            if values['fingerprint'] not in self.stored:
+                unknown.add(values['fingerprint'])
+
+        counts = existing_fingerprint_counts(connection, self.user_id, list(unknown))
+        for fingerprint in unknown:
+            self.stored[fingerprint] = counts.get(fingerprint, 0)
+
+        new_rows = []
+        for values in batch:
+            fingerprint = values['fingerprint']
+            self.seen[fingerprint] = self.seen.get(fingerprint, 0) + 1
+            if self.seen[fingerprint] > self.stored[fingerprint]:
+                new_rows.append(values)
+        return new_rows
+
+def backfill_fingerprints(connection, batch_size=1000):
+    """Fill in the fingerprint of transactions stored before it existed."""
+    table = BudgetTransaction.__table__
+    rows = connection.execute(
+        select(table.c.id, table.c.user_id, table.c.date, table.c.amount, table.c.description)
+        .where(table.c.fingerprint.is_(None))
+    ).all()
+
+    updates = [
+        {'row_id': row.id, 'value': transaction_fingerprint(row.user_id, row.date, row.amount, row.description)}
+        for row in rows
+    ]
+    statement = table.update().where(table.c.id == db.bindparam('row_id')).values(fingerprint=db.bindparam('value'))
+    for start in range(0, len(updates), batch_size):
+        connection.execute(statement, updates[start:start + batch_size])
+    return len(updates)
+
+def ensure_fingerprints():
+    """Backfill missing fingerprints at startup so dedup sees older rows."""
+    if db.session.query(BudgetTransaction.id).filter(BudgetTransaction.fingerprint.is_(None)).first():
+        backfill_fingerprints(db.session.connection())
+        db.session.commit()
@@ -0,0 +1,38 @@
+from datetime import date
+from functools import wraps
+from flask import current_app, request
+from flask_login import current_user
+from result_cache import current_data_version
+
+def data_version_etag(user_id, version):
+    """Weak ETag of everything a user's read endpoints derive from at this data version.
+
+    The user id keeps two accounts on one browser from sharing validators, and
+    the date covers periods like 'this month' that move with the calendar.
+    """
+    return f'u{user_id}-v{version}-{date.today():%Y%m%d}'
+
+def conditional_get(view):
+    """Answer 304 Not Modified, without running the view, while the user's data is unchanged.
+
+    Responses carry a weak ETag derived from the user's data version and are
+    marked private/no-cache, so browsers revalidate on every poll instead of
+    refetching the body.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = data_version_etag(current_user.id, current_data_version())
+
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.add('Cookie')
+        return response
+    return wrapper
@@ -0,0 +1,63 @@
+import csv
+import io
+from sqlalchemy import select
+from extensions import db
+from models import BudgetTransaction
+from columnar import iter_columnar_chunks
+
+# Rows fetched per round trip and written per yielded chunk
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_COLUMNS = ['Date', 'Description', 'Amount', 'Type', 'Category']
+
+def export_query(user_id, start=None, end=None, category=None):
+    """Select the exported columns of a user's transactions, newest first.
+
+    start and end are datetimes, end is exclusive; both are optional.
+    """
+    query = select(
+        BudgetTransaction.date,
+        BudgetTransaction.description,
+        BudgetTransaction.amount,
+        BudgetTransaction.type,
+        BudgetTransaction.category
+    ).where(BudgetTransaction.user_id == user_id)
+
+    if start is not None:
+        query = query.where(BudgetTransaction.date >= start)
+    if end is not None:
+        query = query.where(BudgetTransaction.date < end)
+    if category:
+        query = query.where(BudgetTransaction.category == category)
+    return query.order_by(BudgetTransaction.date.desc())
+
+def iter_transactions_csv(user_id, start=None, end=None, category=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield the CSV export in chunks of chunk_rows rows.
+
+    Rows are read with yield_per, so only one chunk of plain tuples is
+    held in memory at a time, and the header goes out before the first
+    row is fetched.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    result = db.session.execute(
+        export_query(user_id, start, end, category).execution_options(yield_per=chunk_rows)
+    )
+    for rows in result.partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (date.strftime('%Y-%m-%d'), description, amount, type_, category_name)
+            for date, description, amount, type_, category_name in rows
+        )
+        yield buffer.getvalue()
+
+def iter_transactions_columnar(user_id, start=None, end=None, category=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield the export in the binary column-block format (see columnar.py)."""
+    result = db.session.execute(
+        export_query(user_id, start, end, category).execution_options(yield_per=chunk_rows)
+    )
+    yield from iter_columnar_chunks(result)
@@ -0,0 +1,264 @@
+import json
+import multiprocessing
+import os
+import signal
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+import click
+import pdfplumber
+from sqlalchemy import select
+from database import make_engine
+from werkzeug.utils import secure_filename
+from extensions import db
+from models import ImportJob, User, ActivityEvent
+from importer import import_rows
+from pdfProcessor import extract_transactions_from_page, extract_transactions_parallel
+from pdf_cache import PdfCache
+
+# Runs of a job that may be cut short (crashed process, stopped runner) before it is failed
+IMPORT_JOB_MAX_ATTEMPTS = 3
+
+# Statements shorter than this are parsed in the job process: starting
+# parser processes would cost more than it saves
+PARALLEL_MIN_PAGES = 8
+# Page ranges per parser process; each finished range advances pages_done
+PAGE_RANGES_PER_WORKER = 4
+
+# One engine per database URI inside each job process
+_engines = {}
+
+def make_executor(max_workers=None):
+    """Return a process pool for running import jobs."""
+    # Spawned (not forked) workers don't inherit the parent's open database connections
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn')
+    )
+
+def _get_engine(database_uri):
+    if database_uri not in _engines:
+        _engines[database_uri] = make_engine(database_uri)
+    return _engines[database_uri]
+
+def _update_job(engine, job_id, **values):
+    """Write job progress in its own short transaction so pollers see it immediately."""
+    table = ImportJob.__table__
+    values['updated_at'] = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(table.update().where(table.c.id == job_id).values(**values))
+
+def _finish_job(engine, job_id, user_id, report):
+    """Mark the job done and log its transaction.import event, in one transaction.
+
+    The job process has no app context for record_event, so the event row
+    is inserted here, the way the activity writer would.
+    """
+    table = ImportJob.__table__
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(table.update().where(table.c.id == job_id).values(
+            status='done',
+            rows_imported=report.imported,
+            rows_failed=report.failed,
+            rows_duplicate=report.duplicates,
+            row_errors=json.dumps(report.errors),
+            finished_at=now,
+            updated_at=now
+        ))
+        username = connection.execute(select(User.__table__.c.username).where(User.__table__.c.id == user_id)).scalar()
+        connection.execute(ActivityEvent.__table__.insert().values(
+            created_at=now,
+            user_id=user_id,
+            username=username,
+            action='transaction.import',
+            target_id=None,
+            details=f'{report.imported} rows from pdf file',
+            quantity=report.imported
+        ))
+
+def _remove_upload(pdf_path):
+    if pdf_path and os.path.exists(pdf_path):
+        os.remove(pdf_path)
+
+def run_pdf_import(job_id, pdf_path, user_id, database_uri, cache=None, parse_workers=1):
+    """Parse a PDF statement page by page and import its transactions.
+
+    Runs inside a pool process, so it talks to the database through its
+    own engine rather than the Flask-SQLAlchemy session. Long statements
+    are parsed by parse_workers processes of its own. Re-uploads of an
+    already parsed statement are served from the PdfCache.
+    """
+    engine = None
+    try:
+        engine = _get_engine(database_uri)
+        cache_key = cache.key(pdf_path) if cache else None
+        transactions = cache.get(cache_key) if cache_key else None
+        if transactions is None:
+            transactions = []
+            with pdfplumber.open(pdf_path) as pdf:
+                page_count = len(pdf.pages)
+                _update_job(engine, job_id, status='running', pages_total=page_count)
+                parallel = parse_workers > 1 and page_count >= PARALLEL_MIN_PAGES
+                if not parallel:
+                    for page_number, page in enumerate(pdf.pages, start=1):
+                        transactions.extend(extract_transactions_from_page(page))
+                        _update_job(engine, job_id, pages_done=page_number)
+            if parallel:
+                transactions = extract_transactions_parallel(
+                    pdf_path, page_count, parse_workers,
+                    parts=parse_workers * PAGE_RANGES_PER_WORKER,
+                    progress=lambda pages_done: _update_job(engine, job_id, pages_done=pages_done)
+                )
+            if cache_key:
+                cache.put(cache_key, transactions)
+        else:
+            _update_job(engine, job_id, status='running')
+
+        report = import_rows(enumerate(transactions, start=1), user_id, engine=engine)
+        _finish_job(engine, job_id, user_id, report)
+    except Exception as e:
+        if engine is None:
+            # No database to report to; the runner marks the job failed
+            raise
+        _update_job(engine, job_id, status='failed', error=str(e), finished_at=datetime.utcnow())
+    _remove_upload(pdf_path)
+
+def submit_pdf_import(app, user_id, file):
+    """Store an uploaded PDF and queue its ImportJob for the import job runner."""
+    upload_dir = os.path.join(app.instance_path, 'import_jobs')
+    os.makedirs(upload_dir, exist_ok=True)
+    pdf_path = os.path.join(upload_dir, f'{uuid.uuid4().hex}.pdf')
+    file.save(pdf_path)
+
+    job = ImportJob(user_id=user_id, filename=secure_filename(file.filename), pdf_path=pdf_path)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def claim_next_job(engine):
+    """Mark the oldest queued job running and return it, or None when the queue is empty.
+
+    The status check in the UPDATE makes the claim safe against other
+    runners: only one of them changes the row from queued to running.
+    """
+    table = ImportJob.__table__
+    while True:
+        with engine.begin() as connection:
+            job = connection.execute(
+                select(table.c.id, table.c.user_id, table.c.pdf_path, table.c.attempts)
+                .where(table.c.status == 'queued')
+                .order_by(table.c.id)
+                .limit(1)
+            ).first()
+            if job is None:
+                return None
+            claimed = connection.execute(
+                table.update()
+                .where(table.c.id == job.id, table.c.status == 'queued')
+                .values(status='running', attempts=table.c.attempts + 1, updated_at=datetime.utcnow())
+            ).rowcount
+        if claimed:
+            return {'id': job.id, 'user_id': job.user_id, 'pdf_path': job.pdf_path, 'attempts': job.attempts + 1}
+
+def retry_or_fail_job(engine, job, reason):
+    """Queue an interrupted job again, or fail it once it has used up its attempts or lost its PDF."""
+    if job['attempts'] < IMPORT_JOB_MAX_ATTEMPTS and job['pdf_path'] and os.path.exists(job['pdf_path']):
+        _update_job(engine, job['id'], status='queued', pages_done=0)
+        return
+    _update_job(engine, job['id'], status='failed', error=reason, finished_at=datetime.utcnow())
+    _remove_upload(job['pdf_path'])
+
+def recover_interrupted_jobs(engine):
+    """Deal with the jobs a stopped or crashed runner left behind; returns how many.
+
+    Running jobs go back to the queue (or fail, see retry_or_fail_job).
+    Queued jobs without their PDF, such as those submitted before the
+    queue lived in this table, fail.
+    """
+    table = ImportJob.__table__
+    with engine.connect() as connection:
+        jobs = connection.execute(
+            select(table.c.id, table.c.status, table.c.pdf_path, table.c.attempts)
+            .where(table.c.status.in_(['queued', 'running']))
+        ).all()
+    count = 0
+    for job_id, status, pdf_path, attempts in jobs:
+        if status == 'queued' and pdf_path and os.path.exists(pdf_path):
+            continue
+        retry_or_fail_job(engine, {'id': job_id, 'pdf_path': pdf_path, 'attempts': attempts},
+                          'Import interrupted' if status == 'running' else 'Uploaded file lost before the import started')
+        count += 1
+    return count
+
+def run_import_jobs(app, once=False):
+    """Run queued import jobs on one process pool, until stopped (or the queue is empty, with once).
+
+    Start a single runner per database: at start it takes every running
+    job as left behind by a previous runner.
+    """
+    workers = app.config['IMPORT_JOB_WORKERS']
+    parse_workers = app.config['PDF_PARSE_WORKERS']
+    poll_seconds = app.config['IMPORT_JOB_POLL_MS'] / 1000
+    database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+    cache = PdfCache(os.path.join(app.instance_path, 'pdf_cache'), app.config['PDF_CACHE_MAX_BYTES'])
+    engine = db.engine
+
+    recovered = recover_interrupted_jobs(engine)
+    if recovered:
+        print(f"Recovered {recovered} interrupted import jobs")
+
+    executor = make_executor(workers)
+    running = {}
+    try:
+        while True:
+            while len(running) < workers:
+                job = claim_next_job(engine)
+                if job is None:
+                    break
+                try:
+                    future = executor.submit(run_pdf_import, job['id'], job['pdf_path'], job['user_id'], database_uri, cache, parse_workers)
+                except BrokenProcessPool:
+                    executor = make_executor(workers)
+                    future = executor.submit(run_pdf_import, job['id'], job['pdf_path'], job['user_id'], database_uri, cache, parse_workers)
+                running[future] = job
+
+            if not running:
+                if once:
+                    return
+                time.sleep(poll_seconds)
+                continue
+
+            done, _ = wait(running, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                job = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    # The job's process died, or it could not reach the database to report
+                    print(f"Import job {job['id']} interrupted: {error!r}")
+                    retry_or_fail_job(engine, job, f'Import interrupted: {error}')
+                    broken = broken or isinstance(error, BrokenProcessPool)
+            if broken:
+                executor.shutdown(wait=False)
+                executor = make_executor(workers)
+    finally:
+        # Let the jobs in progress finish rather than leave them to the next runner
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def init_import_jobs(app):
+    @app.cli.command('run-import-jobs')
+    @click.option('--once', is_flag=True, help='Exit once the queue is empty instead of waiting for more jobs.')
+    def run_import_jobs_command(once):
+        """Run queued PDF statement imports (one runner per server; IMPORT_JOB_WORKERS jobs at a time)."""
+        def stop(signum, frame):
+            raise KeyboardInterrupt
+
+        # Stop like on Ctrl-C, finishing the jobs in progress
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            run_import_jobs(app, once=once)
+        except KeyboardInterrupt:
+            click.echo('Stopped')
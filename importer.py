@@ -0,0 +1,168 @@
+import csv
+from datetime import datetime
+from extensions import db
+from models import BudgetTransaction
+from rollups import add_delta, apply_deltas
+from dedup import Deduplicator
+from data_version import bump_data_versions
+
+# Rows inserted (and committed) per executemany
+IMPORT_BATCH_SIZE = 1000
+
+# Cap on the per-row errors echoed back to the client
+MAX_REPORTED_ERRORS = 100
+
+class ImportReport:
+    """Outcome of an import: how many rows went in and which ones were rejected."""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.errors = []
+
+    def add_error(self, row_number, error):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'error': str(error)})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'duplicates': self.duplicates,
+            'errors': self.errors
+        }
+
+def iter_csv_rows(stream, encoding='utf-8-sig'):
+    """Yield (line_number, row) pairs from a binary CSV stream, decoding it line by line.
+
+    A line that does not decode is left out of the CSV and yielded as
+    (line_number, UnicodeDecodeError), so import_rows() reports it as a
+    failed row instead of stopping halfway through the upload.
+    """
+    bad_lines = []
+    position = {'line': 0}
+
+    def decoded_lines():
+        for number, line in enumerate(stream, start=1):
+            position['line'] = number
+            try:
+                yield line.decode(encoding)
+            except UnicodeDecodeError as e:
+                bad_lines.append((number, e))
+
+    for row in csv.DictReader(decoded_lines()):
+        while bad_lines:
+            yield bad_lines.pop(0)
+        yield position['line'], row
+    while bad_lines:
+        yield bad_lines.pop(0)
+
+def parse_transaction_row(row, user_id):
+    """Turn a CSV/PDF row into budget_transaction column values; raises ValueError/KeyError on bad rows."""
+    # Handle date format from PDF (DD.MM.YYYY) or CSV (YYYY-MM-DD)
+    date_str = row.get('Date', row.get('date', '')) or ''
+    if '.' in date_str:  # PDF format
+        date = datetime.strptime(date_str, '%d.%m.%Y')
+    else:  # CSV format
+        date = datetime.strptime(date_str, '%Y-%m-%d')
+
+    # Get amount and ensure it's a float
+    amount_str = str(row.get('Amount', row.get('amount', '0')))
+    amount = float(amount_str.replace('€', '').replace(',', '.').strip())
+
+    description = (row.get('Description', row.get('description', '')) or '').strip()
+    category = (row.get('Category', row.get('category', 'UNCATEGORIZED')) or 'UNCATEGORIZED').strip()
+
+    return {
+        'user_id': user_id,
+        'date': date,
+        'description': description,
+        'amount': amount,
+        'category': category,
+        'type': 'income' if amount > 0 else 'expense'
+    }
+
+def parse_columnar_row(row, user_id):
+    """Turn a decoded columnar row (see columnar.py) into budget_transaction column values."""
+    amount = float(row['amount'])
+    return {
+        'user_id': user_id,
+        'date': row['date'],
+        'description': row['description'].strip(),
+        'amount': amount,
+        'category': row['category'].strip() or 'UNCATEGORIZED',
+        'type': 'income' if amount > 0 else 'expense'
+    }
+
+def write_batch(connection, batch, deduplicator=None):
+    """Insert one batch with a single executemany and update the rollups.
+
+    Returns the number of rows inserted, which is less than the batch
+    size when the deduplicator finds rows that are already stored.
+    """
+    if deduplicator is not None:
+        batch = deduplicator.filter_batch(connection, batch)
+    if not batch:
+        return 0
+
+    connection.execute(BudgetTransaction.__table__.insert(), batch)
+
+    # Core inserts bypass the session hooks, so apply the rollup deltas here
+    deltas = {}
+    for values in batch:
+        add_delta(deltas, values['user_id'], values['date'], values['category'], values['amount'])
+    apply_deltas(connection, deltas)
+    bump_data_versions(connection, {values['user_id'] for values in batch})
+    return len(batch)
+
+def _flush_batch(batch, engine=None, deduplicator=None):
+    """Write and commit one batch, through the Flask session or a standalone engine."""
+    # Committing per batch releases the SQLite write lock between batches
+    if engine is None:
+        inserted = write_batch(db.session.connection(), batch, deduplicator)
+        db.session.commit()
+    else:
+        with engine.begin() as connection:
+            inserted = write_batch(connection, batch, deduplicator)
+    return inserted
+
+def import_rows(rows, user_id, batch_size=IMPORT_BATCH_SIZE, engine=None, skip_duplicates=True,
+                parse_row=parse_transaction_row):
+    """Import (row_number, row) pairs for a user in fixed-size batches.
+
+    Rows are consumed lazily, so a generator keeps memory flat regardless
+    of the upload size. Rows that fail to parse are skipped and reported.
+    Pass an engine to import outside of a Flask app context (e.g. from an
+    import job worker process). Rows already stored for the user are
+    skipped (see dedup.py), so importing the same statement twice is a no-op.
+    parse_row turns one source row into column values (CSV/PDF by default).
+    A row may also be the exception that reading it raised (see
+    iter_csv_rows), which is reported as a failed row.
+    """
+    report = ImportReport()
+    deduplicator = Deduplicator(user_id) if skip_duplicates else None
+    batch = []
+    for row_number, row in rows:
+        if isinstance(row, Exception):
+            report.add_error(row_number, row)
+            continue
+        try:
+            batch.append(parse_row(row, user_id))
+        except (ValueError, KeyError, AttributeError) as e:
+            report.add_error(row_number, e)
+            continue
+
+        if len(batch) >= batch_size:
+            inserted = _flush_batch(batch, engine, deduplicator)
+            report.imported += inserted
+            report.duplicates += len(batch) - inserted
+            batch = []
+
+    if batch:
+        inserted = _flush_batch(batch, engine, deduplicator)
+        report.imported += inserted
+        report.duplicates += len(batch) - inserted
+
+    return report
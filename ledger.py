@@ -0,0 +1,146 @@
+from datetime import date
+from sqlalchemy import select, func, case
+from extensions import db
+from models import DailyRollup, LedgerSnapshot
+from database import dialect_insert, date_bucket
+
+def month_start(day):
+    return day.replace(day=1)
+
+def ledger_deltas(rollup_deltas):
+    """Fold rollup deltas keyed (user_id, day, category) into net balance deltas keyed (user_id, month)."""
+    deltas = {}
+    for (user_id, day, _), (income, expenses, _, _) in rollup_deltas.items():
+        key = (user_id, month_start(day))
+        deltas[key] = deltas.get(key, 0.0) + income - expenses
+    return deltas
+
+def _opening_balance(user_id, month):
+    """Scalar subquery: closing balance of the latest snapshot before month, or NULL."""
+    table = LedgerSnapshot.__table__
+    return select(table.c.balance).where(
+        table.c.user_id == user_id,
+        table.c.month < month
+    ).order_by(table.c.month.desc()).limit(1).scalar_subquery()
+
+def apply_ledger_deltas(connection, deltas):
+    """Add net balance deltas to the snapshot of their month and of every later month."""
+    deltas = {key: net for key, net in deltas.items() if net}
+    if not deltas:
+        return
+
+    table = LedgerSnapshot.__table__
+
+    # Give each touched month a snapshot first, carrying the balance of the month before it
+    for user_id, month in sorted(deltas):
+        stmt = dialect_insert(connection.dialect.name, table).values(
+            user_id=user_id,
+            month=month,
+            balance=func.coalesce(_opening_balance(user_id, month), 0)
+        ).on_conflict_do_nothing()
+        connection.execute(stmt)
+
+    for (user_id, month), net in deltas.items():
+        connection.execute(
+            table.update().where(
+                table.c.user_id == user_id,
+                table.c.month >= month
+            ).values(balance=table.c.balance + net)
+        )
+
+def rebuild_ledger(connection, user_id=None):
+    """Recompute ledger_snapshot from daily_rollup, for one user or everyone."""
+    table = LedgerSnapshot.__table__
+    month = date_bucket(DailyRollup.day, 'month', connection.dialect.name)
+    net = func.sum(DailyRollup.income_sum - DailyRollup.expense_sum)
+
+    source = select(
+        DailyRollup.user_id,
+        month,
+        # Running total of the monthly nets, in month order
+        func.sum(net).over(partition_by=DailyRollup.user_id, order_by=month)
+    ).group_by(DailyRollup.user_id, month)
+
+    delete = table.delete()
+    if user_id is not None:
+        source = source.where(DailyRollup.user_id == user_id)
+        delete = delete.where(table.c.user_id == user_id)
+
+    connection.execute(delete)
+    result = connection.execute(table.insert().from_select(['user_id', 'month', 'balance'], source))
+    return result.rowcount
+
+def ensure_ledger():
+    """Backfill ledger_snapshot when it is empty but rollups already exist."""
+    has_snapshots = db.session.query(LedgerSnapshot.user_id).first() is not None
+    has_rollups = db.session.query(DailyRollup.user_id).first() is not None
+    if has_rollups and not has_snapshots:
+        rebuild_ledger(db.session.connection())
+        db.session.commit()
+
+def _latest_balance(user_id):
+    """Scalar subquery: balance of the user's latest snapshot (every transaction), or NULL."""
+    table = LedgerSnapshot.__table__
+    return select(table.c.balance).where(
+        table.c.user_id == user_id
+    ).order_by(table.c.month.desc()).limit(1).scalar_subquery()
+
+def opening_balance(user_id, day):
+    """Net balance of every transaction of the user dated before day's month."""
+    return float(db.session.execute(select(_opening_balance(user_id, month_start(day)))).scalar() or 0)
+
+def current_balances(user_id, today):
+    """Return the net (today, month to date, all time) balance of a user.
+
+    The all-time balance is the latest snapshot; today's and the month's
+    come from the rollup days of today's month, at most one month of rows.
+    """
+    net = DailyRollup.income_sum - DailyRollup.expense_sum
+    month_rows = (DailyRollup.user_id == user_id, DailyRollup.day >= month_start(today), DailyRollup.day <= today)
+    today_balance, month_balance, total_balance = db.session.execute(select(
+        select(func.sum(case((DailyRollup.day == today, net), else_=0))).where(*month_rows).scalar_subquery(),
+        select(func.sum(net)).where(*month_rows).scalar_subquery(),
+        _latest_balance(user_id)
+    )).one()
+    return float(today_balance or 0), float(month_balance or 0), float(total_balance or 0)
+
+def balance_as_of(user_id, day):
+    """Net balance of every transaction of the user dated on or before day.
+
+    The snapshot of the month before day plus the rollup days of day's own
+    month, so at most one month of rollup rows is read.
+    """
+    start = month_start(day)
+    month_to_date = select(
+        func.sum(DailyRollup.income_sum - DailyRollup.expense_sum)
+    ).where(
+        DailyRollup.user_id == user_id,
+        DailyRollup.day >= start,
+        DailyRollup.day <= day
+    ).scalar_subquery()
+
+    balance = db.session.execute(select(
+        func.coalesce(_opening_balance(user_id, start), 0) + func.coalesce(month_to_date, 0)
+    )).scalar()
+    return float(balance or 0)
+
+def monthly_balances(user_id, start, end):
+    """Return (month, balance) closing balances for every month from start's through end's, inclusive."""
+    first, last = month_start(start), month_start(end)
+    rows = db.session.execute(select(LedgerSnapshot.month, LedgerSnapshot.balance).where(
+        LedgerSnapshot.user_id == user_id,
+        LedgerSnapshot.month >= first,
+        LedgerSnapshot.month <= last
+    ).order_by(LedgerSnapshot.month)).all()
+    opening = db.session.execute(select(_opening_balance(user_id, first))).scalar()
+
+    # Months without a snapshot keep the balance of the month before them
+    by_month = dict(rows)
+    balance = float(opening or 0)
+    balances = []
+    month = first
+    while month <= last:
+        balance = float(by_month.get(month, balance))
+        balances.append((month, balance))
+        month = date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+    return balances
@@ -1,37 +1,23 @@
 from app import app, db
-from sqlalchemy import text
+from sqlalchemy import text, inspect
+from models import BudgetTransaction
 from datetime import datetime
 
 def migrate_transactions():
     with app.app_context():
         try:
             # Check if the old table exists
-            result = db.session.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='transaction'"))
-            if not result.scalar():
+            inspector = inspect(db.engine)
+            if not inspector.has_table('transaction'):
                 print("Old 'transaction' table not found. No migration needed.")
                 return
 
             # Get the structure of the old table
-            result = db.session.execute(text("PRAGMA table_info('transaction')"))
-            columns = [row[1] for row in result.fetchall()]
+            columns = [column['name'] for column in inspector.get_columns('transaction')]
             print(f"Existing columns in transaction table: {columns}")
 
-            # Create the new table if it doesn't exist
-            db.session.execute(text("""
-                CREATE TABLE IF NOT EXISTS budget_transaction (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    description VARCHAR(200) NOT NULL,
-                    amount FLOAT NOT NULL,
-                    type VARCHAR(20) NOT NULL,
-                    category VARCHAR(50) NOT NULL,
-                    date DATETIME NOT NULL,
-                    created_at DATETIME NOT NULL,
-                    updated_at DATETIME,
-                    user_id INTEGER NOT NULL,
-                    FOREIGN KEY(user_id) REFERENCES user(id)
-                )
-            """))
-            db.session.commit()
+            # Create the new table if it doesn't exist, with the DDL of the current database
+            BudgetTransaction.__table__.create(db.engine, checkfirst=True)
 
             # Build the INSERT query based on existing columns
             current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
@@ -0,0 +1,71 @@
+"""Add feedback list indexes and full-text search index
+
+Revision ID: 074232e0741a
+Revises: 2e974fb4ca28
+Create Date: 2026-10-18 17:21:48.902317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '074232e0741a'
+down_revision = '2e974fb4ca28'
+branch_labels = None
+depends_on = None
+
+# search.FEEDBACK_SEARCH_INDEX_DDL as of this revision, copied so that the migration
+# stays the same when the app's search code changes
+FEEDBACK_FTS_TABLE = 'feedback_fts'
+FEEDBACK_SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS feedback_fts USING fts5(
+        name, email, subject, message,
+        content='feedback',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS feedback_fts_insert AFTER INSERT ON feedback BEGIN
+        INSERT INTO feedback_fts(rowid, name, email, subject, message) VALUES (new.id, new.name, new.email, new.subject, new.message);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS feedback_fts_delete AFTER DELETE ON feedback BEGIN
+        INSERT INTO feedback_fts(feedback_fts, rowid, name, email, subject, message) VALUES ('delete', old.id, old.name, old.email, old.subject, old.message);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS feedback_fts_update AFTER UPDATE OF name, email, subject, message ON feedback BEGIN
+        INSERT INTO feedback_fts(feedback_fts, rowid, name, email, subject, message) VALUES ('delete', old.id, old.name, old.email, old.subject, old.message);
+        INSERT INTO feedback_fts(rowid, name, email, subject, message) VALUES (new.id, new.name, new.email, new.subject, new.message);
+    END"""
+]
+DROP_FEEDBACK_SEARCH_INDEX_DDL = [
+    'DROP TRIGGER IF EXISTS feedback_fts_insert',
+    'DROP TRIGGER IF EXISTS feedback_fts_delete',
+    'DROP TRIGGER IF EXISTS feedback_fts_update',
+    'DROP TABLE IF EXISTS feedback_fts'
+]
+
+
+def upgrade():
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.create_index('ix_feedback_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_feedback_is_read_created_at', ['is_read', 'created_at'], unique=False)
+
+    # FTS5 is SQLite-only; other databases search with LIKE
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for statement in FEEDBACK_SEARCH_INDEX_DDL:
+        op.execute(statement)
+
+    # Index the feedback already stored
+    op.execute(f"INSERT INTO {FEEDBACK_FTS_TABLE}({FEEDBACK_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in DROP_FEEDBACK_SEARCH_INDEX_DDL:
+            op.execute(statement)
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedback_is_read_created_at')
+        batch_op.drop_index('ix_feedback_created_at')
@@ -0,0 +1,30 @@
+"""Add budget_transaction access path indexes
+
+Revision ID: 2b2a8cc0559d
+Revises: 798fdc339788
+Create Date: 2026-10-18 10:02:17.884310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b2a8cc0559d'
+down_revision = '798fdc339788'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('budget_transaction', schema=None) as batch_op:
+        batch_op.create_index('ix_budget_transaction_user_date', ['user_id', 'date'], unique=False)
+        batch_op.create_index('ix_budget_transaction_user_category_date', ['user_id', 'category', 'date'], unique=False)
+        batch_op.create_index('ix_budget_transaction_user_amount', ['user_id', 'amount'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('budget_transaction', schema=None) as batch_op:
+        batch_op.drop_index('ix_budget_transaction_user_amount')
+        batch_op.drop_index('ix_budget_transaction_user_category_date')
+        batch_op.drop_index('ix_budget_transaction_user_date')
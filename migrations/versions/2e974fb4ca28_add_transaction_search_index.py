@@ -0,0 +1,65 @@
+"""Add full-text search index over transaction descriptions
+
+Revision ID: 2e974fb4ca28
+Revises: fcb19c5e4e5d
+Create Date: 2026-10-18 16:05:12.384211
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e974fb4ca28'
+down_revision = 'fcb19c5e4e5d'
+branch_labels = None
+depends_on = None
+
+# search.SEARCH_INDEX_DDL as of this revision, copied so that the migration
+# stays the same when the app's search code changes
+FTS_TABLE = 'transaction_fts'
+SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS transaction_fts USING fts5(
+        user_id, description,
+        content='budget_transaction',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS budget_transaction_fts_insert AFTER INSERT ON budget_transaction BEGIN
+        INSERT INTO transaction_fts(rowid, user_id, description) VALUES (new.id, new.user_id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS budget_transaction_fts_delete AFTER DELETE ON budget_transaction BEGIN
+        INSERT INTO transaction_fts(transaction_fts, rowid, user_id, description) VALUES ('delete', old.id, old.user_id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS budget_transaction_fts_update AFTER UPDATE OF user_id, description ON budget_transaction BEGIN
+        INSERT INTO transaction_fts(transaction_fts, rowid, user_id, description) VALUES ('delete', old.id, old.user_id, old.description);
+        INSERT INTO transaction_fts(rowid, user_id, description) VALUES (new.id, new.user_id, new.description);
+    END"""
+]
+DROP_SEARCH_INDEX_DDL = [
+    'DROP TRIGGER IF EXISTS budget_transaction_fts_insert',
+    'DROP TRIGGER IF EXISTS budget_transaction_fts_delete',
+    'DROP TRIGGER IF EXISTS budget_transaction_fts_update',
+    'DROP TABLE IF EXISTS transaction_fts'
+]
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other databases search with LIKE
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for statement in SEARCH_INDEX_DDL:
+        op.execute(statement)
+
+    # Index the descriptions already stored
+    op.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for statement in DROP_SEARCH_INDEX_DDL:
+        op.execute(statement)
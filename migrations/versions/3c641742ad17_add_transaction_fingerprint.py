@@ -0,0 +1,70 @@
+"""Add budget_transaction fingerprint for import duplicate detection
+
+Revision ID: 3c641742ad17
+Revises: 855f92ced972
+Create Date: 2026-10-18 13:48:05.216093
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c641742ad17'
+down_revision = '855f92ced972'
+branch_labels = None
+depends_on = None
+
+
+def transaction_fingerprint(user_id, date, amount, description):
+    """dedup.transaction_fingerprint as of this revision, copied so that the backfill stays the same."""
+    normalized = ' '.join((description or '').split()).casefold()
+    key = f'{user_id}|{date.strftime("%Y-%m-%d")}|{amount:.2f}|{normalized}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def upgrade():
+    with op.batch_alter_table('budget_transaction', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sa.String(length=40), nullable=True))
+        batch_op.create_index('ix_budget_transaction_user_fingerprint', ['user_id', 'fingerprint'], unique=False)
+
+    with op.batch_alter_table('import_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rows_duplicate', sa.Integer(), nullable=False, server_default='0'))
+
+    # Fingerprint the existing transactions
+    connection = op.get_bind()
+    transactions = sa.table(
+        'budget_transaction',
+        sa.column('id', sa.Integer),
+        sa.column('user_id', sa.Integer),
+        sa.column('date', sa.DateTime),
+        sa.column('amount', sa.Float),
+        sa.column('description', sa.String),
+        sa.column('fingerprint', sa.String)
+    )
+    rows = connection.execute(
+        sa.select(transactions.c.id, transactions.c.user_id, transactions.c.date,
+                  transactions.c.amount, transactions.c.description)
+    ).all()
+    updates = [
+        {'row_id': row.id, 'value': transaction_fingerprint(row.user_id, row.date, row.amount, row.description)}
+        for row in rows
+    ]
+    if updates:
+        connection.execute(
+            transactions.update()
+            .where(transactions.c.id == sa.bindparam('row_id'))
+            .values(fingerprint=sa.bindparam('value')),
+            updates
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('import_job', schema=None) as batch_op:
+        batch_op.drop_column('rows_duplicate')
+
+    with op.batch_alter_table('budget_transaction', schema=None) as batch_op:
+        batch_op.drop_index('ix_budget_transaction_user_fingerprint')
+        batch_op.drop_column('fingerprint')
@@ -0,0 +1,63 @@
+"""Make the user login key indexes unique
+
+Revision ID: 689975fa623d
+Revises: 693b0b981ea1
+Create Date: 2026-10-18 21:38:50.140772
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '689975fa623d'
+down_revision = '693b0b981ea1'
+branch_labels = None
+depends_on = None
+
+
+def shared_login_keys(connection, users):
+    """Login keys shared by several users: (column, key, [(id, username or email), ...]) for each."""
+    collisions = []
+    for column, source in (('username_key', 'username'), ('email_key', 'email')):
+        key_column = users.c[column]
+        shared = sa.select(key_column).where(key_column.isnot(None)).group_by(key_column).having(sa.func.count() > 1)
+        for key in connection.execute(shared).scalars():
+            rows = connection.execute(
+                sa.select(users.c.id, users.c[source]).where(key_column == key).order_by(users.c.id)
+            ).all()
+            collisions.append((column, key, [tuple(row) for row in rows]))
+    return collisions
+
+
+def upgrade():
+    # Users told apart only by letter case (e.g. 'Bob' and 'bob') share a key; which
+    # of them is meant at login is not for the migration to guess
+    users = sa.table(
+        'user',
+        sa.column('id', sa.Integer),
+        sa.column('username', sa.String),
+        sa.column('email', sa.String),
+        sa.column('username_key', sa.String),
+        sa.column('email_key', sa.String)
+    )
+    collisions = shared_login_keys(op.get_bind(), users)
+    if collisions:
+        for column, key, rows in collisions:
+            names = ', '.join(f'{value!r} (id {user_id})' for user_id, value in rows)
+            print(f"Users share the {column} {key!r}: {names}; change all but one so that each login names one user")
+        raise RuntimeError('Login keys are shared by several users (listed above); change them and upgrade again')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_username_key')
+        batch_op.drop_index('ix_user_email_key')
+        batch_op.create_index('ix_user_username_key', ['username_key'], unique=True)
+        batch_op.create_index('ix_user_email_key', ['email_key'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_email_key')
+        batch_op.drop_index('ix_user_username_key')
+        batch_op.create_index('ix_user_email_key', ['email_key'], unique=False)
+        batch_op.create_index('ix_user_username_key', ['username_key'], unique=False)
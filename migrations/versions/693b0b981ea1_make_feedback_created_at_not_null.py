@@ -0,0 +1,70 @@
+"""Backfill feedback.created_at and make it NOT NULL
+
+Revision ID: 693b0b981ea1
+Revises: 8bb44650c555
+Create Date: 2026-10-18 21:04:12.518203
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '693b0b981ea1'
+down_revision = '8bb44650c555'
+branch_labels = None
+depends_on = None
+
+# models.UNDATED_FEEDBACK_CREATED_AT: sorts undated feedback last in the newest-first admin list
+UNDATED_FEEDBACK_CREATED_AT = datetime(1970, 1, 1)
+
+# search.FEEDBACK_SEARCH_INDEX_DDL as of this revision, copied so that the migration
+# stays the same when the app's search code changes
+FEEDBACK_SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS feedback_fts USING fts5(
+        name, email, subject, message,
+        content='feedback',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS feedback_fts_insert AFTER INSERT ON feedback BEGIN
+        INSERT INTO feedback_fts(rowid, name, email, subject, message) VALUES (new.id, new.name, new.email, new.subject, new.message);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS feedback_fts_delete AFTER DELETE ON feedback BEGIN
+        INSERT INTO feedback_fts(feedback_fts, rowid, name, email, subject, message) VALUES ('delete', old.id, old.name, old.email, old.subject, old.message);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS feedback_fts_update AFTER UPDATE OF name, email, subject, message ON feedback BEGIN
+        INSERT INTO feedback_fts(feedback_fts, rowid, name, email, subject, message) VALUES ('delete', old.id, old.name, old.email, old.subject, old.message);
+        INSERT INTO feedback_fts(rowid, name, email, subject, message) VALUES (new.id, new.name, new.email, new.subject, new.message);
+    END"""
+]
+
+
+def upgrade():
+    # The admin feedback list pages on (created_at, id), which skips NULLs
+    feedback = sa.table('feedback', sa.column('created_at', sa.DateTime))
+    op.execute(
+        feedback.update()
+        .where(feedback.c.created_at.is_(None))
+        .values(created_at=UNDATED_FEEDBACK_CREATED_AT)
+    )
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+    # SQLite rebuilds the table for the ALTER, dropping the search index triggers on it
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in FEEDBACK_SEARCH_INDEX_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in FEEDBACK_SEARCH_INDEX_DDL:
+            op.execute(statement)
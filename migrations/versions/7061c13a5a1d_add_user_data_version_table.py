@@ -0,0 +1,29 @@
+"""Add user_data_version table
+
+Revision ID: 7061c13a5a1d
+Revises: 3c641742ad17
+Create Date: 2026-10-18 14:32:41.608127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7061c13a5a1d'
+down_revision = '3c641742ad17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_data_version',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_data_version')
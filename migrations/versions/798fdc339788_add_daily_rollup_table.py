@@ -0,0 +1,46 @@
+"""Add daily_rollup table
+
+Revision ID: 798fdc339788
+Revises: a2eee88b8c00
+Create Date: 2026-10-18 09:12:41.530218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '798fdc339788'
+down_revision = 'a2eee88b8c00'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_rollup',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('income_sum', sa.Float(), nullable=False),
+    sa.Column('expense_sum', sa.Float(), nullable=False),
+    sa.Column('income_count', sa.Integer(), nullable=False),
+    sa.Column('expense_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'category')
+    )
+
+    # Backfill from the existing transactions
+    op.execute("""
+        INSERT INTO daily_rollup (user_id, day, category, income_sum, expense_sum, income_count, expense_count)
+        SELECT user_id, date(date), category,
+               SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+               SUM(CASE WHEN amount <= 0 THEN -amount ELSE 0 END),
+               SUM(CASE WHEN amount > 0 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN amount <= 0 THEN 1 ELSE 0 END)
+        FROM budget_transaction
+        GROUP BY user_id, date(date), category
+    """)
+
+
+def downgrade():
+    op.drop_table('daily_rollup')
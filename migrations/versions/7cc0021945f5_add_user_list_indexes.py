@@ -0,0 +1,30 @@
+"""Add user list indexes
+
+Revision ID: 7cc0021945f5
+Revises: 074232e0741a
+Create Date: 2026-10-18 18:05:12.417093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7cc0021945f5'
+down_revision = '074232e0741a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('ix_user_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_user_role_created_at', ['role', 'created_at'], unique=False)
+        batch_op.create_index('ix_user_is_active_created_at', ['is_active', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_is_active_created_at')
+        batch_op.drop_index('ix_user_role_created_at')
+        batch_op.drop_index('ix_user_created_at')
@@ -0,0 +1,41 @@
+"""Add activity_event table
+
+Revision ID: 8922def65483
+Revises: 7cc0021945f5
+Create Date: 2026-10-18 18:42:37.220614
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8922def65483'
+down_revision = '7cc0021945f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('activity_event',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('username', sa.String(length=80), nullable=True),
+    sa.Column('action', sa.String(length=50), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=True),
+    sa.Column('details', sa.String(length=255), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('activity_event', schema=None) as batch_op:
+        batch_op.create_index('ix_activity_event_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_activity_event_action_created_at', ['action', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('activity_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_activity_event_action_created_at')
+        batch_op.drop_index('ix_activity_event_created_at')
+
+    op.drop_table('activity_event')
@@ -0,0 +1,62 @@
+"""Add case-folded user login keys and widen password_hash
+
+Revision ID: 8bb44650c555
+Revises: 8922def65483
+Create Date: 2026-10-18 19:20:05.631480
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8bb44650c555'
+down_revision = '8922def65483'
+branch_labels = None
+depends_on = None
+
+
+def login_key(value):
+    """auth.login_key as of this revision, copied so that the backfill stays the same."""
+    return (value or '').strip().casefold()
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('username_key', sa.String(length=80), nullable=True))
+        batch_op.add_column(sa.Column('email_key', sa.String(length=120), nullable=True))
+        # werkzeug's scrypt hashes are 162 characters long
+        batch_op.alter_column('password_hash', existing_type=sa.String(length=128), type_=sa.String(length=255))
+        batch_op.create_index('ix_user_username_key', ['username_key'], unique=False)
+        batch_op.create_index('ix_user_email_key', ['email_key'], unique=False)
+
+    # Case-fold the existing usernames and emails (in Python, as SQL lower() is ASCII-only on SQLite)
+    connection = op.get_bind()
+    users = sa.table(
+        'user',
+        sa.column('id', sa.Integer),
+        sa.column('username', sa.String),
+        sa.column('email', sa.String),
+        sa.column('username_key', sa.String),
+        sa.column('email_key', sa.String)
+    )
+    updates = [
+        {'row_id': row.id, 'username_value': login_key(row.username), 'email_value': login_key(row.email)}
+        for row in connection.execute(sa.select(users.c.id, users.c.username, users.c.email)).all()
+    ]
+    if updates:
+        connection.execute(
+            users.update()
+            .where(users.c.id == sa.bindparam('row_id'))
+            .values(username_key=sa.bindparam('username_value'), email_key=sa.bindparam('email_value')),
+            updates
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_email_key')
+        batch_op.drop_index('ix_user_username_key')
+        batch_op.alter_column('password_hash', existing_type=sa.String(length=255), type_=sa.String(length=128))
+        batch_op.drop_column('email_key')
+        batch_op.drop_column('username_key')
@@ -0,0 +1,30 @@
+"""Queue import jobs in the import_job table
+
+Revision ID: 99d81749e1ab
+Revises: 689975fa623d
+Create Date: 2026-10-18 22:10:31.277415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '99d81749e1ab'
+down_revision = '689975fa623d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('pdf_path', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_index('ix_import_job_status_id', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('import_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_import_job_status_id')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('pdf_path')
@@ -0,0 +1,43 @@
+"""Add ledger_snapshot table
+
+Revision ID: fcb19c5e4e5d
+Revises: 7061c13a5a1d
+Create Date: 2026-10-18 16:05:12.384910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fcb19c5e4e5d'
+down_revision = '7061c13a5a1d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ledger_snapshot',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'month')
+    )
+
+    # Backfill the month-end running balances from the daily rollups
+    if op.get_bind().dialect.name == 'postgresql':
+        month = "CAST(date_trunc('month', day) AS DATE)"
+    else:
+        month = "strftime('%Y-%m-01', day)"
+    op.execute(f"""
+        INSERT INTO ledger_snapshot (user_id, month, balance)
+        SELECT user_id, {month},
+               SUM(SUM(income_sum - expense_sum)) OVER (PARTITION BY user_id ORDER BY {month})
+        FROM daily_rollup
+        GROUP BY user_id, {month}
+    """)
+
+
+def downgrade():
+    op.drop_table('ledger_snapshot')
@@ -1,8 +1,10 @@
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import validates
 from datetime import datetime
+import json
 from enum import Enum
 from extensions import db
+from auth import login_key, hash_password, verify_password, needs_rehash
 
 class UserRole(Enum):
     NORMAL = 'normal'
@@ -39,10 +41,23 @@ class TransactionCategory(Enum):
 
 class User(UserMixin, db.Model):
     __tablename__ = 'user'
+    __table_args__ = (
+        # Admin user list, sorted by signup date and paged by (created_at, id)
+        db.Index('ix_user_created_at', 'created_at'),
+        # ...and the same filtered to a role or to (in)active users
+        db.Index('ix_user_role_created_at', 'role', 'created_at'),
+        db.Index('ix_user_is_active_created_at', 'is_active', 'created_at'),
+        # Login lookups, case-insensitive (see find_by_login); no two users may share a key
+        db.Index('ix_user_username_key', 'username_key', unique=True),
+        db.Index('ix_user_email_key', 'email_key', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    # Case-folded username and email, kept in step by _set_login_key
+    username_key = db.Column(db.String(80))
+    email_key = db.Column(db.String(120))
+    password_hash = db.Column(db.String(255))
     role = db.Column(db.Enum(UserRole), default=UserRole.NORMAL)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     trial_end_date = db.Column(db.DateTime, nullable=True)
@@ -61,11 +76,39 @@ class User(UserMixin, db.Model):
         self.email = email
         self.role = role
 
+    @validates('username', 'email')
+    def _set_login_key(self, key, value):
+        setattr(self, f'{key}_key', login_key(value))
+        return value
+
+    @classmethod
+    def find_by_login(cls, login_id):
+        """The user whose username or email is login_id, ignoring case.
+
+        Looks in one indexed key column: email for identifiers with an @,
+        username otherwise (and as a fallback for usernames with an @).
+        A user whose name matches exactly wins over other case variants.
+        """
+        key = login_key(login_id)
+        if not key:
+            return None
+        users = []
+        if '@' in key:
+            users = cls.query.filter(cls.email_key == key).all()
+        if not users:
+            users = cls.query.filter(cls.username_key == key).all()
+        exact = [user for user in users if login_id in (user.username, user.email)]
+        return (exact or users or [None])[0]
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Whether the stored hash uses another scheme or cost than PASSWORD_HASH_METHOD / BCRYPT_ROUNDS."""
+        return needs_rehash(self.password_hash)
     
     def update_last_login(self):
         self.last_login = datetime.utcnow()
@@ -98,28 +141,45 @@ class User(UserMixin, db.Model):
 
 class BudgetTransaction(db.Model):
     __tablename__ = 'budget_transaction'
+    __table_args__ = (
+        # Per-user date range scans (nearly every route)
+        db.Index('ix_budget_transaction_user_date', 'user_id', 'date'),
+        # Per-user category filters and groupings within a date range
+        db.Index('ix_budget_transaction_user_category_date', 'user_id', 'category', 'date'),
+        # Per-user income (amount > 0) / expense (amount < 0) filters
+        db.Index('ix_budget_transaction_user_amount', 'user_id', 'amount'),
+        # Import duplicate checks (see dedup.py)
+        db.Index('ix_budget_transaction_user_fingerprint', 'user_id', 'fingerprint'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    amount = db.Column(db.Float, nullable=False)
+    # Rollup-relevant columns keep their previous value loaded on change (see rollups.py)
+    amount = db.column_property(db.Column(db.Float, nullable=False), active_history=True)
     description = db.Column(db.String(200), nullable=False)
     type = db.Column(db.String(20), nullable=False)
-    date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    category = db.Column(db.String(50), nullable=False, default='UNCATEGORIZED')
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date = db.column_property(db.Column(db.DateTime, nullable=False, default=datetime.utcnow), active_history=True)
+    category = db.column_property(db.Column(db.String(50), nullable=False, default='UNCATEGORIZED'), active_history=True)
+    user_id = db.column_property(db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False), active_history=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    # Hash of user, day, amount and normalized description, set by dedup.py
+    fingerprint = db.Column(db.String(40), nullable=True)
 
     def __repr__(self):
         return f'<Transaction {self.description} {self.amount}>'
 
-    @property
-    def category_info(self):
+    @staticmethod
+    def info_for_category(category):
         # For custom categories, create a default category info
         return {
-            'name': self.category,
+            'name': category,
             'icon': 'bi-tag',
             'color': 'primary'
         }
 
+    @property
+    def category_info(self):
+        return self.info_for_category(self.category)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -133,6 +193,132 @@ class BudgetTransaction(db.Model):
     def __repr__(self):
         return f'<Transaction {self.description} {self.amount}>'
 
+class DailyRollup(db.Model):
+    """Per-user, per-day, per-category income/expense totals of BudgetTransaction.
+
+    Kept in sync by the session hooks in rollups.py; rebuild with `flask rebuild-rollups`.
+    """
+    __tablename__ = 'daily_rollup'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    income_sum = db.Column(db.Float, nullable=False, default=0)
+    expense_sum = db.Column(db.Float, nullable=False, default=0)
+    income_count = db.Column(db.Integer, nullable=False, default=0)
+    expense_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def count(self):
+        return self.income_count + self.expense_count
+
+    def __repr__(self):
+        return f'<DailyRollup user_id={self.user_id} {self.day} {self.category}>'
+
+class LedgerSnapshot(db.Model):
+    """Per-user running balance at the end of each month: the net of every transaction dated in or before it.
+
+    Kept in sync with DailyRollup by ledger.py. A month without a row has the
+    balance of the latest month before it.
+    """
+    __tablename__ = 'ledger_snapshot'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)  # First day of the month
+    balance = db.Column(db.Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<LedgerSnapshot user_id={self.user_id} {self.month} {self.balance}>'
+
+class UserDataVersion(db.Model):
+    """Per-user counter bumped in the same transaction as every write of the user's transactions.
+
+    Lets caches tell whether what they hold for a user is still current (see data_version.py).
+    """
+    __tablename__ = 'user_data_version'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<UserDataVersion user_id={self.user_id} {self.version}>'
+
+class ImportJob(db.Model):
+    """A statement import running in the background; the queued rows are the job queue (see import_jobs.py)."""
+    __tablename__ = 'import_job'
+    __table_args__ = (
+        # The runner claims the oldest queued job
+        db.Index('ix_import_job_status_id', 'status', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    pages_total = db.Column(db.Integer, nullable=True)
+    pages_done = db.Column(db.Integer, nullable=False, default=0)
+    rows_imported = db.Column(db.Integer, nullable=False, default=0)
+    rows_failed = db.Column(db.Integer, nullable=False, default=0)
+    rows_duplicate = db.Column(db.Integer, nullable=False, default=0)
+    row_errors = db.Column(db.Text, nullable=True)  # JSON list of {row, error}
+    error = db.Column(db.Text, nullable=True)
+    # The uploaded file, kept until the job is done or failed
+    pdf_path = db.Column(db.String(255), nullable=True)
+    # Runs started, including those cut short by a crash or a stopped runner
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ImportJob {self.id} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'status': self.status,
+            'pages_total': self.pages_total,
+            'pages_done': self.pages_done,
+            'rows_imported': self.rows_imported,
+            'rows_failed': self.rows_failed,
+            'rows_duplicate': self.rows_duplicate,
+            'errors': json.loads(self.row_errors) if self.row_errors else [],
+            'error': self.error,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'finished_at': self.finished_at.strftime('%Y-%m-%d %H:%M:%S') if self.finished_at else None
+        }
+
+class ActivityEvent(db.Model):
+    """An entry of the append-only activity log, written in batches (see activity.py)."""
+    __tablename__ = 'activity_event'
+    __table_args__ = (
+        # Admin activity feed, newest first and paged by (created_at, id)
+        db.Index('ix_activity_event_created_at', 'created_at'),
+        # ...filtered to one action, and the monthly growth counts
+        db.Index('ix_activity_event_action_created_at', 'action', 'created_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # No foreign key: the log keeps the events of deleted users, with their name at the time
+    user_id = db.Column(db.Integer, nullable=True)
+    username = db.Column(db.String(80), nullable=True)
+    action = db.Column(db.String(50), nullable=False)  # e.g. transaction.create, user.register
+    target_id = db.Column(db.Integer, nullable=True)  # id of the transaction, user or feedback acted on
+    details = db.Column(db.String(255), nullable=True)
+    quantity = db.Column(db.Integer, nullable=False, default=1)  # items covered, e.g. rows of an import
+
+    def __repr__(self):
+        return f'<ActivityEvent {self.id} {self.action}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'user_id': self.user_id,
+            'username': self.username,
+            'action': self.action,
+            'target_id': self.target_id,
+            'details': self.details,
+            'quantity': self.quantity
+        }
+
 class UserBudget(db.Model):
     __tablename__ = 'user_budget'
     id = db.Column(db.Integer, primary_key=True)
@@ -146,15 +332,24 @@ class UserBudget(db.Model):
     def __repr__(self):
         return f'<UserBudget user_id={self.user_id}>'
 
+# created_at given to feedback stored without one: pages are keyed on it, and this sorts them last
+UNDATED_FEEDBACK_CREATED_AT = datetime(1970, 1, 1)
+
 class Feedback(db.Model):
     __tablename__ = 'feedback'
+    __table_args__ = (
+        # Admin feedback list, newest first and paged by (created_at, id)
+        db.Index('ix_feedback_created_at', 'created_at'),
+        # ...and the same filtered to read or unread feedback
+        db.Index('ix_feedback_is_read_created_at', 'is_read', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), nullable=False)
     subject = db.Column(db.String(200), nullable=False)
     message = db.Column(db.Text, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     is_read = db.Column(db.Boolean, default=False, nullable=False)
     read_at = db.Column(db.DateTime, nullable=True)
 
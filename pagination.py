@@ -0,0 +1,76 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+# Page size used when a paged request gives no limit, and the largest one accepted
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse a limit query parameter; raises ValueError for non-positive numbers."""
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be a positive number')
+    return min(limit, maximum)
+
+def encode_cursor(*values):
+    """Opaque URL-safe cursor for the sort key values of the last row of a page."""
+    plain = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(plain).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, types):
+    """Decode a cursor back into its values, converting each with the matching type.
+
+    Raises ValueError for malformed cursors.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('invalid cursor')
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError('invalid cursor')
+    # Hand-made cursors can carry values of any JSON type
+    try:
+        return [_cursor_value(kind, value) for kind, value in zip(types, values)]
+    except (TypeError, ValueError):
+        raise ValueError('invalid cursor')
+
+def _cursor_value(kind, value):
+    if value is None or isinstance(value, (bool, list, dict)):
+        raise ValueError('invalid cursor value')
+    if kind is datetime:
+        return datetime.fromisoformat(value)
+    return kind(value)
+
+def keyset_page(query, sort_column, tie_column, after=None, limit=DEFAULT_PAGE_SIZE, descending=True):
+    """Fetch one page ordered by (sort_column, tie_column), starting after the given values.
+
+    Seeks past the previous page with a WHERE on the sort key instead of an
+    OFFSET, so every page costs the same index range scan. Returns the rows
+    and whether more rows follow.
+    """
+    if after is not None:
+        sort_value, tie_value = after
+        # The redundant bound on sort_column alone lets the index seek to the cursor
+        if descending:
+            query = query.filter(
+                sort_column <= sort_value,
+                or_(sort_column < sort_value, and_(sort_column == sort_value, tie_column < tie_value))
+            )
+        else:
+            query = query.filter(
+                sort_column >= sort_value,
+                or_(sort_column > sort_value, and_(sort_column == sort_value, tie_column > tie_value))
+            )
+
+    if descending:
+        query = query.order_by(sort_column.desc(), tie_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), tie_column.asc())
+
+    # One extra row tells whether there is a next page without a COUNT
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
@@ -1,109 +1,216 @@
 import csv
+import multiprocessing
 import PyPDF2
 import pdfplumber
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
-def extract_transactions_from_pdf(pdf_path):
-    """Extracts transactions from a PDF credit card bill by parsing the text."""
+# Version of the rows extracted from statements, part of the PdfCache key:
+# bump it whenever a change to the parsing gives other rows for the same file
+STATEMENT_PARSER_VERSION = 2
+
+def extract_transactions_from_pdf(pdf_path, workers=None, profile=None, cache=None):
+    """Extracts transactions from a PDF credit card bill by parsing the text.
+
+    With workers > 1 the pages are split into contiguous ranges that are
+    parsed in separate processes; results keep the page order. profile
+    names the registered statement layout to parse lines with. An optional
+    PdfCache returns the rows of a previously parsed copy of the same file.
+    """
+    cache_key = cache.key(pdf_path, profile) if cache else None
+    if cache_key:
+        transactions = cache.get(cache_key)
+        if transactions is not None:
+            return transactions
+
     transactions = []
     
     try:
         with pdfplumber.open(pdf_path) as pdf:
-            # Iterate through all pages in the PDF
-            for page in pdf.pages:
-                # Extract text from the page
-                text = page.extract_text()
-                if text:
-                    # Split the text into lines for easier processing
-                    lines = text.split('\n')
-                    
-                    for line in lines:
-                        
-                        # Filter lines that contain a date (DD.MM.YYYY format)
-                        if contains_date(line):
-                            #print(f'line are...',line)
-                            # Extract transaction details
-                            # Match patterns for date, description, and amount using regular expressions
-                            transaction = parse_transaction_line_nomral(line)
-                            if transaction:
-                                transactions.append(transaction)
+            page_count = len(pdf.pages)
+            parallel = bool(workers) and workers > 1 and page_count > 1
+            if not parallel:
+                # Iterate through all pages in the PDF
+                for page in pdf.pages:
+                    transactions.extend(extract_transactions_from_page(page, profile))
+
+        if parallel:
+            transactions = extract_transactions_parallel(pdf_path, page_count, workers, profile)
+
+        if cache_key:
+            cache.put(cache_key, transactions)
                         
-                       
     except Exception as e:
         print(f"Error reading PDF: {e}")
     
     print(f'final transactions are...',transactions)
     return transactions
 
-def contains_date(line):
+def split_page_ranges(page_count, parts):
+    """Split page indexes 0..page_count-1 into at most `parts` contiguous (start, end) ranges."""
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def extract_transactions_from_page_range(pdf_path, start, end, profile=None):
+    """Extracts the transactions of pages [start, end); each worker opens the file itself."""
+    transactions = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:end]:
+            transactions.extend(extract_transactions_from_page(page, profile))
+            # Drop the parsed layout objects, they are cached per page otherwise
+            page.flush_cache()
+    return transactions
+
+def extract_transactions_parallel(pdf_path, page_count, workers, profile=None, parts=None, progress=None):
+    """Parse page ranges across a process pool and merge them in page order.
+
+    parts splits the pages into that many ranges rather than one per
+    worker, so that progress (called with the number of pages parsed so
+    far) is reported more often than once per worker.
+    """
+    ranges = split_page_ranges(page_count, parts or workers)
+    chunks = [None] * len(ranges)
+    pages_done = 0
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {
+            executor.submit(extract_transactions_from_page_range, pdf_path, start, end, profile): index
+            for index, (start, end) in enumerate(ranges)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            chunks[index] = future.result()
+            start, end = ranges[index]
+            pages_done += end - start
+            if progress:
+                progress(pages_done)
+    return [transaction for chunk in chunks for transaction in chunk]
+
+class StatementProfile:
+    """Line layout of one bank's statements, compiled once at registration.
+
+    line_pattern must define the named groups date, place and amount and
+    may define description. Lines containing any of exclude_phrases, or a
+    second date, are skipped.
+    """
+
+    def __init__(self, name, line_pattern, exclude_phrases=(), date_pattern=r"\d{2}\.\d{2}\.\d{4}",
+                 date_format="%d.%m.%Y", thousands_separator='.', decimal_separator=','):
+        self.name = name
+        self.date_format = date_format
+        self.thousands_separator = thousands_separator
+        self.decimal_separator = decimal_separator
+        self.date_re = re.compile(date_pattern)
+
+        # Multiple dates (statement periods) and summary phrases in one alternation
+        exclusions = [date_pattern + ".*" + date_pattern] + [re.escape(phrase) for phrase in exclude_phrases]
+        self.exclude_re = re.compile("|".join(exclusions))
+
+        # Folding the exclusions into a lookahead lets a single match accept or reject a line
+        self.line_re = re.compile(r"(?!.*(?:%s))%s" % ("|".join(exclusions), line_pattern))
+
+    def parse_amount(self, amount_str):
+        """Convert a localized amount such as 1.234,56 or -12,50 to a float.
+
+        Amounts like 12.50, where the thousands separator is followed by one
+        or two digits and no decimal separator comes up, use it as a decimal
+        point (statements with dot decimals).
+        """
+        if self.thousands_separator:
+            head, separator, tail = amount_str.rpartition(self.thousands_separator)
+            if separator and self.decimal_separator not in amount_str and len(tail) in (1, 2):
+                return float(head.replace(self.thousands_separator, '') + '.' + tail)
+            amount_str = amount_str.replace(self.thousands_separator, '')
+        return float(amount_str.replace(self.decimal_separator, '.'))
+
+    def parse_line(self, line):
+        """Return the transaction dict for a statement line, or None if it is not one."""
+        match = self.line_re.fullmatch(line.strip())
+        if not match:
+            return None
+
+        fields = match.groupdict()
+        return {
+            'Date': fields['date'],
+            'Description': (fields.get('description') or '').strip(),
+            'Category': fields['place'].strip(),
+            'Amount': self.parse_amount(fields['amount'])
+        }
+
+# Statement profiles by name, see register_statement_profile()
+STATEMENT_PROFILES = {}
+
+DEFAULT_STATEMENT_PROFILE = 'default'
+
+def register_statement_profile(profile):
+    """Make a statement layout available to the PDF extraction functions by name."""
+    STATEMENT_PROFILES[profile.name] = profile
+    return profile
+
+def get_statement_profile(name=None):
+    return STATEMENT_PROFILES[name or DEFAULT_STATEMENT_PROFILE]
+
+# DD.MM.YYYY description place amount, e.g. "03.10.2024 REWE Markt Munich -1.234,56";
+# amounts with a dot decimal point ("12.50") are read as well
+register_statement_profile(StatementProfile(
+    DEFAULT_STATEMENT_PROFILE,
+    r"(?P<date>\d{2}\.\d{2}\.\d{4})(?: (?P<description>.*?))? (?P<place>\S+) (?P<amount>[-+]?\d{1,3}(?:\.\d{3})+(?:,\d+)?|[-+]?\d+(?:,\d+)?|[-+]?\d+\.\d{1,2})",
+    exclude_phrases=("Abrechnung vom", "Rechnung vom", "Mindestbetrag", "Karteninhabers", "Fällig", "5.000,00EUR", "NEUER")
+))
+
+def extract_transactions_from_page(page, profile=None):
+    """Extracts the transactions of a single pdfplumber page."""
+    statement_profile = get_statement_profile(profile)
+    transactions = []
+
+    # Cover pages, terms and conditions etc. carry no dated lines; skip them
+    # before paying for the layout analysis of extract_text()
+    if not page_may_contain_dates(page, statement_profile):
+        return transactions
+
+    # Extract text from the page
+    text = page.extract_text()
+    if text:
+        # Split the text into lines for easier processing
+        for line in text.split('\n'):
+            # One regex match both filters and splits a transaction line
+            transaction = statement_profile.parse_line(line)
+            if transaction:
+                transactions.append(transaction)
+
+    return transactions
+
+def page_may_contain_dates(page, statement_profile):
+    """Cheap pre-scan of the raw page characters for the profile's date pattern."""
+    # Characters come in content stream order, which keeps the digits of a date together
+    return bool(statement_profile.date_re.search(''.join(char['text'] for char in page.chars)))
+
+def contains_date(line, profile=None):
     """Check if the line contains a date in DD.MM.YYYY format."""
-    date_pattern = r"\d{2}\.\d{2}\.\d{4}"  # Date pattern (DD.MM.YYYY)
-    return bool(re.search(date_pattern, line))
+    return bool(get_statement_profile(profile).date_re.search(line))
 
-def is_valid_date(date_str):
+def is_valid_date(date_str, profile=None):
     """Check if the given string is a valid date in DD.MM.YYYY format."""
     try:
-        datetime.strptime(date_str, "%d.%m.%Y")
+        datetime.strptime(date_str, get_statement_profile(profile).date_format)
         return True
     except ValueError:
         return False
 
-def is_invalid_line(line):
+def is_invalid_line(line, profile=None):
     """Check if the line contains multiple dates or a non-transactional format."""
-    # Regex to detect multiple date patterns or date phrases (e.g., "Abrechnung vom")
-    if re.search(r"\d{2}\.\d{2}\.\d{4}.*\d{2}\.\d{2}\.\d{4}", line):  # Two dates in the line
-        return True
-    if "Abrechnung vom" in line or "Rechnung vom" in line or "Mindestbetrag" in line or "Karteninhabers" in line or "Fällig" in line or "5.000,00EUR" in line or "NEUER" in line:  # Date phrases or other non-transactional formats
-        return True
-    return False
+    return bool(get_statement_profile(profile).exclude_re.search(line))
 
-def parse_transaction_line_nomral(line):
+def parse_transaction_line_nomral(line, profile=None):
     """Parse a single line of text to extract date, description, place, and amount."""
-    # Split the line into parts
-    parts = line.strip().split(' ')
-    
-    # Check if the first part is a valid date (DD.MM.YYYY format)
-    if not is_valid_date(parts[0]) or is_invalid_line(line):
-        return None  # If not a valid date or invalid line (e.g., Abrechnung), ignore this line
-    
-
-    # First part is the date (assumed to be in DD.MM.YYYY format)
-    date = parts[0]
-    
-    # Try to find where the amount is located (the last part of the line)
-    amount_str = parts[-1]
-    
-    # Convert the amount to a float (handle commas)
-    amount = float(amount_str.replace(',', '.'))
-    
-    # The place is usually just before the amount
-    place = parts[-2]
-
-    # The description is everything between the date and the place
-    description = ' '.join(parts[1:-2])
-    
-    return {
-        'Date': date,
-        'Description': description.strip(),
-        'Category': place.strip(),
-        'Amount': amount
-    }
-    
-    
-    # Check each category's keywords
-    for category, keywords in categories.items():
-        if any(keyword in description for keyword in keywords):
-            return category
-    
-    return 'UNCATEGORIZED'
-
-    # Check each category's keywords
-    for category, keywords in categories.items():
-        if any(keyword in description for keyword in keywords):
-            return category
-    
-    return 'UNCATEGORIZED'
+    return get_statement_profile(profile).parse_line(line)
 
 def extract_transactions_from_csv(csv_path):
     """Reads a CSV credit card bill and extracts transactions."""
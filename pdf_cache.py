@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+from pdfProcessor import STATEMENT_PARSER_VERSION
+
+# Default on-disk budget for cached PDF extractions
+PDF_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class PdfCache:
+    """Extracted PDF transactions stored as JSON files keyed by content hash.
+
+    Recency is tracked with the file modification time: a hit touches the
+    entry and puts evict the least recently used entries until the cache
+    fits in max_bytes again.
+    """
+
+    def __init__(self, directory, max_bytes=PDF_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, pdf_path, profile=None):
+        # The same file parsed with another statement layout, or another parser version, gives other rows
+        return f"{file_sha256(pdf_path)}-{profile or 'default'}-v{STATEMENT_PARSER_VERSION}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        """Return the cached transactions for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                transactions = json.load(f)
+        except (OSError, ValueError):
+            return None
+        os.utime(path)
+        return transactions
+
+    def put(self, key, transactions):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        # Write then rename so a concurrent reader never sees half a file
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(transactions, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
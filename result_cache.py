@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from flask import current_app, request, g
+from flask_login import current_user
+from extensions import db
+from data_version import get_data_version
+
+# Rendered analytics responses kept per process (least recently used are dropped)
+RESULT_CACHE_ENTRIES = 1024
+
+class ResultCache:
+    """Bounded LRU of rendered responses, counting hits, misses and evictions."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+analytics_cache = ResultCache(RESULT_CACHE_ENTRIES)
+
+def current_data_version():
+    """The signed-in user's data version, read once per request."""
+    if 'data_version' not in g:
+        g.data_version = get_data_version(db.session.connection(), current_user.id)
+    return g.data_version
+
+def result_cache_key(user_id, version):
+    """Key of the current request's result for user_id at the given data version."""
+    return (
+        user_id,
+        request.endpoint,
+        tuple(sorted(request.view_args.items())),
+        tuple(sorted(request.args.items(multi=True))),
+        version,
+        # Periods like 'this month' move with the calendar, not only with the data
+        date.today()
+    )
+
+def cached_result(view):
+    """Serve a repeat call of an analytics endpoint from analytics_cache until the user's data changes.
+
+    Only successful responses are stored; errors are always recomputed.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Read the version before the data, so a stored result is never older than its key
+        version = current_data_version()
+        key = result_cache_key(current_user.id, version)
+
+        cached = analytics_cache.get(key)
+        if cached is not None:
+            body, mimetype = cached
+            return current_app.response_class(body, mimetype=mimetype)
+
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            analytics_cache.put(key, (response.get_data(), response.mimetype))
+        return response
+    return wrapper
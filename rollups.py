@@ -0,0 +1,146 @@
+import click
+from datetime import datetime
+from sqlalchemy import event, inspect, func, case, select
+from sqlalchemy.orm import Session
+from extensions import db
+from models import BudgetTransaction, DailyRollup, User
+from data_version import bump_data_versions
+from database import dialect_insert, date_bucket
+from ledger import ledger_deltas, apply_ledger_deltas, rebuild_ledger
+
+# Columns of DailyRollup that are accumulated on every write
+ROLLUP_COLUMNS = ['income_sum', 'expense_sum', 'income_count', 'expense_count']
+
+def add_delta(deltas, user_id, when, category, amount, sign=1):
+    """Record the effect of adding (sign=1) or removing (sign=-1) one transaction."""
+    day = when.date() if isinstance(when, datetime) else when
+    entry = deltas.setdefault((user_id, day, category), [0.0, 0.0, 0, 0])
+    if amount > 0:
+        entry[0] += sign * amount
+        entry[2] += sign
+    else:
+        entry[1] += sign * -amount
+        entry[3] += sign
+
+def apply_deltas(connection, deltas):
+    """Upsert accumulated deltas into daily_rollup, drop rows that became empty and update the ledger."""
+    rows = [
+        dict(zip(['user_id', 'day', 'category'] + ROLLUP_COLUMNS, key + tuple(values)))
+        for key, values in deltas.items()
+        if any(values)
+    ]
+    if not rows:
+        return
+
+    table = DailyRollup.__table__
+    stmt = dialect_insert(connection.dialect.name, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day, table.c.category],
+        set_={column: table.c[column] + stmt.excluded[column] for column in ROLLUP_COLUMNS}
+    )
+    connection.execute(stmt, rows)
+
+    # Days/categories whose last transaction was removed
+    user_ids = {row['user_id'] for row in rows}
+    connection.execute(
+        table.delete().where(
+            table.c.user_id.in_(user_ids),
+            table.c.income_count + table.c.expense_count <= 0
+        )
+    )
+
+    # Month-end balances move with the same deltas
+    apply_ledger_deltas(connection, ledger_deltas(deltas))
+
+def _previous_value(obj, name):
+    """Value of an attribute as it was loaded from the database, before any pending change."""
+    history = inspect(obj).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, name)
+
+def _remove_previous(deltas, obj):
+    add_delta(
+        deltas,
+        _previous_value(obj, 'user_id'),
+        _previous_value(obj, 'date'),
+        _previous_value(obj, 'category'),
+        _previous_value(obj, 'amount'),
+        sign=-1
+    )
+
+def _add_current(deltas, obj):
+    add_delta(deltas, obj.user_id, obj.date, obj.category, obj.amount)
+
+@event.listens_for(Session, 'after_flush')
+def sync_daily_rollups(session, flush_context):
+    """Keep daily_rollup in step with BudgetTransaction inserts, updates and deletes."""
+    deltas = {}
+    for obj in session.new:
+        if isinstance(obj, BudgetTransaction):
+            _add_current(deltas, obj)
+    for obj in session.deleted:
+        if isinstance(obj, BudgetTransaction):
+            _remove_previous(deltas, obj)
+    for obj in session.dirty:
+        if isinstance(obj, BudgetTransaction) and obj not in session.deleted:
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in ('user_id', 'date', 'category', 'amount')):
+                _remove_previous(deltas, obj)
+                _add_current(deltas, obj)
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+def rebuild_rollups(connection, user_id=None):
+    """Recompute daily_rollup, and the ledger snapshots built on it, from budget_transaction."""
+    table = DailyRollup.__table__
+    amount = BudgetTransaction.amount
+    day = date_bucket(BudgetTransaction.date, 'day', connection.dialect.name)
+
+    source = select(
+        BudgetTransaction.user_id,
+        day,
+        BudgetTransaction.category,
+        func.sum(case((amount > 0, amount), else_=0)),
+        func.sum(case((amount <= 0, -amount), else_=0)),
+        func.sum(case((amount > 0, 1), else_=0)),
+        func.sum(case((amount <= 0, 1), else_=0))
+    ).group_by(BudgetTransaction.user_id, day, BudgetTransaction.category)
+
+    delete = table.delete()
+    if user_id is not None:
+        source = source.where(BudgetTransaction.user_id == user_id)
+        delete = delete.where(table.c.user_id == user_id)
+
+    connection.execute(delete)
+    result = connection.execute(
+        table.insert().from_select(['user_id', 'day', 'category'] + ROLLUP_COLUMNS, source)
+    )
+    rebuild_ledger(connection, user_id)
+
+    # Anything cached from the old rollups is stale now
+    if user_id is not None:
+        bump_data_versions(connection, [user_id])
+    else:
+        bump_data_versions(connection, connection.execute(select(User.id)).scalars())
+    return result.rowcount
+
+def ensure_rollups():
+    """Backfill daily_rollup when it is empty but transactions already exist."""
+    has_rollups = db.session.query(DailyRollup.user_id).first() is not None
+    has_transactions = db.session.query(BudgetTransaction.id).first() is not None
+    if has_transactions and not has_rollups:
+        rebuild_rollups(db.session.connection())
+        db.session.commit()
+
+def init_rollups(app):
+    @app.cli.command('rebuild-rollups')
+    @click.option('--user-id', type=int, default=None, help='Only rebuild the rollups of this user.')
+    def rebuild_rollups_command(user_id):
+        """Rebuild the daily rollup and ledger snapshot tables from budget transactions."""
+        count = rebuild_rollups(db.session.connection(), user_id)
+        db.session.commit()
+        click.echo(f'Rebuilt {count} daily rollup rows')
@@ -1,9 +1,9 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, make_response
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, make_response, Response, stream_with_context
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta, date
 from decimal import Decimal
-from models import db, User, BudgetTransaction, UserRole, TransactionCategory, UserBudget
+from models import db, User, BudgetTransaction, UserRole, TransactionCategory, UserBudget, DailyRollup, LedgerSnapshot, ImportJob
 import json
 import random
 from enum import Enum
@@ -11,7 +11,22 @@ from extensions import mail
 from sqlalchemy import desc, func
 import secrets
 from flask_mail import Message
-from pdfProcessor import extract_transactions_from_pdf
+from importer import import_rows, iter_csv_rows, parse_columnar_row
+from exporter import iter_transactions_csv, iter_transactions_columnar
+from columnar import iter_columnar_rows
+from import_jobs import submit_pdf_import
+from aggregations import dashboard_buckets, category_totals
+from pagination import parse_limit, encode_cursor, decode_cursor, keyset_page
+from analytics import user_columns
+from ledger import monthly_balances, current_balances, balance_as_of, opening_balance
+from dashboard_data import month_bounds, week_bounds, daily_totals, weekly_totals, monthly_totals, utilization_metrics, financial_health
+from data_version import bump_data_versions
+from result_cache import cached_result
+from etags import conditional_get
+from search import filter_search
+from user_admin import user_stats
+from auth import login_key
+from activity import record_event, recent_activity
 import os
 from werkzeug.utils import secure_filename
 from flask_sqlalchemy import SQLAlchemy
@@ -41,6 +56,21 @@ def generate_color_for_category(category_name):
     lightness = 45  # Constant lightness
     return f'hsl({hue}, {saturation}%, {lightness}%)'
 
+def transactions_data(transactions, with_color=True):
+    """Rows of the dashboard's daily/weekly/monthly transaction tables."""
+    rows = []
+    for transaction in transactions:
+        row = {
+            'date': transaction.date.strftime('%Y-%m-%d'),
+            'description': transaction.description,
+            'category': transaction.category,
+            'amount': float(transaction.amount)
+        }
+        if with_color:
+            row['category_color'] = generate_color_for_category(transaction.category)
+        rows.append(row)
+    return rows
+
 def init_routes(app):
     # Make generate_color_for_category available in templates
     app.jinja_env.globals.update(
@@ -51,78 +81,15 @@ def init_routes(app):
     # Budget Utilization Metrics Route
     @app.route('/api/utilization-metrics/<int:year>/<int:month>')
     @login_required
+    @conditional_get
+    @cached_result
     def get_utilization_metrics(year, month):
         try:
-            # Get start and end dates for the month
-            start_date = datetime(year, month, 1)
-            if month == 12:
-                end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-
-            # Get user's budget settings or use defaults
+            # Get user's budget settings; defaults apply where none is set
             user_budget = UserBudget.query.filter_by(user_id=current_user.id).first()
-            
-            # Use default values if no budget is set
-            monthly_budget = float(user_budget.monthly_budget) if user_budget and user_budget.monthly_budget else 5000
-            quarterly_budget = float(user_budget.quarterly_budget) if user_budget and user_budget.quarterly_budget else 15000
-            yearly_budget = float(user_budget.yearly_budget) if user_budget and user_budget.yearly_budget else 60000
-
-            # Calculate monthly spending (for the selected month)
-            monthly_spending = db.session.query(func.sum(BudgetTransaction.amount))\
-                .filter(BudgetTransaction.user_id == current_user.id)\
-                .filter(BudgetTransaction.date >= start_date)\
-                .filter(BudgetTransaction.date <= end_date)\
-                .filter(BudgetTransaction.amount < 0)\
-                .scalar()
-            monthly_spending = abs(monthly_spending) if monthly_spending else 0
-
-            # Calculate quarterly spending (current quarter)
-            quarter = (month - 1) // 3 + 1
-            quarter_start = datetime(year, 3 * quarter - 2, 1)
-            if quarter == 4:
-                quarter_end = datetime(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                quarter_end = datetime(year, 3 * quarter + 1, 1) - timedelta(days=1)
-
-            quarterly_spending = db.session.query(func.sum(BudgetTransaction.amount))\
-                .filter(BudgetTransaction.user_id == current_user.id)\
-                .filter(BudgetTransaction.date >= quarter_start)\
-                .filter(BudgetTransaction.date <= quarter_end)\
-                .filter(BudgetTransaction.amount < 0)\
-                .scalar()
-            quarterly_spending = abs(quarterly_spending) if quarterly_spending else 0
-
-            # Calculate yearly spending (for the selected year)
-            year_start = datetime(year, 1, 1)
-            year_end = datetime(year, 12, 31)
-            yearly_spending = db.session.query(func.sum(BudgetTransaction.amount))\
-                .filter(BudgetTransaction.user_id == current_user.id)\
-                .filter(BudgetTransaction.date >= year_start)\
-                .filter(BudgetTransaction.date <= year_end)\
-                .filter(BudgetTransaction.amount < 0)\
-                .scalar()
-            yearly_spending = abs(yearly_spending) if yearly_spending else 0
-
-            # Print debug information
-            print(f"Monthly spending: {monthly_spending} (Budget: {monthly_budget})")
-            print(f"Quarterly spending: {quarterly_spending} (Budget: {quarterly_budget})")
-            print(f"Yearly spending: {yearly_spending} (Budget: {yearly_budget})")
 
-            return jsonify({
-                'monthly': {
-                    'spent': monthly_spending,
-                    'budget': monthly_budget
-                },
-                'quarterly': {
-                    'spent': quarterly_spending,
-                    'budget': quarterly_budget
-                },
-                'yearly': {
-                    'spent': yearly_spending,
-                    'budget': yearly_budget
-                }
-            })
+            # Spending for the selected month, its quarter and its year
+            return jsonify(utilization_metrics(user_columns(current_user.id), user_budget, year, month))
         except Exception as e:
             print(f"Error in get_utilization_metrics: {str(e)}")
             return jsonify({'error': str(e)}), 500
@@ -131,29 +98,8 @@ def init_routes(app):
     @app.route('/')
     def home():
         if current_user.is_authenticated:
-            # Get today's balance
-            today_start = datetime.combine(datetime.now().date(), datetime.min.time())
-            today_end = datetime.combine(datetime.now().date(), datetime.max.time())
-            today_transactions = BudgetTransaction.query.filter(
-                BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date.between(today_start, today_end)
-            ).all()
-            today_balance = sum(t.amount for t in today_transactions)
-
-            # Get this month's balance
-            month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            month_end = datetime.now()
-            month_transactions = BudgetTransaction.query.filter(
-                BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date.between(month_start, month_end)
-            ).all()
-            month_balance = sum(t.amount for t in month_transactions)
-
-            # Get total balance (all time)
-            all_transactions = BudgetTransaction.query.filter_by(
-                user_id=current_user.id
-            ).all()
-            total_balance = sum(t.amount for t in all_transactions)
+            # Today's and this month's balance from this month's rollup days, the all-time one from the latest ledger snapshot
+            today_balance, month_balance, total_balance = current_balances(current_user.id, datetime.now().date())
 
             # Get recent transactions (last 5)
             recent_transactions = BudgetTransaction.query.filter_by(
@@ -173,212 +119,65 @@ def init_routes(app):
     @login_required
     def dashboard():
         try:
-            # Calculate total income and expenses
-            total_income = db.session.query(func.sum(BudgetTransaction.amount))\
-                .filter(BudgetTransaction.user_id == current_user.id)\
-                .filter(BudgetTransaction.amount > 0).scalar() or 0
-
-            total_expenses = db.session.query(func.sum(BudgetTransaction.amount))\
-                .filter(BudgetTransaction.user_id == current_user.id)\
-                .filter(BudgetTransaction.amount < 0).scalar() or 0
-
-            net_balance = total_income - total_expenses
-
             # Get current date and calculate date ranges
             today = datetime.now().date()
             current_year = today.year
-            
-            # Get transactions for the whole year
-            year_start = datetime(current_year, 1, 1)
-            year_end = datetime(current_year, 12, 31, 23, 59, 59, 999999)
-            
-            year_transactions = BudgetTransaction.query.filter(
+
+            # Daily, weekly, monthly and yearly income/expense buckets in one grouped query
+            buckets = dashboard_buckets(current_user.id, today)
+
+            daily_data = [{
+                'date': day.strftime('%Y-%m-%d'),
+                'income': income,
+                'expenses': expenses
+            } for day, income, expenses in buckets['daily']]
+
+            weekly_data = [{
+                'week': f"{week_start.strftime('%b %d')} - {week_end.strftime('%b %d')}",
+                'income': income,
+                'expenses': expenses
+            } for week_start, week_end, income, expenses in buckets['weekly']]
+
+            monthly_data = [{
+                'month': month_start.strftime('%B'),
+                'income': income,
+                'expenses': expenses
+            } for month_start, income, expenses in buckets['monthly']]
+
+            yearly_data = [{
+                'year': str(year),
+                'income': income,
+                'expenses': expenses
+            } for year, income, expenses in buckets['yearly']]
+
+            # Total income and expenses for the current year up to today
+            _, total_income, total_expenses = buckets['yearly'][-1]
+            # Net balance of the year: the balance today less the closing balance of last year's snapshot
+            net_balance = balance_as_of(current_user.id, today) - opening_balance(current_user.id, date(current_year, 1, 1))
+
+            # Transactions of the last 5 years for the yearly transactions list
+            yearly_transactions = BudgetTransaction.query.filter(
                 BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date.between(
-                    datetime.combine(year_start, datetime.min.time()),
-                    datetime.combine(year_end, datetime.max.time())
-                )
+                BudgetTransaction.date >= datetime(current_year - 4, 1, 1),
+                BudgetTransaction.date <= datetime.combine(today, datetime.max.time())
             ).order_by(BudgetTransaction.date.desc()).all()
 
-            # Process category data for the whole year
-            categories = []
-            category_amounts = []
-            category_types = []
-            category_data = {}
-            
-            for transaction in year_transactions:
-                if transaction.category not in category_data:
-                    category_data[transaction.category] = {
-                        'amount': 0,
-                        'type': 'income' if transaction.amount > 0 else 'expense'
-                    }
-                category_data[transaction.category]['amount'] += abs(transaction.amount)
-            
-            # Sort categories by amount in descending order
-            sorted_categories = sorted(category_data.items(), key=lambda x: x[1]['amount'], reverse=True)
-            categories = [cat for cat, _ in sorted_categories]
-            category_amounts = [data['amount'] for _, data in sorted_categories]
-            category_types = [data['type'] for _, data in sorted_categories]
-
-            # Get daily data for current month
-            start_of_month = today.replace(day=1)
-            if today.month == 12:
-                next_month = today.replace(year=today.year + 1, month=1, day=1)
-            else:
-                next_month = today.replace(month=today.month + 1, day=1)
-            days_in_month = (next_month - start_of_month).days
-
-            # Daily transactions (all days in current month)
-            daily_data = []
-            daily_transactions = []
-
-            for day in range(days_in_month):
-                date = start_of_month + timedelta(days=day)
-                start_of_day = datetime.combine(date, datetime.min.time())
-                end_of_day = datetime.combine(date, datetime.max.time())
-
-                # Get transactions for this day
-                day_transactions = BudgetTransaction.query.filter(
-                    BudgetTransaction.user_id == current_user.id,
-                    BudgetTransaction.date.between(start_of_day, end_of_day)
-                ).order_by(BudgetTransaction.date.desc()).all()
-                
-                daily_transactions.extend(day_transactions)
-
-                # Calculate daily totals
-                income = sum(t.amount for t in day_transactions if t.amount > 0)
-                expenses = abs(sum(t.amount for t in day_transactions if t.amount < 0))
-
-                daily_data.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'income': float(income),
-                    'expenses': float(expenses)
-                })
-
-            # Weekly transactions (last 4 weeks)
-            weekly_data = []
-            weekly_transactions = []  # List to store weekly transactions
-            
-            for i in range(3, -1, -1):
-                week_end = start_of_month - timedelta(days=i*7)
-                week_start = week_end - timedelta(days=6)
-                
-                # Get transactions for this week
-                week_transactions = BudgetTransaction.query.filter(
-                    BudgetTransaction.user_id == current_user.id,
-                    BudgetTransaction.date.between(
-                        datetime.combine(week_start, datetime.min.time()),
-                        datetime.combine(week_end, datetime.max.time())
-                    )
-                ).order_by(BudgetTransaction.date.desc()).all()
-                weekly_transactions.extend(week_transactions)
-                
-                # Calculate weekly totals
-                income = sum(t.amount for t in week_transactions if t.amount > 0)
-                expenses = abs(sum(t.amount for t in week_transactions if t.amount < 0))
-                
-                weekly_data.append({
-                    'week': f"{week_start.strftime('%b %d')} - {week_end.strftime('%b %d')}",
-                    'income': float(income),
-                    'expenses': float(expenses)
-                })
-
-            # Monthly transactions (current year)
-            current_year = today.year
-            monthly_data = []
-            monthly_transactions = []  # List to store monthly transactions
-            
-            for month in range(1, 13):
-                month_start = datetime(current_year, month, 1)
-                if month == 12:
-                    month_end = datetime(current_year + 1, 1, 1) - timedelta(days=1)
-                else:
-                    month_end = datetime(current_year, month + 1, 1) - timedelta(days=1)
-                    
-                # Get transactions for this month
-                month_transactions = BudgetTransaction.query.filter(
-                    BudgetTransaction.user_id == current_user.id,
-                    BudgetTransaction.date.between(
-                        datetime.combine(month_start, datetime.min.time()),
-                        datetime.combine(month_end, datetime.max.time())
-                    )
-                ).order_by(BudgetTransaction.date.desc()).all()
-                monthly_transactions.extend(month_transactions)
-                
-                # Calculate monthly totals
-                income = sum(t.amount for t in month_transactions if t.amount > 0)
-                expenses = abs(sum(t.amount for t in month_transactions if t.amount < 0))
-                
-                monthly_data.append({
-                    'month': month_start.strftime('%B'),
-                    'income': float(income),
-                    'expenses': float(expenses)
-                })
-
-            # Yearly transactions (last 5 years)
-            yearly_data = []
-            yearly_transactions = []  # List to store yearly transactions
-            
-            for i in range(4, -1, -1):
-                year = today.year - i
-                year_start = datetime(year, 1, 1).date()
-                year_end = datetime(year, 12, 31).date() if i > 0 else today
-                    
-                # Get transactions for this year
-                year_transactions = BudgetTransaction.query.filter(
-                    BudgetTransaction.user_id == current_user.id,
-                    BudgetTransaction.date.between(
-                        datetime.combine(year_start, datetime.min.time()),
-                        datetime.combine(year_end, datetime.max.time())
-                    )
-                ).order_by(BudgetTransaction.date.desc()).all()
-                yearly_transactions.extend(year_transactions)
-                
-                # Calculate yearly totals
-                income = sum(t.amount for t in year_transactions if t.amount > 0)
-                expenses = abs(sum(t.amount for t in year_transactions if t.amount < 0))
-                
-                yearly_data.append({
-                    'year': str(year),
-                    'income': float(income),
-                    'expenses': float(expenses)
-                })
-
-            # Calculate total income, expenses, and net balance
-            total_income = sum(t.amount for t in year_transactions if t.amount > 0)
-            total_expenses = abs(sum(t.amount for t in year_transactions if t.amount < 0))
-            net_balance = total_income - total_expenses
-
             # Get category summary for the entire year
-            current_year = datetime.now().year
-            year_start = datetime(current_year, 1, 1)
-            year_end = datetime(current_year, 12, 31)
-
-            category_summary = db.session.query(
-                BudgetTransaction.category.label('category'),
-                func.sum(BudgetTransaction.amount).label('total')
-            ).filter(
-                BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date >= year_start,
-                BudgetTransaction.date <= year_end
-            ).group_by(
-                BudgetTransaction.category
-            ).order_by(
-                func.abs(func.sum(BudgetTransaction.amount)).desc()
-            ).all()
-
-            # Convert category names to display names using TransactionCategory
             category_summary = [
                 {
-                    'category': TransactionCategory.get_by_name(item.category).value['name'],
-                    'total': float(item.total)
+                    'category': TransactionCategory.get_by_name(category).value['name'],
+                    'total': total
                 }
-                for item in category_summary
+                for category, total in category_totals(
+                    current_user.id,
+                    date(current_year, 1, 1),
+                    date(current_year + 1, 1, 1)
+                )
             ]
 
             # Get category types for the pie chart
             categories = [item['category'] for item in category_summary]
-            category_amounts = [abs(float(item['total'])) for item in category_summary]
+            category_amounts = [abs(item['total']) for item in category_summary]
             category_types = ['income' if item['total'] > 0 else 'expense' for item in category_summary]
 
             # Get recent transactions
@@ -388,27 +187,6 @@ def init_routes(app):
                 desc(BudgetTransaction.date)
             ).limit(5).all()
 
-            # Get transactions for the current month
-            today = datetime.now()
-            start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            
-            transactions = BudgetTransaction.query.filter(
-                BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date >= start_of_month
-            ).all()
-
-            # Calculate category distribution
-            category_totals = {}
-            for transaction in transactions:
-                category = transaction.category
-                if category not in category_totals:
-                    category_totals[category] = 0
-                category_totals[category] += abs(transaction.amount)
-
-            # Convert to list of categories and amounts
-            categories = list(category_totals.keys())
-            amounts = list(category_totals.values())
-
             # Render the dashboard template with all the data
             return render_template('dashboard.html',
                                 daily_data=daily_data,
@@ -416,9 +194,6 @@ def init_routes(app):
                                 monthly_data=monthly_data,
                                 yearly_data=yearly_data,
                                 category_summary=category_summary,
-                                daily_transactions=daily_transactions,
-                                weekly_transactions=weekly_transactions,
-                                monthly_transactions=monthly_transactions,
                                 yearly_transactions=yearly_transactions,
                                 categories=categories,
                                 category_amounts=category_amounts,
@@ -427,7 +202,7 @@ def init_routes(app):
                                 total_income=total_income,
                                 total_expenses=total_expenses,
                                 net_balance=net_balance,
-                                current_year=datetime.now().year)
+                                current_year=current_year)
         
         except Exception as e:
             print(f"Error in dashboard route: {str(e)}")
@@ -470,8 +245,11 @@ def init_routes(app):
                 flash('Password must be at least 8 characters long')
                 return redirect(url_for('register'))
             
-            # Check if email already exists
-            if User.query.filter_by(email=email).first():
+            # Check if username or email already exists, in any letter case
+            if User.query.filter_by(username_key=login_key(name)).first():
+                flash('Username already taken')
+                return redirect(url_for('register'))
+            if User.query.filter_by(email_key=login_key(email)).first():
                 flash('Email already registered')
                 return redirect(url_for('register'))
             
@@ -482,6 +260,7 @@ def init_routes(app):
             
             try:
                 db.session.commit()
+                record_event('user.register', details=f'New user registration: {user.username}', target_id=user.id, user=user)
                 
                 # Send welcome email
                 try:
@@ -531,17 +310,21 @@ The Budget Tracker Team
             password = request.form.get('password')
             remember = True if request.form.get('remember') else False
 
-            # Try to find user by username or email
-            user = User.query.filter(
-                (User.username == login_id) | (User.email == login_id)
-            ).first()
+            # Case-insensitive lookup through one index (email if login_id has an @, else username)
+            user = User.find_by_login(login_id)
 
             if user and user.check_password(password):
                 if not user.is_active:
                     flash('Account is inactive. Please contact support.', 'danger')
                     return redirect(url_for('login'))
+
+                # Re-hash with the configured scheme/cost while the plain password is at hand
+                if user.password_needs_rehash():
+                    user.set_password(password)
+                    db.session.commit()
                 
                 login_user(user, remember=remember)
+                record_event('user.login', target_id=user.id, user=user)
                 
                 # Redirect admin users to admin dashboard
                 if user.role == UserRole.ADMIN:
@@ -569,35 +352,15 @@ The Budget Tracker Team
             flash('Access denied. Admin privileges required.', 'danger')
             return redirect(url_for('dashboard'))
 
-        # Get statistics for admin dashboard
-        stats = {
-            'total_users': User.query.count(),
-            'active_users': User.query.filter_by(is_active=True).count(),
-            'pro_users': User.query.filter_by(role=UserRole.ADMIN).count(),
-            'total_transactions': BudgetTransaction.query.count()
-        }
-        
-        # Calculate percentages
-        stats['active_percentage'] = round((stats['active_users'] / stats['total_users']) * 100 if stats['total_users'] > 0 else 0)
-        stats['pro_percentage'] = round((stats['pro_users'] / stats['total_users']) * 100 if stats['total_users'] > 0 else 0)
-        
-        # Mock growth data
-        stats['user_growth'] = 15
-        stats['transaction_growth'] = 23
-
-        # Get recent activity
-        recent_activity = [
-            {'user': 'john_doe', 'action': 'Created account', 'details': 'New user registration', 'time': '2 hours ago'},
-            {'user': 'jane_smith', 'action': 'Added transaction', 'details': 'Expense: Groceries $150', 'time': '3 hours ago'},
-            {'user': 'admin', 'action': 'Updated user', 'details': 'Modified user role', 'time': '4 hours ago'}
-        ]
+        # User and transaction counts and growth, shared with /api/admin/stats and cached briefly
+        stats = user_stats()
 
         # Get new users
         new_users = User.query.order_by(User.id.desc()).limit(5).all()
 
         return render_template('admin/dashboard.html', 
                             stats=stats, 
-                            recent_activity=recent_activity,
+                            recent_activity=recent_activity(),
                             new_users=new_users)
 
     # API Routes
@@ -607,9 +370,33 @@ The Budget Tracker Team
         categories = [category.value for category in TransactionCategory]
         return jsonify(categories)
 
+    # Columns selectable through /api/transactions?fields=
+    TRANSACTION_FIELDS = {
+        'id': BudgetTransaction.id,
+        'date': BudgetTransaction.date,
+        'amount': BudgetTransaction.amount,
+        'description': BudgetTransaction.description,
+        'type': BudgetTransaction.type,
+        'category': BudgetTransaction.category
+    }
+
+    def serialize_transaction_field(name, value):
+        if name == 'date':
+            return value.strftime('%Y-%m-%d')
+        if name == 'amount':
+            return float(value)
+        if name == 'category':
+            return BudgetTransaction.info_for_category(value)
+        return value
+
     @app.route('/api/transactions', methods=['GET'])
     @login_required
+    @conditional_get
     def get_transactions():
+        # Without limit/cursor/fields: the whole period as a JSON array (legacy).
+        # With any of them: one page {'transactions', 'next_cursor'}; send
+        # next_cursor back as cursor for the following page.
+        # q= keeps only descriptions containing words starting with each of its words.
         period = request.args.get('period', 'month')  # Default to month view
         query = BudgetTransaction.query.filter_by(user_id=current_user.id)
         
@@ -622,16 +409,52 @@ The Budget Tracker Team
             elif period == 'year':
                 start_date = today - timedelta(days=365)
             query = query.filter(BudgetTransaction.date >= start_date)
+
+        query, relevance = filter_search(query, current_user.id, request.args.get('q'))
         
-        transactions = query.order_by(BudgetTransaction.date.desc()).all()
-        return jsonify([{
-            'id': t.id,
-            'date': t.date.strftime('%Y-%m-%d'),
-            'amount': float(t.amount),
-            'description': t.description,
-            'type': t.type,
-            'category': t.category_info
-        } for t in transactions])
+        paged = any(name in request.args for name in ('limit', 'cursor', 'fields'))
+        if not paged:
+            # Best matches first when searching; pages keep date order so cursors stay valid
+            order = [BudgetTransaction.date.desc()] if relevance is None else [relevance, BudgetTransaction.date.desc()]
+            transactions = query.order_by(*order).all()
+            return jsonify([{
+                'id': t.id,
+                'date': t.date.strftime('%Y-%m-%d'),
+                'amount': float(t.amount),
+                'description': t.description,
+                'type': t.type,
+                'category': t.category_info
+            } for t in transactions])
+
+        fields = [name.strip() for name in request.args.get('fields', ','.join(TRANSACTION_FIELDS)).split(',') if name.strip()]
+        unknown = [name for name in fields if name not in TRANSACTION_FIELDS]
+        if unknown:
+            return jsonify({'error': f'Unknown fields: {", ".join(unknown)}'}), 400
+
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor, (datetime, int)) if cursor else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Fetch plain tuples of the requested columns plus the (date, id) sort key
+        columns = [BudgetTransaction.date, BudgetTransaction.id] + [TRANSACTION_FIELDS[name] for name in fields]
+        rows, has_more = keyset_page(
+            query.with_entities(*columns),
+            BudgetTransaction.date,
+            BudgetTransaction.id,
+            after=after,
+            limit=limit
+        )
+
+        return jsonify({
+            'transactions': [
+                {name: serialize_transaction_field(name, value) for name, value in zip(fields, row[2:])}
+                for row in rows
+            ],
+            'next_cursor': encode_cursor(rows[-1][0], rows[-1][1]) if has_more else None
+        })
 
     @app.route('/api/transactions', methods=['POST'])
     @login_required
@@ -651,6 +474,7 @@ The Budget Tracker Team
             
             db.session.add(transaction)
             db.session.commit()
+            record_event('transaction.create', details=f'{transaction.type.title()}: {transaction.category} {transaction.amount:.2f}', target_id=transaction.id)
             
             return jsonify({
                 'message': 'Transaction created successfully',
@@ -684,6 +508,7 @@ The Budget Tracker Team
                 transaction.category = data['category'].strip()
             
             db.session.commit()
+            record_event('transaction.update', details=f'Changed: {", ".join(sorted(data))}', target_id=id)
             return jsonify({'message': 'Transaction updated successfully'}), 200
             
         except Exception as e:
@@ -701,6 +526,7 @@ The Budget Tracker Team
         
         db.session.delete(transaction)
         db.session.commit()
+        record_event('transaction.delete', target_id=transaction_id)
         
         return jsonify({'message': 'Transaction deleted successfully'}), 200
 
@@ -716,97 +542,70 @@ The Budget Tracker Team
         
         # Check file extension
         file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in ['.csv', '.pdf']:
-            return jsonify({'error': 'File must be a CSV or PDF'}), 400
+        if file_ext not in ['.csv', '.pdf', '.btcol']:
+            return jsonify({'error': 'File must be a CSV, PDF or columnar export (.btcol)'}), 400
         
         try:
-            transactions_data = []
-            
-            if file_ext == '.csv':
-                # Handle CSV file
-                stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
-                csv_reader = csv.DictReader(stream)
-                transactions_data = list(csv_reader)
+            if file_ext == '.pdf':
+                # Parse PDF statements in the background and let the client poll the job
+                job = submit_pdf_import(app, current_user.id, file)
+                return jsonify({
+                    'message': 'Import started',
+                    'job': job.to_dict()
+                }), 202
+
+            if file_ext == '.btcol':
+                # Columnar backups carry typed values, no text parsing needed
+                report = import_rows(iter_columnar_rows(file.stream), current_user.id, parse_row=parse_columnar_row)
             else:
-                # Handle PDF file
-                # Save the uploaded file temporarily
-                temp_path = os.path.join('temp', secure_filename(file.filename))
-                os.makedirs('temp', exist_ok=True)
-                file.save(temp_path)
-                
-                try:
-                    # Extract transactions from PDF
-                    transactions_data = extract_transactions_from_pdf(temp_path)
-                finally:
-                    # Clean up the temporary file
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
-            
-            # Process transactions
-            for row in transactions_data:
-                try:
-                    # Handle date format from PDF (DD.MM.YYYY) or CSV (YYYY-MM-DD)
-                    date_str = row.get('Date', row.get('date', ''))
-                    if '.' in date_str:  # PDF format
-                        date = datetime.strptime(date_str, '%d.%m.%Y')
-                    else:  # CSV format
-                        date = datetime.strptime(date_str, '%Y-%m-%d')
-                    
-                    # Get amount and ensure it's a float
-                    amount_str = str(row.get('Amount', row.get('amount', '0')))
-                    amount = float(amount_str.replace('€', '').replace(',', '.').strip())
-                    
-                    # Create transaction
-                    transaction = BudgetTransaction(
-                        user_id=current_user.id,
-                        date=date,
-                        description=row.get('Description', row.get('description', '')).strip(),
-                        amount=amount,
-                        category=row.get('Category', row.get('category', 'UNCATEGORIZED')).strip(),
-                        type='income' if amount > 0 else 'expense'
-                    )
-                    db.session.add(transaction)
-                except (ValueError, KeyError) as e:
-                    print(f"Error processing transaction: {str(e)}")
-                    continue
-            
-            db.session.commit()
-            return jsonify({'message': 'Transactions imported successfully'}), 200
+                # Stream the CSV file: decode, parse and insert it batch by batch
+                report = import_rows(iter_csv_rows(file.stream), current_user.id)
+            record_event('transaction.import', details=f'{report.imported} rows from {file_ext[1:]} file', quantity=report.imported)
+            return jsonify({
+                'message': 'Transactions imported successfully',
+                **report.to_dict()
+            }), 200
             
         except Exception as e:
             db.session.rollback()
             print(f"Error importing transactions: {str(e)}")
             return jsonify({'error': str(e)}), 400
 
+    @app.route('/api/import-jobs/<int:job_id>')
+    @login_required
+    def get_import_job(job_id):
+        job = ImportJob.query.filter_by(
+            id=job_id,
+            user_id=current_user.id
+        ).first_or_404()
+        return jsonify(job.to_dict())
+
     @app.route('/api/transactions/export')
     @login_required
     def export_transactions():
-        # Get all transactions for the current user
-        transactions = BudgetTransaction.query\
-            .filter_by(user_id=current_user.id)\
-            .order_by(BudgetTransaction.date.desc())\
-            .all()
-        
-        # Create CSV in memory
-        si = io.StringIO()
-        cw = csv.writer(si)
-        
-        # Write header
-        cw.writerow(['Date', 'Description', 'Amount', 'Type', 'Category'])
+        # Optional filters: start/end dates (YYYY-MM-DD, both inclusive) and category
+        try:
+            start = datetime.strptime(request.args['start'], '%Y-%m-%d') if request.args.get('start') else None
+            end = datetime.strptime(request.args['end'], '%Y-%m-%d') + timedelta(days=1) if request.args.get('end') else None
+        except ValueError:
+            return jsonify({'error': 'Dates must use the YYYY-MM-DD format'}), 400
+        category = request.args.get('category')
         
-        # Write transactions
-        for transaction in transactions:
-            cw.writerow([
-                transaction.date.strftime('%Y-%m-%d'),
-                transaction.description,
-                transaction.amount,
-                transaction.type,
-                transaction.category
-            ])
+        # format=columnar exports the compact binary format of columnar.py
+        if request.args.get('format') == 'columnar':
+            output = Response(
+                stream_with_context(iter_transactions_columnar(current_user.id, start, end, category)),
+                mimetype='application/octet-stream'
+            )
+            output.headers["Content-Disposition"] = "attachment; filename=transactions.btcol"
+            return output
         
-        output = make_response(si.getvalue())
+        # Stream the CSV as it is read instead of building it in memory
+        output = Response(
+            stream_with_context(iter_transactions_csv(current_user.id, start, end, category)),
+            mimetype='text/csv'
+        )
         output.headers["Content-Disposition"] = "attachment; filename=transactions.csv"
-        output.headers["Content-type"] = "text/csv"
         
         return output
 
@@ -816,7 +615,12 @@ The Budget Tracker Team
         try:
             # Delete all transactions for the current user
             BudgetTransaction.query.filter_by(user_id=current_user.id).delete()
+            # Bulk deletes bypass the session hooks, so clear the rollups and ledger explicitly
+            DailyRollup.query.filter_by(user_id=current_user.id).delete()
+            LedgerSnapshot.query.filter_by(user_id=current_user.id).delete()
+            bump_data_versions(db.session.connection(), [current_user.id])
             db.session.commit()
+            record_event('transaction.delete_all')
             return jsonify({'message': 'All transactions deleted successfully'}), 200
         except Exception as e:
             db.session.rollback()
@@ -848,7 +652,7 @@ The Budget Tracker Team
             if not email:
                 return jsonify({'error': 'Email is required'}), 400
                 
-            user = User.query.filter_by(email=email).first()
+            user = User.query.filter_by(email_key=login_key(email)).first()
             if not user:
                 # Return success even if user doesn't exist for security
                 return jsonify({
@@ -919,6 +723,7 @@ This link will expire in 1 hour.
         end_date = request.args.get('endDate')
         transaction_type = request.args.get('type', 'all')
         category = request.args.get('category', 'all')
+        search = request.args.get('q', '')
 
         # Base query
         query = BudgetTransaction.query.filter_by(user_id=current_user.id)
@@ -951,8 +756,12 @@ This link will expire in 1 hour.
         if category != 'all':
             query = query.filter(BudgetTransaction.category == category)
 
-        # Get transactions with filters applied
-        transactions = query.order_by(BudgetTransaction.date.desc()).all()
+        # Apply description search
+        query, relevance = filter_search(query, current_user.id, search)
+
+        # Get transactions with filters applied, best matches first when searching
+        order = [BudgetTransaction.date.desc()] if relevance is None else [relevance, BudgetTransaction.date.desc()]
+        transactions = query.order_by(*order).all()
 
         # Calculate totals from filtered transactions
         total_income = sum(t.amount for t in transactions if t.amount > 0)
@@ -973,7 +782,8 @@ This link will expire in 1 hour.
                                'startDate': start_date,
                                'endDate': end_date,
                                'type': transaction_type,
-                               'category': category
+                               'category': category,
+                               'q': search
                            })
 
     @app.route('/download_sample_csv')
@@ -1082,153 +892,44 @@ This link will expire in 1 hour.
 
     @app.route('/api/daily-data/<int:year>/<int:month>')
     @login_required
+    @conditional_get
+    @cached_result
     def get_daily_data(year, month):
         try:
-            # Calculate start and end dates for the specified month
-            start_date = datetime(year, month, 1)
-            if month == 12:
-                end_date = datetime(year + 1, 1, 1)
-            else:
-                end_date = datetime(year, month + 1, 1)
-        
-            # Get number of days in the month
-            days_in_month = (end_date - start_date).days
-        
-            # Initialize daily data
-            daily_data = []
-        
-            # Get all transactions for the month
-            transactions = BudgetTransaction.query.filter(
-                BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date >= start_date,
-                BudgetTransaction.date < end_date
-            ).order_by(BudgetTransaction.date.desc()).all()
-
-            # Group transactions by day
-            transactions_by_day = {}
-            for transaction in transactions:
-                day = transaction.date.day
-                if day not in transactions_by_day:
-                    transactions_by_day[day] = []
-                transactions_by_day[day].append(transaction)
-        
-            # Calculate daily totals for each day in the month
-            for day in range(1, days_in_month + 1):
-                date = start_date + timedelta(days=day-1)
-                day_transactions = transactions_by_day.get(day, [])
-            
-                income = sum(t.amount for t in day_transactions if t.amount > 0)
-                expenses = abs(sum(t.amount for t in day_transactions if t.amount < 0))
-            
-                daily_data.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'income': float(income),
-                    'expenses': float(expenses)
-                })
-        
-            return jsonify(daily_data)
+            # Daily totals for every day of the month
+            return jsonify(daily_totals(user_columns(current_user.id), year, month))
         
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/weekly-data/<int:year>/<int:month>/<int:week>')
     @login_required
+    @conditional_get
+    @cached_result
     def get_weekly_data(year, month, week):
         try:
-            # Calculate the first day of the month
-            first_day = datetime(year, month, 1)
-            
-            # Calculate the last day of the month
-            if month == 12:
-                last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                last_day = datetime(year, month + 1, 1) - timedelta(days=1)
-            
-            # Calculate the start and end dates for the selected week
-            # First, get the weekday of the first day (0 = Monday, 6 = Sunday)
-            first_weekday = first_day.weekday()
-            
-            # Calculate the start date of the selected week
-            week_start = first_day + timedelta(days=(week-1)*7 - first_weekday)
-            week_end = week_start + timedelta(days=6)
-            
-            # Ensure we don't go beyond the month boundaries
-            week_start = max(week_start, first_day)
-            week_end = min(week_end, last_day)
-            
-            # Get all transactions for the week
-            transactions = BudgetTransaction.query.filter(
-                BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date >= week_start,
-                BudgetTransaction.date <= week_end
-            ).order_by(BudgetTransaction.date.desc()).all()
-            
-            # Group transactions by day
-            daily_data = []
-            current_date = week_start
-            
-            while current_date <= week_end:
-                # Get transactions for current day
-                day_transactions = [t for t in transactions if t.date.date() == current_date.date()]
-                
-                # Calculate totals
-                income = sum(t.amount for t in day_transactions if t.amount > 0)
-                expenses = abs(sum(t.amount for t in day_transactions if t.amount < 0))
-                
-                # Add data point
-                daily_data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'day': current_date.strftime('%A'),  # Day name (Monday, Tuesday, etc.)
-                    'income': float(income),
-                    'expenses': float(expenses)
-                })
-                
-                current_date += timedelta(days=1)
-        
-            return jsonify(daily_data)
+            # Daily totals for every day of the selected week, clipped to the month
+            return jsonify(weekly_totals(user_columns(current_user.id), year, month, week))
         
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/monthly-overview/<int:year>')
     @login_required
+    @conditional_get
+    @cached_result
     def get_monthly_overview(year):
         try:
-            # Calculate start and end dates for the year
-            start_date = datetime(year, 1, 1)
-            end_date = datetime(year + 1, 1, 1)
-
-            # Get all transactions for the year
-            transactions = BudgetTransaction.query.filter(
-                BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date >= start_date,
-                BudgetTransaction.date < end_date
-            ).order_by(BudgetTransaction.date).all()
-
-            # Initialize monthly data
-            monthly_data = []
-            for month in range(1, 13):
-                monthly_data.append({
-                    'month': month,
-                    'income': 0,
-                    'expenses': 0
-                })
-
-            # Calculate monthly totals
-            for transaction in transactions:
-                month_idx = transaction.date.month - 1
-                if transaction.amount > 0:
-                    monthly_data[month_idx]['income'] += float(transaction.amount)
-                else:
-                    monthly_data[month_idx]['expenses'] += abs(float(transaction.amount))
-
-            return jsonify(monthly_data)
+            # Monthly totals from the user's rollup columns
+            return jsonify(monthly_totals(user_columns(current_user.id), year))
 
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/monthly-overview-by-year/<int:year>')
     @login_required
+    @conditional_get
+    @cached_result
     def get_monthly_overview_by_year(year):
         try:
             monthly_data = []
@@ -1269,6 +970,7 @@ This link will expire in 1 hour.
 
     @app.route('/api/daily-transactions/<int:year>/<int:month>')
     @login_required
+    @conditional_get
     def get_daily_transactions(year, month):
         try:
             # Calculate start and end dates based on month
@@ -1289,89 +991,41 @@ This link will expire in 1 hour.
                 BudgetTransaction.date < end_date
             ).order_by(BudgetTransaction.date.desc()).all()
 
-            # Convert to JSON format
-            transactions_data = []
-            for transaction in transactions:
-                category_color = generate_color_for_category(transaction.category)
-                
-                transactions_data.append({
-                    'date': transaction.date.strftime('%Y-%m-%d'),
-                    'description': transaction.description,
-                    'category': transaction.category,
-                    'category_color': category_color,
-                    'amount': float(transaction.amount)
-                })
-
-            return jsonify(transactions_data)
+            return jsonify(transactions_data(transactions))
 
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/weekly-transactions/<int:year>/<int:month>/<int:week>')
     @login_required
+    @conditional_get
     def get_weekly_transactions(year, month, week):
         try:
-            # Calculate the first day of the month
-            first_day = datetime(year, month, 1)
-            
-            # Calculate the last day of the month
-            if month == 12:
-                last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                last_day = datetime(year, month + 1, 1) - timedelta(days=1)
-            
-            # Calculate the start and end dates for the selected week
-            # First, get the weekday of the first day (0 = Monday, 6 = Sunday)
-            first_weekday = first_day.weekday()
-            
-            # Calculate the start date of the selected week
-            week_start = first_day + timedelta(days=(week-1)*7 - first_weekday)
-            week_end = week_start + timedelta(days=6)
-            
-            # Ensure we don't go beyond the month boundaries
-            week_start = max(week_start, first_day)
-            week_end = min(week_end, last_day)
+            # The selected week, clipped to the month
+            week_start, week_end = week_bounds(year, month, week)
             
             # Get all transactions for the week
             transactions = BudgetTransaction.query.filter(
                 BudgetTransaction.user_id == current_user.id,
                 BudgetTransaction.date >= week_start,
-                BudgetTransaction.date <= week_end
+                BudgetTransaction.date < week_end + timedelta(days=1)
             ).order_by(BudgetTransaction.date.desc()).all()
             
-            # Convert transactions to JSON-serializable format
-            transactions_data = []
-            for transaction in transactions:
-                category_color = generate_color_for_category(transaction.category)
-                
-                transactions_data.append({
-                    'date': transaction.date.strftime('%Y-%m-%d'),
-                    'description': transaction.description,
-                    'category': transaction.category,
-                    'category_color': category_color,
-                    'amount': float(transaction.amount)
-                })
-            
-            return jsonify(transactions_data)
+            return jsonify(transactions_data(transactions))
         
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/yearly-overview/<int:start_year>/<int:end_year>')
     @login_required
+    @conditional_get
+    @cached_result
     def get_yearly_overview(start_year, end_year):
         try:
             # Calculate start and end dates
             start_date = datetime(start_year, 1, 1)
             end_date = datetime(end_year + 1, 1, 1)
 
-            # Get all transactions for the year range
-            transactions = BudgetTransaction.query.filter(
-                BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date >= start_date,
-                BudgetTransaction.date < end_date
-            ).order_by(BudgetTransaction.date).all()
-
             # Initialize yearly data
             yearly_data = []
             for year in range(start_year, end_year + 1):
@@ -1381,18 +1035,17 @@ This link will expire in 1 hour.
                     'expenses': 0
                 })
 
-            # Calculate yearly totals
+            # Fill in yearly totals from the user's rollup columns
             total_income = 0
             total_expenses = 0
 
-            for transaction in transactions:
-                year_idx = transaction.date.year - start_year
-                if transaction.amount > 0:
-                    yearly_data[year_idx]['income'] += float(transaction.amount)
-                    total_income += float(transaction.amount)
-                else:
-                    yearly_data[year_idx]['expenses'] += abs(float(transaction.amount))
-                    total_expenses += abs(float(transaction.amount))
+            columns = user_columns(current_user.id)
+            for year_start, income, expenses in columns.period_totals(start_date.date(), end_date.date(), 'year'):
+                year_idx = year_start.year - start_year
+                yearly_data[year_idx]['income'] = income
+                yearly_data[year_idx]['expenses'] = expenses
+                total_income += income
+                total_expenses += expenses
 
             return jsonify({
                 'yearly_data': yearly_data,
@@ -1409,6 +1062,27 @@ This link will expire in 1 hour.
             return jsonify({'error': str(e)}), 500
     
     
+    @app.route('/api/balance-history/<int:start_year>/<int:end_year>')
+    @login_required
+    @conditional_get
+    @cached_result
+    def get_balance_history(start_year, end_year):
+        try:
+            if end_year < start_year or end_year - start_year > 50:
+                return jsonify({'error': 'Invalid year range'}), 400
+
+            # Month-end running balances from the ledger snapshots
+            history = monthly_balances(current_user.id, date(start_year, 1, 1), date(end_year, 12, 1))
+            return jsonify({
+                'balances': [
+                    {'month': month.strftime('%Y-%m'), 'balance': balance}
+                    for month, balance in history
+                ]
+            })
+
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
     @app.route('/category-stats')
     @login_required
     def category_stats():
@@ -1416,43 +1090,34 @@ This link will expire in 1 hour.
 
     @app.route('/api/category-stats/<period>')
     @login_required
+    @conditional_get
+    @cached_result
     def get_category_stats(period):
         user_id = current_user.id
         
-        # Calculate date range based on period
-        end_date = datetime.now()
+        # Calculate date range [start_date, end_date) based on period
+        today = datetime.now().date()
         if period == 'month':
-            # Get the first day of current month
-            start_date = end_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            # Get the last day of current month
-            if end_date.month == 12:
-                end_date = end_date.replace(year=end_date.year + 1, month=1, day=1) - timedelta(days=1)
+            start_date = today.replace(day=1)
+            if today.month == 12:
+                end_date = date(today.year + 1, 1, 1)
             else:
-                end_date = end_date.replace(month=end_date.month + 1, day=1) - timedelta(days=1)
-            end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+                end_date = date(today.year, today.month + 1, 1)
         elif period == 'quarter':
-            current_quarter = (end_date.month - 1) // 3
-            start_date = end_date.replace(month=current_quarter * 3 + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+            current_quarter = (today.month - 1) // 3
+            start_date = date(today.year, current_quarter * 3 + 1, 1)
             if current_quarter == 3:  # Last quarter of the year
-                end_date = end_date.replace(year=end_date.year + 1, month=1, day=1) - timedelta(days=1)
+                end_date = date(today.year + 1, 1, 1)
             else:
-                end_date = end_date.replace(month=(current_quarter + 1) * 3 + 1, day=1) - timedelta(days=1)
-            end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+                end_date = date(today.year, (current_quarter + 1) * 3 + 1, 1)
         elif period == 'year':
-            start_date = end_date.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_date = end_date.replace(month=12, day=31, hour=23, minute=59, second=59, microsecond=999999)
+            start_date = date(today.year, 1, 1)
+            end_date = date(today.year + 1, 1, 1)
         else:  # all time
-            start_date = datetime.min
-            end_date = datetime.max
-
-        # Get transactions for the period
-        transactions = BudgetTransaction.query.filter(
-            BudgetTransaction.user_id == user_id,
-            BudgetTransaction.date >= start_date,
-            BudgetTransaction.date <= end_date
-        ).all()
+            start_date = None
+            end_date = None
 
-        # Process transactions
+        # Get per-category totals for the period from the user's rollup columns
         income_categories = {}
         expense_categories = {}
         income_transactions = {}
@@ -1460,21 +1125,16 @@ This link will expire in 1 hour.
         total_income = 0
         total_expenses = 0
 
-        for t in transactions:
-            if t.amount > 0:
-                if t.category not in income_categories:
-                    income_categories[t.category] = 0
-                    income_transactions[t.category] = 0
-                income_categories[t.category] += t.amount
-                income_transactions[t.category] += 1
-                total_income += t.amount
-            else:
-                if t.category not in expense_categories:
-                    expense_categories[t.category] = 0
-                    expense_transactions[t.category] = 0
-                expense_categories[t.category] += abs(t.amount)
-                expense_transactions[t.category] += 1
-                total_expenses += abs(t.amount)
+        columns = user_columns(user_id)
+        for category, income, expenses, income_count, expense_count in columns.category_breakdown(start_date, end_date):
+            if income_count:
+                income_categories[category] = income
+                income_transactions[category] = income_count
+                total_income += income
+            if expense_count:
+                expense_categories[category] = expenses
+                expense_transactions[category] = expense_count
+                total_expenses += expenses
 
         # Generate colors for categories
         def generate_colors(n):
@@ -1516,6 +1176,7 @@ This link will expire in 1 hour.
 
     @app.route('/api/monthly-transactions/<int:year>/<int:month>')
     @login_required
+    @conditional_get
     def get_monthly_transactions(year, month):
         try:
             # Calculate start and end dates based on month
@@ -1536,17 +1197,7 @@ This link will expire in 1 hour.
                 BudgetTransaction.date < end_date
             ).order_by(BudgetTransaction.date.desc()).all()
 
-            # Convert to JSON format
-            transactions_data = []
-            for transaction in transactions:
-                transactions_data.append({
-                    'date': transaction.date.strftime('%Y-%m-%d'),
-                    'description': transaction.description,
-                    'category': transaction.category,
-                    'amount': float(transaction.amount)
-                })
-
-            return jsonify(transactions_data)
+            return jsonify(transactions_data(transactions, with_color=False))
 
         except Exception as e:
             return jsonify({'error': str(e)}), 500
@@ -1588,107 +1239,57 @@ This link will expire in 1 hour.
 
     @app.route('/api/financial-health', methods=['GET'])
     @login_required
+    @conditional_get
+    @cached_result
     def get_financial_health():
         try:
-            # Get current date info
-            today = datetime.now()
-            current_year = today.year
-            current_month = today.month
-
             # Get user's budget settings
             user_budget = UserBudget.query.filter_by(user_id=current_user.id).first()
-            if not user_budget:
-                return jsonify({
-                    'score': 70,  # Default baseline score
-                    'factors': {
-                        'budget_adherence': 'No budget set',
-                        'spending_trend': 'Insufficient data',
-                        'savings_rate': 'No savings data',
-                        'expense_diversity': 'Insufficient data'
-                    }
-                })
 
-            # Calculate scores for different factors
-            scores = {}
+            # Score the current month from the user's rollup columns
+            return jsonify(financial_health(user_columns(current_user.id), user_budget, datetime.now().date()))
 
-            # 1. Budget Adherence (40 points)
-            monthly_budget = float(user_budget.monthly_budget) if user_budget.monthly_budget else 5000
-            start_date = datetime(current_year, current_month, 1)
-            end_date = (datetime(current_year, current_month + 1, 1) if current_month < 12 
-                       else datetime(current_year + 1, 1, 1)) - timedelta(days=1)
-            
-            monthly_spending = abs(db.session.query(func.sum(BudgetTransaction.amount))
-                .filter(BudgetTransaction.user_id == current_user.id)
-                .filter(BudgetTransaction.date >= start_date)
-                .filter(BudgetTransaction.date <= end_date)
-                .filter(BudgetTransaction.amount < 0)
-                .scalar() or 0)
-            
-            budget_ratio = monthly_spending / monthly_budget if monthly_budget > 0 else 1
-            scores['budget'] = max(0, 40 - (max(0, budget_ratio - 0.75) * 100))
-
-            # 2. Savings Rate (30 points)
-            total_income = abs(db.session.query(func.sum(BudgetTransaction.amount))
-                .filter(BudgetTransaction.user_id == current_user.id)
-                .filter(BudgetTransaction.date >= start_date)
-                .filter(BudgetTransaction.date <= end_date)
-                .filter(BudgetTransaction.amount > 0)
-                .scalar() or 0)
-            
-            savings_rate = 0 if total_income == 0 else max(0, (total_income - monthly_spending) / total_income)
-            scores['savings'] = min(30, savings_rate * 100)
-
-            # 3. Category Diversity (30 points)
-            category_expenses = db.session.query(
-                BudgetTransaction.category,
-                func.sum(BudgetTransaction.amount)
-            ).filter(
+        except Exception as e:
+            print(f"Error calculating financial health: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/dashboard/bootstrap/<int:year>/<int:month>')
+    @login_required
+    @conditional_get
+    @cached_result
+    def get_dashboard_bootstrap(year, month):
+        # Everything the dashboard shows on load for a month, in one response
+        try:
+            week = request.args.get('week', 1, type=int)
+
+            # One read of the rollup columns and budget serves the monthly chart and the meters
+            columns = user_columns(current_user.id)
+            user_budget = UserBudget.query.filter_by(user_id=current_user.id).first()
+
+            # One read of the month's transactions serves every transaction table
+            month_start, month_end = month_bounds(year, month)
+            transactions = BudgetTransaction.query.filter(
                 BudgetTransaction.user_id == current_user.id,
-                BudgetTransaction.date >= start_date,
-                BudgetTransaction.date <= end_date,
-                BudgetTransaction.amount < 0
-            ).group_by(BudgetTransaction.category).all()
-
-            scores['diversity'] = 30  # Default full score
-            if category_expenses:
-                total_expense = sum(abs(float(amount)) for _, amount in category_expenses)
-                if total_expense > 0:
-                    for _, amount in category_expenses:
-                        # Reduce score if any category exceeds 40% of total expenses
-                        category_percentage = abs(float(amount)) / total_expense * 100
-                        if category_percentage > 40:
-                            scores['diversity'] = max(10, 30 - (category_percentage - 40))
-                            break
-
-            # Calculate total score
-            total_score = round(sum(scores.values()))
-
-            # Generate factor descriptions
-            factors = {
-                'budget_adherence': ('Budget Management: ' + 
-                    ('Excellent' if scores['budget'] >= 35 else
-                     'Good' if scores['budget'] >= 25 else
-                     'Fair' if scores['budget'] >= 15 else 'Needs attention')),
-                
-                'savings': ('Savings Rate: ' + 
-                    ('Excellent' if scores['savings'] >= 25 else
-                     'Good' if scores['savings'] >= 15 else
-                     'Fair' if scores['savings'] >= 10 else 'Needs improvement')),
-                
-                'diversity': ('Expense Distribution: ' + 
-                    ('Well balanced' if scores['diversity'] >= 25 else
-                     'Moderately balanced' if scores['diversity'] >= 15 else
-                     'Could be more diverse'))
-            }
+                BudgetTransaction.date >= month_start,
+                BudgetTransaction.date < month_end
+            ).order_by(BudgetTransaction.date.desc()).all()
 
+            # week_end is the week's last day at midnight; take all of that day
+            week_start, week_end = week_bounds(year, month, week)
+            week_transactions = [t for t in transactions if week_start <= t.date < week_end + timedelta(days=1)]
+
+            # The daily and weekly charts come rendered with the page, so only their tables are here
             return jsonify({
-                'score': total_score,
-                'factors': factors,
-                'details': scores
+                'daily_transactions': transactions_data(transactions),
+                'weekly_transactions': transactions_data(week_transactions),
+                'monthly_overview': monthly_totals(columns, year),
+                'monthly_transactions': transactions_data(transactions, with_color=False),
+                'utilization_metrics': utilization_metrics(columns, user_budget, year, month),
+                'financial_health': financial_health(columns, user_budget, datetime.now().date())
             })
 
         except Exception as e:
-            print(f"Error calculating financial health: {str(e)}")
+            print(f"Error building dashboard bootstrap: {str(e)}")
             return jsonify({'error': str(e)}), 500
 
 init_routes(app)
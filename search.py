@@ -0,0 +1,177 @@
+import re
+import click
+from flask import current_app
+from sqlalchemy import text, select, table, column, literal_column, inspect, or_
+from sqlalchemy.exc import OperationalError
+from extensions import db
+from models import BudgetTransaction, Feedback
+
+def fts_index_ddl(fts_table, content_table, columns):
+    """CREATE statements for an FTS5 index over columns of content_table and the triggers keeping it in step.
+
+    The index is an external content table (the text lives only in
+    content_table), and the triggers cover every write path: ORM writes,
+    bulk inserts and bulk deletes.
+    """
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{name}' for name in columns)
+    old_values = ', '.join(f'old.{name}' for name in columns)
+    return [
+        # Prefix indexes for 2 and 3 characters make short "amaz*" lookups cheap
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            {names},
+            content='{content_table}',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {content_table}_fts_insert AFTER INSERT ON {content_table} BEGIN
+            INSERT INTO {fts_table}(rowid, {names}) VALUES (new.id, {new_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {content_table}_fts_delete AFTER DELETE ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {names}) VALUES ('delete', old.id, {old_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {content_table}_fts_update AFTER UPDATE OF {names} ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {names}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts_table}(rowid, {names}) VALUES (new.id, {new_values});
+        END"""
+    ]
+
+def drop_fts_index_ddl(fts_table, content_table):
+    """DROP statements undoing fts_index_ddl()."""
+    return [
+        f'DROP TRIGGER IF EXISTS {content_table}_fts_insert',
+        f'DROP TRIGGER IF EXISTS {content_table}_fts_delete',
+        f'DROP TRIGGER IF EXISTS {content_table}_fts_update',
+        f'DROP TABLE IF EXISTS {fts_table}'
+    ]
+
+# Transaction descriptions. user_id is indexed too: matching it inside FTS5
+# skips other users' rows without looking each of them up in budget_transaction.
+FTS_TABLE = 'transaction_fts'
+SEARCH_INDEX_DDL = fts_index_ddl(FTS_TABLE, 'budget_transaction', ['user_id', 'description'])
+DROP_SEARCH_INDEX_DDL = drop_fts_index_ddl(FTS_TABLE, 'budget_transaction')
+
+# Feedback sender and text, searched from the admin panel
+FEEDBACK_FTS_TABLE = 'feedback_fts'
+FEEDBACK_SEARCH_INDEX_DDL = fts_index_ddl(FEEDBACK_FTS_TABLE, 'feedback', ['name', 'email', 'subject', 'message'])
+DROP_FEEDBACK_SEARCH_INDEX_DDL = drop_fts_index_ddl(FEEDBACK_FTS_TABLE, 'feedback')
+
+SEARCH_INDEXES = {
+    FTS_TABLE: SEARCH_INDEX_DDL,
+    FEEDBACK_FTS_TABLE: FEEDBACK_SEARCH_INDEX_DDL
+}
+
+def search_terms(q):
+    """Split a search string into the words it contains."""
+    return re.findall(r'\w+', q or '')
+
+def prefix_terms(q):
+    """FTS5 query requiring every word of q, each as a prefix ('amazon pri' -> '"amazon"* "pri"*').
+
+    Quoting each word keeps FTS5 operators and punctuation in user input
+    from being parsed as query syntax.
+    """
+    return ' '.join(f'"{term}"*' for term in search_terms(q))
+
+def match_expression(user_id, q):
+    """FTS5 MATCH string for the user's descriptions containing every word of q, each as a prefix.
+
+    'amazon pri' becomes 'user_id:"7" AND description:("amazon"* "pri"*)'.
+    """
+    return f'user_id:"{int(user_id)}" AND description:({prefix_terms(q)})'
+
+def like_pattern(term):
+    """LIKE pattern finding a search word anywhere in a column ('_' is a word character but a LIKE wildcard)."""
+    return '%' + term.replace('_', '\\_') + '%'
+
+def fts_matches(fts_table, match, *columns):
+    """CTE of the rowids, plus the given FTS columns such as rank, matching an FTS5 query.
+
+    Materialized so SQLite runs the MATCH once. Joined as a plain subquery,
+    the planner may instead walk an index of the content table (say, unread
+    feedback) and re-run the MATCH for every row it visits.
+    """
+    fts = table(fts_table, column('rowid'), *[column(name) for name in columns])
+    return select(fts.c.rowid, *[fts.c[name] for name in columns]).where(
+        literal_column(fts_table).op('MATCH')(match)
+    ).cte(f'{fts_table}_matches').prefix_with('MATERIALIZED')
+
+def rebuild_search_index(connection, fts_table=FTS_TABLE):
+    """Re-read every indexed row from its content table into an FTS index."""
+    connection.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+
+def ensure_search_index():
+    """Create the FTS indexes and their triggers on SQLite, filling each on first creation.
+
+    Returns whether full-text search is available; on other databases, or
+    SQLite builds without FTS5, searches fall back to LIKE.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return False
+
+    inspector = inspect(db.engine)
+    created = [fts_table for fts_table in SEARCH_INDEXES if not inspector.has_table(fts_table)]
+    try:
+        connection = db.session.connection()
+        for fts_table, statements in SEARCH_INDEXES.items():
+            for statement in statements:
+                connection.execute(text(statement))
+            if fts_table in created:
+                rebuild_search_index(connection, fts_table)
+        db.session.commit()
+    except OperationalError as e:
+        db.session.rollback()
+        print(f"Full-text search unavailable, falling back to LIKE: {str(e)}")
+        return False
+    return True
+
+def filter_search(query, user_id, q):
+    """Restrict a BudgetTransaction query of one user to descriptions matching q.
+
+    Returns the query and a relevance column to order by (best first), or
+    None when no FTS index is available and LIKE was used instead.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return query, None
+
+    if current_app.config.get('FULL_TEXT_SEARCH'):
+        matches = fts_matches(FTS_TABLE, match_expression(user_id, q), 'rank')
+        query = query.join(matches, matches.c.rowid == BudgetTransaction.id)
+        # FTS5's rank is bm25(), where lower is more relevant
+        return query, matches.c.rank.asc()
+
+    # Without the index: every word anywhere in the description
+    for term in terms:
+        query = query.filter(BudgetTransaction.description.ilike(like_pattern(term), escape='\\'))
+    return query, None
+
+def filter_feedback_search(query, q):
+    """Restrict a Feedback query to feedback whose name, email, subject or message matches every word of q."""
+    terms = search_terms(q)
+    if not terms:
+        return query
+
+    if current_app.config.get('FULL_TEXT_SEARCH'):
+        matches = fts_matches(FEEDBACK_FTS_TABLE, prefix_terms(q))
+        return query.join(matches, matches.c.rowid == Feedback.id)
+
+    for term in terms:
+        pattern = like_pattern(term)
+        query = query.filter(or_(
+            Feedback.name.ilike(pattern, escape='\\'),
+            Feedback.email.ilike(pattern, escape='\\'),
+            Feedback.subject.ilike(pattern, escape='\\'),
+            Feedback.message.ilike(pattern, escape='\\')
+        ))
+    return query
+
+def init_search(app):
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Rebuild the full-text indexes of transaction descriptions and feedback."""
+        for fts_table in SEARCH_INDEXES:
+            rebuild_search_index(db.session.connection(), fts_table)
+        db.session.commit()
+        click.echo('Rebuilt the transaction and feedback search indexes')
@@ -156,26 +156,65 @@ function updateCategoryDropdowns() {
     }
 }
 
-// Load transactions
+// Transactions fetched per request while paging through the list
+const TRANSACTIONS_PAGE_SIZE = 200;
+
+function renderTransactionRows(rows) {
+    return rows.map(transaction => `
+            <tr>
+                <td>${transaction.date.split('T')[0]}</td>
+                <td>${transaction.description}</td>
+                <td>
+                    <i class="bi ${transaction.category.icon} text-${transaction.category.color}"></i>
+                    ${transaction.category.name}
+                </td>
+                <td class="${transaction.amount >= 0 ? 'text-success' : 'text-danger'}">
+                    ${formatCurrency(Math.abs(transaction.amount))}
+                </td>
+                <td>
+                    <div class="btn-group">
+                        <button class="btn btn-sm btn-outline-primary" onclick="editTransaction(${transaction.id})">
+                            <i class="bi bi-pencil"></i>
+                        </button>
+                        <button class="btn btn-sm btn-outline-danger" onclick="deleteTransaction(${transaction.id})">
+                            <i class="bi bi-trash"></i>
+                        </button>
+                    </div>
+                </td>
+            </tr>
+        `).join('');
+}
+
+// Load transactions page by page, rendering each page as it arrives
 async function loadTransactions() {
     try {
         console.log('Loading transactions...');
-        const response = await fetch('/api/transactions');
-        console.log('Response status:', response.status);
-        
-        if (!response.ok) {
-            const error = await response.json();
-            throw new Error(error.error || 'Failed to load transactions');
-        }
-        
-        transactions = await response.json();
-        console.log('Loaded transactions:', transactions);
-        
         const tbody = document.querySelector('#transactionTableBody');
         if (!tbody) {
             console.error('Could not find transactions table body');
             return;
         }
+
+        transactions = [];
+        tbody.innerHTML = '';
+        let cursor = null;
+        do {
+            const params = new URLSearchParams({ limit: TRANSACTIONS_PAGE_SIZE });
+            if (cursor) params.set('cursor', cursor);
+            const response = await fetch(`/api/transactions?${params}`);
+            console.log('Response status:', response.status);
+
+            if (!response.ok) {
+                const error = await response.json();
+                throw new Error(error.error || 'Failed to load transactions');
+            }
+
+            const page = await response.json();
+            transactions = transactions.concat(page.transactions);
+            tbody.insertAdjacentHTML('beforeend', renderTransactionRows(page.transactions));
+            cursor = page.next_cursor;
+        } while (cursor);
+        console.log('Loaded transactions:', transactions.length);
         
         if (transactions.length === 0) {
             tbody.innerHTML = `
@@ -193,30 +232,6 @@ async function loadTransactions() {
             return;
         }
         
-        tbody.innerHTML = transactions.map(transaction => `
-            <tr>
-                <td>${transaction.date.split('T')[0]}</td>
-                <td>${transaction.description}</td>
-                <td>
-                    <i class="bi ${transaction.category.icon} text-${transaction.category.color}"></i>
-                    ${transaction.category.name}
-                </td>
-                <td class="${transaction.amount >= 0 ? 'text-success' : 'text-danger'}">
-                    ${formatCurrency(Math.abs(transaction.amount))}
-                </td>
-                <td>
-                    <div class="btn-group">
-                        <button class="btn btn-sm btn-outline-primary" onclick="editTransaction(${transaction.id})">
-                            <i class="bi bi-pencil"></i>
-                        </button>
-                        <button class="btn btn-sm btn-outline-danger" onclick="deleteTransaction(${transaction.id})">
-                            <i class="bi bi-trash"></i>
-                        </button>
-                    </div>
-                </td>
-            </tr>
-        `).join('');
-        
         updateTransactionSummary();
     } catch (error) {
         console.error('Error loading transactions:', error);
@@ -59,7 +59,8 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    function updateUtilizationMeters() {
+    // preloaded: metrics already fetched (e.g. by the dashboard bootstrap), skips the request
+    function updateUtilizationMeters(preloaded) {
         const yearSelect = document.getElementById('yearSelect');
         const monthSelect = document.getElementById('monthSelect');
         
@@ -80,13 +81,15 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
 
-        fetch(`/api/utilization-metrics/${validYear}/${validMonth}`)
+        const request = preloaded ? Promise.resolve(preloaded) : fetch(`/api/utilization-metrics/${validYear}/${validMonth}`)
             .then(response => {
                 if (!response.ok) {
                     throw new Error(`HTTP error! status: ${response.status}`);
                 }
                 return response.json();
-            })
+            });
+
+        request
             .then(data => {
                 if (data && typeof data === 'object') {
                     // Monthly gauge update
@@ -229,7 +232,8 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    function updateFinancialHealth() {
+    // preloaded: score already fetched (e.g. by the dashboard bootstrap), skips the request
+    function updateFinancialHealth(preloaded) {
         // Get all the required elements
         const scoreElement = document.getElementById('healthScore');
         const scoreBar = document.getElementById('healthScoreBar');
@@ -254,13 +258,15 @@ document.addEventListener('DOMContentLoaded', function() {
         if (lastUpdateElement) lastUpdateElement.textContent = 'Updating...';
 
         // Fetch the financial health score
-        fetch('/api/financial-health')
+        const request = preloaded ? Promise.resolve(preloaded) : fetch('/api/financial-health')
             .then(response => {
                 if (!response.ok) {
                     throw new Error('Network response was not ok');
                 }
                 return response.json();
-            })
+            });
+
+        request
             .then(data => {
                 if (!data || typeof data.score === 'undefined') {
                     throw new Error('Invalid response data');
@@ -383,11 +389,6 @@ document.addEventListener('DOMContentLoaded', function() {
         return 'bg-danger';
     }
 
-    function initializeMetrics() {
-        updateUtilizationMeters();
-        updateFinancialHealth();
-    }
-
     // Helper function to format currency
     function formatCurrency(amount) {
         return new Intl.NumberFormat('en-US', {
@@ -400,26 +401,25 @@ document.addEventListener('DOMContentLoaded', function() {
     window.editBudget = editBudget;
     window.saveBudget = saveBudget;
     window.formatCurrency = formatCurrency;
+    window.updateUtilizationGauges = updateUtilizationMeters;
+    window.updateFinancialHealth = updateFinancialHealth;
 
     // Initialize components
     initModal();
         initializeGauges();
-        initializeMetrics();
+        // The first metrics arrive with the dashboard bootstrap request
 
         // Add event listeners for updates
         const monthSelect = document.getElementById('monthSelect');
         const yearSelect = document.getElementById('yearSelect');
         
         if (monthSelect) {
-            monthSelect.addEventListener('change', updateUtilizationMeters);
+            monthSelect.addEventListener('change', () => updateUtilizationMeters());
         }
         if (yearSelect) {
-            yearSelect.addEventListener('change', updateUtilizationMeters);
+            yearSelect.addEventListener('change', () => updateUtilizationMeters());
         }
 
-        // Initial load of financial health
-        updateFinancialHealth();
-
         // Update metrics periodically
         setInterval(() => {
             updateUtilizationMeters();
@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, case
+from extensions import db
+from models import User, UserRole, BudgetTransaction
+from pagination import parse_limit, encode_cursor, decode_cursor, keyset_page
+from activity import growth_metrics
+
+# Seconds the admin user counts are reused before being counted again
+ADMIN_STATS_TTL = int(os.environ.get('ADMIN_STATS_TTL_SECONDS', 30))
+
+# Sort keys of the admin user list and the type of their cursor values; id breaks ties
+USER_SORTS = {
+    'created_at': (User.created_at, datetime),
+    'username': (User.username, str),
+    'email': (User.email, str),
+    'id': (User.id, int)
+}
+
+# Filter and sort parameters a page link has to carry over
+USER_LIST_ARGS = ('role', 'active', 'created_from', 'created_to', 'sort', 'order')
+
+def parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+
+def filter_users(query, args):
+    """Apply the role, active and created_from/created_to filters of args to a User query.
+
+    role takes one or more comma-separated role names; the created range
+    includes both of its days. Raises ValueError for invalid values.
+    """
+    if args.get('role'):
+        try:
+            roles = [UserRole[name.strip().upper()] for name in args['role'].split(',') if name.strip()]
+        except KeyError:
+            raise ValueError('Invalid role')
+        query = query.filter(User.role.in_(roles))
+
+    active = args.get('active')
+    if active:
+        if active.lower() not in ('true', 'false', '1', '0'):
+            raise ValueError('active must be true or false')
+        query = query.filter(User.is_active == (active.lower() in ('true', '1')))
+
+    if args.get('created_from'):
+        query = query.filter(User.created_at >= parse_date(args['created_from'], 'created_from'))
+    if args.get('created_to'):
+        query = query.filter(User.created_at < parse_date(args['created_to'], 'created_to') + timedelta(days=1))
+    return query
+
+def user_page(args, default_limit):
+    """One page of the admin user list for the filter, sort, order, limit and cursor in args.
+
+    Returns the users and the cursor of the next page (None on the last
+    one). Raises ValueError for invalid parameters, including a cursor
+    from a list with another sort or order.
+    """
+    sort = args.get('sort', 'created_at')
+    if sort not in USER_SORTS:
+        raise ValueError(f'sort must be one of: {", ".join(USER_SORTS)}')
+    order = args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        raise ValueError('order must be asc or desc')
+    sort_column, sort_type = USER_SORTS[sort]
+
+    limit = parse_limit(args.get('limit'), default_limit)
+    after = None
+    if args.get('cursor'):
+        cursor_sort, cursor_order, sort_value, user_id = decode_cursor(args['cursor'], (str, str, sort_type, int))
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise ValueError('invalid cursor')
+        after = (sort_value, user_id)
+
+    users, has_more = keyset_page(
+        filter_users(User.query, args),
+        sort_column,
+        User.id,
+        after=after,
+        limit=limit,
+        descending=order == 'desc'
+    )
+    next_cursor = encode_cursor(sort, order, getattr(users[-1], sort), users[-1].id) if has_more else None
+    return users, next_cursor
+
+def count_user_stats():
+    """User counts for the admin dashboard in a single query, plus this month's growth.
+
+    Each count is a SUM over a CASE, so the user table is scanned once
+    instead of once per count. Growth comes from the activity log.
+    """
+    def count_where(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    row = db.session.execute(select(
+        func.count(User.id),
+        count_where(User.is_active.is_(True)),
+        *[count_where(User.role == role) for role in UserRole],
+        select(func.count(BudgetTransaction.id)).scalar_subquery()
+    )).one()
+
+    total_users, active_users = row[0], row[1]
+    users_by_role = {role.name: count for role, count in zip(UserRole, row[2:-1])}
+    stats = {
+        'total_users': total_users,
+        'active_users': active_users,
+        'pro_users': users_by_role[UserRole.PRO.name],
+        'users_by_role': users_by_role,
+        'total_transactions': row[-1]
+    }
+    stats['active_percentage'] = round(active_users / total_users * 100) if total_users else 0
+    stats['pro_percentage'] = round(stats['pro_users'] / total_users * 100) if total_users else 0
+    stats.update(growth_metrics(total_users, stats['total_transactions']))
+    return stats
+
+_stats_lock = threading.Lock()
+_stats = None
+_stats_expires = 0.0
+
+def user_stats():
+    """count_user_stats(), counted at most once per ADMIN_STATS_TTL seconds in each process.
+
+    The dict is shared between requests; copy it before changing it.
+    """
+    global _stats, _stats_expires
+    with _stats_lock:
+        if _stats is None or time.monotonic() >= _stats_expires:
+            _stats = count_user_stats()
+            _stats_expires = time.monotonic() + ADMIN_STATS_TTL
+        return _stats
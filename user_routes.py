@@ -1,14 +1,23 @@
 from flask import jsonify, flash, redirect, url_for, render_template, request
 from flask_login import login_required, current_user
-from models import User, UserRole, Feedback
+from models import User, UserRole, Feedback, ActivityEvent
 from extensions import db, mail
 from flask_mail import Message
 import secrets
 from datetime import datetime, timedelta
-from werkzeug.security import generate_password_hash
 import csv
 from io import StringIO
 from functools import wraps
+from sqlalchemy.orm import joinedload
+from result_cache import analytics_cache
+from pagination import parse_limit, encode_cursor, decode_cursor, keyset_page
+from search import filter_feedback_search
+from user_admin import USER_LIST_ARGS, user_page, user_stats
+from activity import record_event, get_writer
+from auth import login_key
+
+# Rows per page of the admin user and feedback lists
+ADMIN_PAGE_SIZE = 50
 
 def admin_required(f):
     @wraps(f)
@@ -29,10 +38,66 @@ def init_user_routes(app):
             flash('Access denied. Admin privileges required.', 'danger')
             return redirect(url_for('dashboard'))
             
-        # Get all users
-        users = User.query.order_by(User.id.desc()).all()
-        feedbacks = Feedback.query.order_by(Feedback.created_at.desc()).all()
-        return render_template('admin/users.html', users=users, feedbacks=feedbacks)
+        # One page of users, filtered and sorted by the query parameters (see user_admin.py)
+        try:
+            users, next_cursor = user_page(request.args, ADMIN_PAGE_SIZE)
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('admin_users'))
+        user_filters = {name: request.args[name] for name in USER_LIST_ARGS if request.args.get(name)}
+
+        # First page of feedback; the rest is loaded through /admin/feedback/filter
+        feedbacks, has_more = keyset_page(
+            Feedback.query.options(joinedload(Feedback.submitted_by)),
+            Feedback.created_at,
+            Feedback.id,
+            limit=ADMIN_PAGE_SIZE
+        )
+        feedback_cursor = encode_cursor(feedbacks[-1].created_at, feedbacks[-1].id) if has_more else None
+
+        return render_template('admin/users.html',
+                               users=users,
+                               user_filters=user_filters,
+                               users_cursor=request.args.get('cursor'),
+                               next_users_cursor=next_cursor,
+                               feedbacks=feedbacks,
+                               feedback_cursor=feedback_cursor)
+
+    @app.route('/api/admin/users', methods=['GET'])
+    @login_required
+    def list_users():
+        if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
+            return jsonify({'error': 'Unauthorized'}), 403
+
+        # Filters: role (comma-separated names), active, created_from/created_to (YYYY-MM-DD).
+        # sort: created_at, username, email or id; order: asc or desc. Pass
+        # next_cursor back as cursor, with the same filters and sort, for the next page.
+        try:
+            users, next_cursor = user_page(request.args, ADMIN_PAGE_SIZE)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'users': [{
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'role': user.role.name,
+                'is_active': user.is_active,
+                'created_at': user.created_at.isoformat(),
+                'last_login': user.last_login.isoformat() if user.last_login else None
+            } for user in users],
+            'next_cursor': next_cursor
+        })
+
+    @app.route('/api/admin/stats', methods=['GET'])
+    @login_required
+    def admin_stats():
+        if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
+            return jsonify({'error': 'Unauthorized'}), 403
+
+        # Counted in one query and reused for ADMIN_STATS_TTL_SECONDS
+        return jsonify(user_stats())
 
     @app.route('/api/admin/users', methods=['POST'])
     @login_required
@@ -47,8 +112,10 @@ def init_user_routes(app):
             if not all(key in data for key in ['username', 'email', 'password', 'role']):
                 return jsonify({'error': 'Missing required fields'}), 400
                 
-            # Check if email already exists
-            if User.query.filter_by(email=data['email']).first():
+            # Check if username or email already exists, in any letter case
+            if User.query.filter_by(username_key=login_key(data['username'])).first():
+                return jsonify({'error': 'Username already taken'}), 400
+            if User.query.filter_by(email_key=login_key(data['email'])).first():
                 return jsonify({'error': 'Email already registered'}), 400
                 
             # Create new user
@@ -61,6 +128,7 @@ def init_user_routes(app):
             
             db.session.add(user)
             db.session.commit()
+            record_event('user.create', details=f'Created {user.username} ({user.role.name})', target_id=user.id)
             
             return jsonify({'message': 'User created successfully'}), 201
             
@@ -97,6 +165,12 @@ def init_user_routes(app):
             if user.id == current_user.id and current_user.role != UserRole.SUPER_ADMIN:
                 return jsonify({'error': 'Cannot modify your own account'}), 403
             
+            # Another user's username or email, in any letter case, is taken
+            if 'username' in data and User.query.filter(User.username_key == login_key(data['username']), User.id != user.id).first():
+                return jsonify({'error': 'Username already taken'}), 400
+            if 'email' in data and User.query.filter(User.email_key == login_key(data['email']), User.id != user.id).first():
+                return jsonify({'error': 'Email already registered'}), 400
+
             # Update fields
             if 'username' in data:
                 user.username = data['username']
@@ -111,6 +185,7 @@ def init_user_routes(app):
                 user.is_active = data['is_active']
             
             db.session.commit()
+            record_event('user.update', details=f'Changed: {", ".join(sorted(data))}', target_id=user_id)
             return jsonify({'message': 'User updated successfully'})
             
         except Exception as e:
@@ -130,8 +205,10 @@ def init_user_routes(app):
             if user.id == current_user.id:
                 return jsonify({'error': 'Cannot delete your own account'}), 400
                 
+            username = user.username
             db.session.delete(user)
             db.session.commit()
+            record_event('user.delete', details=f'Deleted {username}', target_id=user_id)
             
             return jsonify({'message': 'User deleted successfully'})
             
@@ -149,6 +226,7 @@ def init_user_routes(app):
             user = User.query.get_or_404(user_id)
             user.is_active = True
             db.session.commit()
+            record_event('user.activate', target_id=user_id)
             
             return jsonify({'message': 'User activated successfully'})
             
@@ -171,6 +249,7 @@ def init_user_routes(app):
                 
             user.is_active = False
             db.session.commit()
+            record_event('user.deactivate', target_id=user_id)
             
             return jsonify({'message': 'User deactivated successfully'})
             
@@ -202,6 +281,7 @@ def init_user_routes(app):
                 
             user.role = new_role
             db.session.commit()
+            record_event('user.role', details=f'New role: {new_role.name}', target_id=user_id)
             
             return jsonify({'message': 'User role updated successfully'})
             
@@ -209,11 +289,49 @@ def init_user_routes(app):
             db.session.rollback()
             return jsonify({'error': str(e)}), 500
 
+    @app.route('/api/admin/analytics-cache', methods=['GET'])
+    @login_required
+    def analytics_cache_stats():
+        if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
+            return jsonify({'error': 'Unauthorized'}), 403
+
+        # Hit/miss counters of this worker process's analytics result cache
+        return jsonify(analytics_cache.stats())
+
+    @app.route('/api/admin/activity', methods=['GET'])
+    @login_required
+    def activity_feed():
+        if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
+            return jsonify({'error': 'Unauthorized'}), 403
+
+        # Newest first; action= keeps one kind of event (e.g. transaction.create).
+        # Pass next_cursor back as cursor for the next page.
+        try:
+            limit = parse_limit(request.args.get('limit'), ADMIN_PAGE_SIZE)
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor, (datetime, int)) if cursor else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Include the events this process has queued but not written yet
+        get_writer().flush()
+
+        query = ActivityEvent.query
+        if request.args.get('action'):
+            query = query.filter(ActivityEvent.action == request.args['action'])
+        events, has_more = keyset_page(query, ActivityEvent.created_at, ActivityEvent.id, after=after, limit=limit)
+
+        return jsonify({
+            'events': [event.to_dict() for event in events],
+            'next_cursor': encode_cursor(events[-1].created_at, events[-1].id) if has_more else None,
+            'writer': get_writer().stats()
+        })
+
     @app.route('/reset_password_request', methods=['GET', 'POST'])
     def reset_password_request():
         if request.method == 'POST':
             email = request.form.get('email')
-            user = User.query.filter_by(email=email).first()
+            user = User.query.filter_by(email_key=login_key(email)).first()
             
             if user:
                 # Generate token
@@ -268,7 +386,7 @@ If you did not make this request then simply ignore this email and no changes wi
                 return render_template('reset_password.html')
                 
             # Update password
-            user.password_hash = generate_password_hash(password)
+            user.set_password(password)
             user.reset_token = None
             user.reset_token_expires = None
             db.session.commit()
@@ -343,6 +461,7 @@ Submitted at: {feedback.created_at}
             # Save to database
             db.session.add(feedback)
             db.session.commit()
+            record_event('feedback.submit', details=feedback.subject, target_id=feedback.id)
         
             # Send email notification to super admin
             send_feedback_notification(feedback)
@@ -390,6 +509,7 @@ Submitted at: {feedback.created_at}
         try:
             db.session.delete(feedback)
             db.session.commit()
+            record_event('feedback.delete', target_id=id)
             return jsonify({'success': True})
         except Exception as e:
             db.session.rollback()
@@ -427,12 +547,20 @@ Submitted at: {feedback.created_at}
     @login_required
     @admin_required
     def filter_feedback():
+        # Returns one page, newest first; send next_cursor back as cursor for the next one
         # Get filter parameters
         status = request.args.get('status')  # 'read', 'unread', or None
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
         search = request.args.get('search')
 
+        try:
+            limit = parse_limit(request.args.get('limit'), default=ADMIN_PAGE_SIZE)
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor, (datetime, int)) if cursor else None
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
         # Start with base query
         query = Feedback.query
 
@@ -457,34 +585,23 @@ Submitted at: {feedback.created_at}
             except ValueError:
                 pass
 
-        if search:
-            search = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    Feedback.name.ilike(search),
-                    Feedback.email.ilike(search),
-                    Feedback.subject.ilike(search),
-                    Feedback.message.ilike(search)
-                )
-            )
-
-        # Get results ordered by creation date
-        feedbacks = query.order_by(Feedback.created_at.desc()).all()
-
-        # Convert to list of dictionaries for JSON response
-        feedback_list = [{
-            'id': f.id,
-            'name': f.name,
-            'email': f.email,
-            'subject': f.subject,
-            'message': f.message,
-            'created_at': f.created_at.strftime('%Y-%m-%d %H:%M'),
-            'is_read': f.is_read,
-            'read_at': f.read_at.strftime('%Y-%m-%d %H:%M') if f.read_at else None,
-            'user': f.user.username if f.user else 'Guest'
-        } for f in feedbacks]
+        # Every word must start a word of the name, email, subject or message
+        query = filter_feedback_search(query, search)
+
+        # Find one page ordered by creation date from the narrow sort key alone, so
+        # a search matching thousands of rows does not sort their messages too
+        keys, has_more = keyset_page(
+            query.with_entities(Feedback.created_at, Feedback.id),
+            Feedback.created_at,
+            Feedback.id,
+            after=after,
+            limit=limit
+        )
+        page = Feedback.query.options(joinedload(Feedback.submitted_by)).filter(Feedback.id.in_([id for _, id in keys]))
+        by_id = {f.id: f for f in page}
 
         return jsonify({
             'success': True,
-            'feedbacks': feedback_list
+            'feedbacks': [by_id[id].to_dict() for _, id in keys],
+            'next_cursor': encode_cursor(*keys[-1]) if has_more else None
         })